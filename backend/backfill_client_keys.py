@@ -0,0 +1,47 @@
+"""
+Script to backfill normalized-name and blocking-key columns on client_profiles.
+"""
+from database.connection import SessionLocal
+from database.models import ClientProfile
+from services.normalization import client_name_columns
+import sys
+
+BATCH_SIZE = 5000
+
+
+def backfill_client_keys():
+    """Populate normalized_name/block_key_* for rows that don't have them yet."""
+    db = SessionLocal()
+    try:
+        total = 0
+        last_id = 0
+        while True:
+            rows = (
+                db.query(ClientProfile.id, ClientProfile.name)
+                .filter(ClientProfile.normalized_name.is_(None), ClientProfile.id > last_id)
+                .order_by(ClientProfile.id)
+                .limit(BATCH_SIZE)
+                .all()
+            )
+            if not rows:
+                break
+            db.bulk_update_mappings(
+                ClientProfile,
+                [{'id': row.id, **client_name_columns(row.name)} for row in rows]
+            )
+            db.commit()
+            total += len(rows)
+            last_id = rows[-1].id
+            print(f"Backfilled {total} client profiles...")
+        print(f"Backfill complete: {total} client profiles updated")
+        return 0
+    except Exception as e:
+        db.rollback()
+        print(f"Error backfilling client profiles: {e}", file=sys.stderr)
+        return 1
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(backfill_client_keys())
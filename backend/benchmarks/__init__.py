@@ -0,0 +1 @@
+"""Benchmark suites (run as modules from the backend directory)."""
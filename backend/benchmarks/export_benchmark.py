@@ -0,0 +1,236 @@
+"""
+Export workbook benchmark.
+
+Compares the single-pass styled writer (services.excel_writer) with the
+previous export path, which wrote DataFrames through pd.ExcelWriter,
+reloaded the bytes with load_workbook, restyled every cell with fresh
+style objects, recomputed column widths and saved again. The previous path
+is kept here verbatim as the baseline.
+
+Usage (from the backend directory)::
+
+    python -m benchmarks.export_benchmark --rows 3 100 1000 --repeat 50
+"""
+import argparse
+import io
+import json
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+import openpyxl
+import pandas as pd
+from openpyxl import load_workbook
+from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+from openpyxl.utils import get_column_letter
+
+from services.excel_writer import build_report_workbook
+from services.export_service import FIELD_COLUMNS, MISMATCH_COLUMNS, SUMMARY_COLUMNS
+
+STATUSES = ['Matched', 'Mismatch', 'Not in Dataset', 'Not Extracted']
+
+
+def synthetic_report(rows: int) -> Dict[str, Any]:
+    """Build report data shaped like ExportService.collect_report_data with ``rows`` field/mismatch rows."""
+    field_rows = [
+        [f"Field {i}", f"01/{i % 28 + 1:02d}/1980", f"01/{(i + 1) % 28 + 1:02d}/1980",
+         STATUSES[i % len(STATUSES)], f"{90 + i % 10:.1f}"]
+        for i in range(rows)
+    ]
+    mismatch_rows = [
+        ['DOB', f"01/{i % 28 + 1:02d}/1980", f"01/{(i + 1) % 28 + 1:02d}/1980", i % 5 + 1, 'Date Mismatch']
+        for i in range(rows)
+    ]
+    return {
+        'summary_columns': SUMMARY_COLUMNS,
+        'summary_rows': [[1, 'scan_0001.pdf', '2024-01-01 12:00:00', 'match', '97.5', 42, 'Jane Q. Public']],
+        'field_columns': FIELD_COLUMNS,
+        'field_rows': field_rows,
+        'mismatch_columns': MISMATCH_COLUMNS,
+        'mismatch_rows': mismatch_rows,
+    }
+
+
+# --- Baseline: the previous pandas -> reload -> restyle path ---
+
+def _legacy_border() -> Border:
+    return Border(
+        left=Side(style='thin'),
+        right=Side(style='thin'),
+        top=Side(style='thin'),
+        bottom=Side(style='thin')
+    )
+
+
+def _legacy_autofit(sheet):
+    for column in sheet.columns:
+        max_length = 0
+        column_letter = get_column_letter(column[0].column)
+        for cell in column:
+            try:
+                if len(str(cell.value)) > max_length:
+                    max_length = len(str(cell.value))
+            except:
+                pass
+        sheet.column_dimensions[column_letter].width = min(max_length + 2, 50)
+
+
+def _legacy_format_summary(sheet):
+    header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+    header_font = Font(bold=True, color="FFFFFF", size=11)
+    border = _legacy_border()
+    for cell in sheet[1]:
+        cell.fill = header_fill
+        cell.font = header_font
+        cell.alignment = Alignment(horizontal='center', vertical='center')
+        cell.border = border
+    for row in sheet.iter_rows(min_row=2, max_row=sheet.max_row):
+        for cell in row:
+            cell.border = border
+            cell.alignment = Alignment(vertical='center')
+    _legacy_autofit(sheet)
+
+
+def _legacy_format_fields(sheet):
+    header_fill = PatternFill(start_color="70AD47", end_color="70AD47", fill_type="solid")
+    header_font = Font(bold=True, color="FFFFFF", size=11)
+    border = _legacy_border()
+    for cell in sheet[1]:
+        cell.fill = header_fill
+        cell.font = header_font
+        cell.alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
+        cell.border = border
+    for row_idx, row in enumerate(sheet.iter_rows(min_row=2, max_row=sheet.max_row), start=2):
+        match_status = sheet[f'D{row_idx}'].value
+        if match_status == 'Matched':
+            row_fill = PatternFill(start_color="C6EFCE", end_color="C6EFCE", fill_type="solid")
+        elif match_status == 'Mismatch':
+            row_fill = PatternFill(start_color="FFC7CE", end_color="FFC7CE", fill_type="solid")
+        elif match_status == 'Not in Dataset':
+            row_fill = PatternFill(start_color="FFEB9C", end_color="FFEB9C", fill_type="solid")
+        else:
+            row_fill = PatternFill(start_color="D9D9D9", end_color="D9D9D9", fill_type="solid")
+        for cell in row:
+            cell.fill = row_fill
+            cell.border = border
+            cell.alignment = Alignment(vertical='center', wrap_text=True)
+    _legacy_autofit(sheet)
+
+
+def _legacy_format_mismatches(sheet):
+    header_fill = PatternFill(start_color="C00000", end_color="C00000", fill_type="solid")
+    header_font = Font(bold=True, color="FFFFFF", size=11)
+    border = _legacy_border()
+    for cell in sheet[1]:
+        cell.fill = header_fill
+        cell.font = header_font
+        cell.alignment = Alignment(horizontal='center', vertical='center')
+        cell.border = border
+    mismatch_fill = PatternFill(start_color="FFC7CE", end_color="FFC7CE", fill_type="solid")
+    for row in sheet.iter_rows(min_row=2, max_row=sheet.max_row):
+        for cell in row:
+            cell.fill = mismatch_fill
+            cell.border = border
+            cell.alignment = Alignment(vertical='center')
+    _legacy_autofit(sheet)
+
+
+def build_legacy_workbook(report: Dict[str, Any]) -> bytes:
+    """The previous export path: pd.ExcelWriter, reload, restyle every cell, save again."""
+    excel_buffer = io.BytesIO()
+    with pd.ExcelWriter(excel_buffer, engine='openpyxl') as writer:
+        pd.DataFrame(report['summary_rows'], columns=report['summary_columns']).to_excel(
+            writer, index=False, sheet_name='Summary')
+        pd.DataFrame(report['field_rows'], columns=report['field_columns']).to_excel(
+            writer, index=False, sheet_name='Field Matching')
+        if report['mismatch_rows']:
+            pd.DataFrame(report['mismatch_rows'], columns=report['mismatch_columns']).to_excel(
+                writer, index=False, sheet_name='Mismatches')
+
+    excel_buffer.seek(0)
+    workbook = load_workbook(excel_buffer)
+    _legacy_format_summary(workbook['Summary'])
+    _legacy_format_fields(workbook['Field Matching'])
+    if 'Mismatches' in workbook.sheetnames:
+        _legacy_format_mismatches(workbook['Mismatches'])
+
+    excel_buffer = io.BytesIO()
+    workbook.save(excel_buffer)
+    return excel_buffer.getvalue()
+
+
+STRATEGIES: Dict[str, Callable[[Dict[str, Any]], bytes]] = {
+    'legacy_roundtrip': build_legacy_workbook,
+    'single_pass': build_report_workbook,
+}
+
+
+def run_strategy(build: Callable[[Dict[str, Any]], bytes], report: Dict[str, Any], repeat: int) -> Dict[str, Any]:
+    """Build the workbook ``repeat`` times and report wall and CPU time per build."""
+    build(report)  # warm-up (imports, style caches)
+    wall_ms: List[float] = []
+    cpu_ms: List[float] = []
+    size = 0
+    for _ in range(repeat):
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        size = len(build(report))
+        wall_ms.append((time.perf_counter() - wall_start) * 1000)
+        cpu_ms.append((time.process_time() - cpu_start) * 1000)
+    ordered = sorted(wall_ms)
+    return {
+        'wall_ms_p50': round(statistics.median(wall_ms), 3),
+        'wall_ms_p90': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.9))], 3),
+        'wall_ms_mean': round(statistics.fmean(wall_ms), 3),
+        'cpu_ms_mean': round(statistics.fmean(cpu_ms), 3),
+        'bytes': size,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Export workbook benchmark")
+    parser.add_argument("--rows", type=int, nargs="+", default=[3, 100, 1000],
+                        help="Field/mismatch rows per workbook (3 = a normal single-document export)")
+    parser.add_argument("--repeat", type=int, default=30, help="Builds per strategy and size")
+    parser.add_argument("--strategies", nargs="+", default=list(STRATEGIES), choices=list(STRATEGIES))
+    parser.add_argument("--output", help="Write JSON results to this file instead of stdout")
+    args = parser.parse_args(argv)
+
+    results = {
+        'benchmark': 'export_workbook',
+        'created_at': datetime.now().isoformat(),
+        'environment': {
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'openpyxl': openpyxl.__version__,
+            'pandas': pd.__version__,
+        },
+        'runs': [],
+    }
+    for rows in args.rows:
+        report = synthetic_report(rows)
+        run = {'rows': rows, 'strategies': {}}
+        for name in args.strategies:
+            run['strategies'][name] = run_strategy(STRATEGIES[name], report, args.repeat)
+        if {'legacy_roundtrip', 'single_pass'} <= set(run['strategies']):
+            run['speedup'] = round(
+                run['strategies']['legacy_roundtrip']['wall_ms_mean'] / run['strategies']['single_pass']['wall_ms_mean'], 2
+            )
+        results['runs'].append(run)
+        print(f"rows={rows}: " + ", ".join(
+            f"{name} {stats['wall_ms_mean']:.2f} ms" for name, stats in run['strategies'].items()
+        ), file=sys.stderr)
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,235 @@
+"""
+Matching benchmark and scaling suite.
+
+Generates synthetic client datasets, runs noisy query names through every
+matching strategy and reports latency percentiles, memory use and decision
+accuracy as JSON so results can be compared between releases.
+
+Usage (from the backend directory)::
+
+    python -m benchmarks.matching_benchmark --sizes 10000 100000 --output results.json
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import resource
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable, Dict, Any, List, Optional, Tuple
+
+import numpy as np
+import rapidfuzz
+from rapidfuzz import fuzz
+
+from benchmarks.synthetic import QUERY_VARIANTS, generate_clients, generate_queries
+from services.client_snapshot import ClientSnapshot, write_snapshot
+from services.matching_service import MatchingService
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000, 5_000_000]
+
+# A strategy is built once per dataset and returns a scorer: name -> (client_id, score, decision)
+Scorer = Callable[[str], Tuple[Optional[int], float, str]]
+
+
+def _rss_mb() -> float:
+    """Current resident set size in MB (falls back to peak RSS off Linux)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def build_legacy_loop(clients, matching_service: MatchingService, workdir: str) -> Tuple[Scorer, int]:
+    """Per-client fuzz.WRatio loop followed by a full sort (the original algorithm)."""
+    client_ids = [client_id for client_id, _, _, _ in clients]
+    client_names = [name for _, name, _, _ in clients]
+
+    def score(name: str):
+        matches = [(client_id, fuzz.WRatio(name, client_name))
+                   for client_id, client_name in zip(client_ids, client_names)]
+        matches.sort(key=lambda x: x[1], reverse=True)
+        second = matches[1][1] if len(matches) > 1 else None
+        return matches[0][0], matches[0][1], matching_service.decide(matches[0][1], second)
+
+    index_bytes = sum(sys.getsizeof(n) for n in client_names) + sys.getsizeof(client_names)
+    return score, index_bytes
+
+
+def build_bulk_cdist(clients, matching_service: MatchingService, workdir: str) -> Tuple[Scorer, int]:
+    """MatchingService.score_names over every client (the current DB code path)."""
+    client_ids = [client_id for client_id, _, _, _ in clients]
+    client_names = [name for _, name, _, _ in clients]
+
+    def score(name: str):
+        return matching_service.score_names([name], client_ids, client_names)[0]
+
+    index_bytes = sum(sys.getsizeof(n) for n in client_names) + sys.getsizeof(client_names)
+    return score, index_bytes
+
+
+def build_snapshot_blocked(clients, matching_service: MatchingService, workdir: str) -> Tuple[Scorer, int]:
+    """Memory-mapped snapshot with blocking-key candidate selection (CLIENT_SNAPSHOT_DIR)."""
+    snapshot_dir = os.path.join(workdir, "snapshot")
+    version = write_snapshot(snapshot_dir, clients)
+    snapshot = ClientSnapshot(os.path.join(snapshot_dir, f"v{version}"))
+
+    def score(name: str):
+        candidate_ids, candidate_names = snapshot.candidates(name)
+        return matching_service.score_names([name], candidate_ids, candidate_names)[0]
+
+    index_bytes = sum(
+        os.path.getsize(os.path.join(snapshot.path, entry)) for entry in os.listdir(snapshot.path)
+    )
+    return score, index_bytes
+
+
+STRATEGIES = {
+    "legacy_loop": build_legacy_loop,
+    "bulk_cdist": build_bulk_cdist,
+    "snapshot_blocked": build_snapshot_blocked,
+}
+
+
+def _percentiles(samples_ms: List[float]) -> Dict[str, float]:
+    values = np.array(samples_ms)
+    return {
+        "p50": round(float(np.percentile(values, 50)), 3),
+        "p90": round(float(np.percentile(values, 90)), 3),
+        "p99": round(float(np.percentile(values, 99)), 3),
+        "max": round(float(values.max()), 3),
+        "mean": round(statistics.fmean(samples_ms), 3),
+    }
+
+
+def run_strategy(
+    name: str,
+    clients,
+    queries,
+    names_by_id: Dict[int, str],
+    matching_service: MatchingService
+) -> Dict[str, Any]:
+    """Build one strategy, run every query through it and collect metrics."""
+    workdir = tempfile.mkdtemp(prefix=f"bench-{name}-")
+    try:
+        gc.collect()
+        rss_before = _rss_mb()
+        setup_start = time.perf_counter()
+        scorer, index_bytes = STRATEGIES[name](clients, matching_service, workdir)
+        setup_seconds = time.perf_counter() - setup_start
+
+        latencies = []
+        per_variant = {variant: {"queries": 0, "correct": 0, "match": 0, "ambiguous": 0, "no_match": 0}
+                       for variant in QUERY_VARIANTS}
+        for variant, query, expected_id in queries:
+            start = time.perf_counter()
+            client_id, _, decision = scorer(query)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+            stats = per_variant[variant]
+            stats["queries"] += 1
+            stats[decision] += 1
+            if expected_id is None:
+                # Absent names are correct unless confidently matched
+                stats["correct"] += decision != "match"
+            else:
+                # Clients sharing the exact same name are indistinguishable
+                stats["correct"] += decision == "match" and names_by_id.get(client_id) == names_by_id[expected_id]
+
+        for stats in per_variant.values():
+            stats["accuracy"] = round(stats["correct"] / stats["queries"], 4) if stats["queries"] else None
+        total_correct = sum(stats["correct"] for stats in per_variant.values())
+
+        return {
+            "strategy": name,
+            "setup_seconds": round(setup_seconds, 3),
+            "latency_ms": _percentiles(latencies),
+            "index_bytes": index_bytes,
+            "rss_delta_mb": round(_rss_mb() - rss_before, 1),
+            "accuracy": round(total_correct / len(queries), 4),
+            "by_variant": per_variant,
+        }
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def run_benchmark(
+    sizes: List[int],
+    query_count: int,
+    strategies: List[str],
+    max_legacy_size: int,
+    seed: int
+) -> Dict[str, Any]:
+    """Run every strategy against every dataset size."""
+    matching_service = MatchingService()
+    results = []
+    for size in sizes:
+        print(f"Generating {size} synthetic clients...", file=sys.stderr)
+        clients = generate_clients(size, seed=seed)
+        queries = generate_queries(clients, query_count, seed=seed + 1)
+        names_by_id = {client_id: name for client_id, name, _, _ in clients}
+
+        for strategy in strategies:
+            if strategy == "legacy_loop" and size > max_legacy_size:
+                print(f"  skipping {strategy} at {size} (> --max-legacy-size)", file=sys.stderr)
+                continue
+            print(f"  running {strategy} at {size}...", file=sys.stderr)
+            result = run_strategy(strategy, clients, queries, names_by_id, matching_service)
+            result["dataset_size"] = size
+            result["queries"] = len(queries)
+            results.append(result)
+            print(f"    p50={result['latency_ms']['p50']}ms p99={result['latency_ms']['p99']}ms "
+                  f"accuracy={result['accuracy']}", file=sys.stderr)
+
+        del clients, queries, names_by_id
+        gc.collect()
+
+    return {
+        "benchmark": "matching",
+        "created_at": datetime.now().isoformat(),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "rapidfuzz": rapidfuzz.__version__,
+            "numpy": np.__version__,
+        },
+        "thresholds": {
+            "high_confidence": MatchingService.HIGH_CONFIDENCE_THRESHOLD,
+            "low_confidence": MatchingService.LOW_CONFIDENCE_THRESHOLD,
+        },
+        "results": results,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Matching benchmark and scaling suite")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="Synthetic client dataset sizes")
+    parser.add_argument("--queries", type=int, default=200, help="Query names per dataset")
+    parser.add_argument("--strategies", nargs="+", default=list(STRATEGIES), choices=list(STRATEGIES))
+    parser.add_argument("--max-legacy-size", type=int, default=100_000,
+                        help="Skip the legacy per-client loop above this dataset size")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write JSON results to this file instead of stdout")
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(args.sizes, args.queries, args.strategies, args.max_legacy_size, args.seed)
+    payload = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(payload)
+        print(f"Results written to {args.output}", file=sys.stderr)
+    else:
+        print(payload)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,181 @@
+"""
+Document list serialization benchmark.
+
+Times rendering the GET /documents/ body for a large list and reports the
+bytes sent on the wire with each response encoding. The previous path built
+rows with ``.isoformat()`` strings and rendered them through
+jsonable_encoder and the stdlib-json JSONResponse; it is kept here as the
+baseline next to the FastAPI default with ORJSONResponse (jsonable_encoder
+then orjson) and the route's current path (orjson directly, native datetimes).
+
+Usage (from the backend directory)::
+
+    python -m benchmarks.serialization_benchmark --docs 10000 --repeat 20
+"""
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+
+from compression import CompressionSettings, _Compressor, brotli_available
+
+DECISIONS = ['match', 'review', 'no_match', None]
+
+
+def synthetic_documents(count: int, seed: int = 7) -> List[Dict[str, Any]]:
+    """Build ``count`` list rows shaped like routes.documents._document_summary (native datetimes)."""
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1, 8, 0, 0)
+    rows = []
+    for i in range(count):
+        created_at = start + timedelta(minutes=17 * i, microseconds=rng.randrange(1_000_000))
+        completed = rng.random() < 0.9
+        decision = rng.choice(DECISIONS) if completed else None
+        rows.append({
+            "doc_id": count - i,
+            "filename": f"scan_{count - i:06d}.pdf",
+            "status": "completed" if completed else rng.choice(["pending", "processing", "failed"]),
+            "created_at": created_at,
+            "completed_at": created_at + timedelta(seconds=rng.uniform(5, 90)) if completed else None,
+            "match_decision": decision,
+            "match_score": round(rng.uniform(40, 100), 2) if decision else None,
+            "matched_client_id": rng.randrange(1, 5000) if decision else None,
+            "matched_client_name": f"Client {rng.randrange(1, 5000)}" if decision else None,
+            "mismatch_count": rng.randrange(0, 3) if decision else 0,
+        })
+    return rows
+
+
+def _list_body(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return {"documents": rows, "total": len(rows), "next_cursor": None}
+
+
+# --- Strategies ---
+
+def render_legacy(rows: List[Dict[str, Any]]) -> bytes:
+    """The previous path: isoformat strings per row, jsonable_encoder, stdlib json."""
+    legacy_rows = [
+        {
+            **row,
+            "created_at": row["created_at"].isoformat() if row["created_at"] else None,
+            "completed_at": row["completed_at"].isoformat() if row["completed_at"] else None,
+        }
+        for row in rows
+    ]
+    return JSONResponse(content=jsonable_encoder(_list_body(legacy_rows))).body
+
+
+def render_encoder_orjson(rows: List[Dict[str, Any]]) -> bytes:
+    """A dict returned from a route with ORJSONResponse as the default class."""
+    return ORJSONResponse(content=jsonable_encoder(_list_body(rows))).body
+
+
+def render_orjson(rows: List[Dict[str, Any]]) -> bytes:
+    """The current list path: ORJSONResponse built directly from native values."""
+    return ORJSONResponse(content=_list_body(rows)).body
+
+
+STRATEGIES: Dict[str, Callable[[List[Dict[str, Any]]], bytes]] = {
+    'legacy_json': render_legacy,
+    'jsonable_encoder_orjson': render_encoder_orjson,
+    'orjson_direct': render_orjson,
+}
+
+
+def run_strategy(render: Callable[[List[Dict[str, Any]]], bytes], rows: List[Dict[str, Any]], repeat: int) -> Dict[str, Any]:
+    """Render the list ``repeat`` times and report wall and CPU time per render."""
+    render(rows)  # warm-up
+    wall_ms: List[float] = []
+    cpu_ms: List[float] = []
+    size = 0
+    for _ in range(repeat):
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        size = len(render(rows))
+        wall_ms.append((time.perf_counter() - wall_start) * 1000)
+        cpu_ms.append((time.process_time() - cpu_start) * 1000)
+    ordered = sorted(wall_ms)
+    return {
+        'wall_ms_p50': round(statistics.median(wall_ms), 3),
+        'wall_ms_p90': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.9))], 3),
+        'wall_ms_mean': round(statistics.fmean(wall_ms), 3),
+        'cpu_ms_mean': round(statistics.fmean(cpu_ms), 3),
+        'bytes': size,
+    }
+
+
+def wire_sizes(body: bytes, repeat: int) -> Dict[str, Any]:
+    """Bytes on the wire and compression time for each encoding the middleware can negotiate."""
+    settings = CompressionSettings()
+    encodings = ['gzip', 'br'] if brotli_available() else ['gzip']
+    sizes: Dict[str, Any] = {'identity': {'bytes': len(body)}}
+    for encoding in encodings:
+        wall_ms: List[float] = []
+        compressed = b""
+        for _ in range(repeat):
+            wall_start = time.perf_counter()
+            compressed = _Compressor(encoding, settings).compress(body, final=True)
+            wall_ms.append((time.perf_counter() - wall_start) * 1000)
+        sizes[encoding] = {
+            'bytes': len(compressed),
+            'ratio': round(len(body) / len(compressed), 2),
+            'compress_ms_mean': round(statistics.fmean(wall_ms), 3),
+        }
+    return sizes
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Document list serialization benchmark")
+    parser.add_argument("--docs", type=int, nargs="+", default=[10000], help="Documents in the list")
+    parser.add_argument("--repeat", type=int, default=20, help="Renders per strategy and size")
+    parser.add_argument("--strategies", nargs="+", default=list(STRATEGIES), choices=list(STRATEGIES))
+    parser.add_argument("--output", help="Write JSON results to this file instead of stdout")
+    args = parser.parse_args(argv)
+
+    results = {
+        'benchmark': 'document_list_serialization',
+        'created_at': datetime.now().isoformat(),
+        'environment': {
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'orjson': orjson.__version__,
+            'brotli': brotli_available(),
+        },
+        'runs': [],
+    }
+    for docs in args.docs:
+        rows = synthetic_documents(docs)
+        run = {'docs': docs, 'strategies': {}}
+        for name in args.strategies:
+            run['strategies'][name] = run_strategy(STRATEGIES[name], rows, args.repeat)
+        if {'legacy_json', 'orjson_direct'} <= set(run['strategies']):
+            run['speedup'] = round(
+                run['strategies']['legacy_json']['wall_ms_mean'] / run['strategies']['orjson_direct']['wall_ms_mean'], 2
+            )
+        run['wire'] = wire_sizes(render_orjson(rows), max(1, args.repeat // 4))
+        results['runs'].append(run)
+        print(f"docs={docs}: " + ", ".join(
+            f"{name} {stats['wall_ms_mean']:.2f} ms" for name, stats in run['strategies'].items()
+        ) + "; wire " + ", ".join(
+            f"{encoding} {stats['bytes']} B" for encoding, stats in run['wire'].items()
+        ), file=sys.stderr)
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+"""
+Synthetic client datasets and noisy query names for benchmarks.
+"""
+import random
+from datetime import date
+from typing import List, Optional, Tuple
+
+FIRST_NAMES = [
+    "james", "mary", "john", "patricia", "robert", "jennifer", "michael", "linda",
+    "william", "elizabeth", "david", "barbara", "richard", "susan", "joseph", "jessica",
+    "thomas", "sarah", "charles", "karen", "christopher", "nancy", "daniel", "lisa",
+    "matthew", "betty", "anthony", "margaret", "mark", "sandra", "donald", "ashley",
+    "steven", "kimberly", "paul", "emily", "andrew", "donna", "joshua", "michelle",
+    "kenneth", "dorothy", "kevin", "carol", "brian", "amanda", "george", "melissa",
+    "edward", "deborah", "ronald", "stephanie", "timothy", "rebecca", "jason", "sharon",
+    "jeffrey", "laura", "ryan", "cynthia", "jacob", "kathleen", "gary", "amy",
+    "nicholas", "shirley", "eric", "angela", "jonathan", "helen", "stephen", "anna",
+    "larry", "brenda", "justin", "pamela", "scott", "nicole", "brandon", "emma",
+    "maria", "jose", "juan", "luis", "carlos", "ana", "sofia", "miguel", "fatima",
+    "mohammed", "ahmed", "ali", "wei", "li", "priya", "raj", "olga", "ivan",
+]
+
+SURNAME_SYLLABLES = [
+    "an", "ber", "car", "dal", "en", "fer", "gar", "har", "in", "jen", "kin", "lam",
+    "mar", "nel", "or", "per", "quin", "ros", "son", "tan", "ur", "van", "wil", "xu",
+    "yang", "zim", "ston", "ley", "ton", "man", "berg", "ford", "wood", "field", "ez",
+    "ski", "ov", "ich", "ard", "well", "brook", "hill", "dez", "ram", "sh", "ch",
+]
+
+# Typical OCR confusions (source -> replacement) applied to names
+OCR_CONFUSIONS = [
+    ("rn", "m"), ("m", "rn"), ("l", "1"), ("i", "l"), ("o", "0"), ("cl", "d"),
+    ("d", "cl"), ("e", "c"), ("h", "b"), ("u", "v"), ("n", "ri"), ("s", "5"),
+]
+
+QUERY_VARIANTS = ["exact", "typo", "ocr", "swapped", "absent"]
+
+
+def _surname(rng: random.Random) -> str:
+    return "".join(rng.choice(SURNAME_SYLLABLES) for _ in range(rng.randint(2, 3)))
+
+
+def _random_date(rng: random.Random, start_year: int, end_year: int) -> date:
+    start = date(start_year, 1, 1).toordinal()
+    end = date(end_year, 12, 31).toordinal()
+    return date.fromordinal(rng.randint(start, end))
+
+
+def generate_clients(
+    size: int,
+    seed: int = 42
+) -> List[Tuple[int, str, Optional[date], Optional[date]]]:
+    """
+    Generate ``size`` synthetic clients as (id, normalized_name, dob, doa) rows.
+
+    Names are "first [middle initial] surname" with syllable-built surnames so
+    millions of rows stay realistic without being trivially unique.
+    """
+    rng = random.Random(seed)
+    clients = []
+    for client_id in range(1, size + 1):
+        parts = [rng.choice(FIRST_NAMES)]
+        if rng.random() < 0.3:
+            parts.append(rng.choice("abcdefghijklmnopqrstuvwxyz"))
+        parts.append(_surname(rng))
+        dob = _random_date(rng, 1930, 2015)
+        doa = _random_date(rng, 2015, 2025) if rng.random() < 0.8 else None
+        clients.append((client_id, " ".join(parts), dob, doa))
+    return clients
+
+
+def _typo(name: str, rng: random.Random) -> str:
+    """Apply one random keyboard-style edit (substitute, delete, insert, transpose)."""
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    positions = [i for i, ch in enumerate(name) if ch != " "]
+    i = rng.choice(positions)
+    edit = rng.choice(["substitute", "delete", "insert", "transpose"])
+    if edit == "substitute":
+        return name[:i] + rng.choice(letters) + name[i + 1:]
+    if edit == "delete":
+        return name[:i] + name[i + 1:]
+    if edit == "insert":
+        return name[:i] + rng.choice(letters) + name[i:]
+    if i + 1 < len(name) and name[i + 1] != " ":
+        return name[:i] + name[i + 1] + name[i] + name[i + 2:]
+    return name
+
+
+def _ocr_noise(name: str, rng: random.Random) -> str:
+    """Apply one or two OCR character confusions."""
+    noisy = name
+    for _ in range(rng.randint(1, 2)):
+        candidates = [(src, dst) for src, dst in OCR_CONFUSIONS if src in noisy]
+        if not candidates:
+            break
+        src, dst = rng.choice(candidates)
+        index = rng.choice([i for i in range(len(noisy)) if noisy.startswith(src, i)])
+        noisy = noisy[:index] + dst + noisy[index + len(src):]
+    return noisy
+
+
+def generate_queries(
+    clients: List[Tuple[int, str, Optional[date], Optional[date]]],
+    count: int,
+    seed: int = 7
+) -> List[Tuple[str, str, Optional[int]]]:
+    """
+    Generate ``count`` query names as (variant, query_name, expected_client_id).
+
+    Variants cycle through exact, typo, OCR noise, swapped order and absent
+    names (expected_client_id None, correct answer is "no confident match").
+    """
+    rng = random.Random(seed)
+    known = {name for _, name, _, _ in clients}
+    queries = []
+    for i in range(count):
+        variant = QUERY_VARIANTS[i % len(QUERY_VARIANTS)]
+        client_id, name, _, _ = rng.choice(clients)
+        if variant == "exact":
+            queries.append((variant, name, client_id))
+        elif variant == "typo":
+            queries.append((variant, _typo(name, rng), client_id))
+        elif variant == "ocr":
+            queries.append((variant, _ocr_noise(name, rng), client_id))
+        elif variant == "swapped":
+            tokens = name.split()
+            queries.append((variant, " ".join(tokens[-1:] + tokens[:-1]), client_id))
+        else:
+            absent = f"{rng.choice(FIRST_NAMES)} {_surname(rng)}{_surname(rng)}"
+            while absent in known:
+                absent = f"{rng.choice(FIRST_NAMES)} {_surname(rng)}{_surname(rng)}"
+            queries.append((variant, absent, None))
+    return queries
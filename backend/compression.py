@@ -0,0 +1,188 @@
+"""
+Response compression middleware (brotli or gzip, negotiated from Accept-Encoding).
+
+Text-like responses (JSON, CSV, NDJSON, text/*) above a size threshold are
+compressed; streamed responses are compressed chunk by chunk. Brotli is used
+when the client accepts it and the optional ``brotli`` package is installed,
+otherwise gzip. Already-encoded bodies, partial content and binary formats
+(xlsx, parquet) are passed through untouched.
+"""
+import logging
+import os
+import zlib
+from typing import Optional
+from dotenv import load_dotenv
+from pydantic_settings import BaseSettings
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # optional dependency: gzip only
+    brotli = None
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+COMPRESSIBLE_TYPES = ("text/", "application/json", "application/x-ndjson", "application/javascript", "application/xml")
+UNCOMPRESSED_STATUSES = (204, 206, 304)
+
+
+class CompressionSettings(BaseSettings):
+    """Compression configuration."""
+    compression_minimum_size: int = int(os.getenv("COMPRESSION_MINIMUM_SIZE", "1024"))
+    compression_gzip_level: int = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+    compression_brotli_quality: int = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+
+    class Config:
+        env_file = ".env"
+        extra = "ignore"  # Ignore extra fields from .env
+
+
+def brotli_available() -> bool:
+    """Whether brotli compression can be offered."""
+    return brotli is not None
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    Pick the response encoding from an Accept-Encoding header.
+
+    Returns:
+        'br', 'gzip' or None (send uncompressed)
+    """
+    supported = ["br", "gzip"] if brotli is not None else ["gzip"]
+    weights = {}
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[token] = q
+
+    best, best_q = None, 0.0
+    for encoding in supported:  # in order of preference on equal weight
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+class _Compressor:
+    """Streaming compressor for one response body."""
+
+    def __init__(self, encoding: str, settings: CompressionSettings):
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=settings.compression_brotli_quality)
+        else:
+            # wbits=31: gzip container
+            self._zlib = zlib.compressobj(settings.compression_gzip_level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        """Compress a chunk; flush so each chunk can be sent as it is produced."""
+        if self.encoding == "br":
+            out = self._brotli.process(data)
+            return out + (self._brotli.finish() if final else self._brotli.flush())
+        out = self._zlib.compress(data)
+        return out + self._zlib.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing responses with brotli or gzip."""
+
+    def __init__(self, app: ASGIApp, settings: Optional[CompressionSettings] = None):
+        """Wrap an ASGI app."""
+        self.app = app
+        self.settings = settings or CompressionSettings()
+        logger.info(f"🗜️ Response compression: {'brotli, gzip' if brotli is not None else 'gzip (brotli not installed)'}, "
+                    f"minimum {self.settings.compression_minimum_size} bytes")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        await _CompressedResponse(self.app, encoding, self.settings)(scope, receive, send)
+
+
+class _CompressedResponse:
+    """Intercepts one response: decides on the first body chunk whether to compress it."""
+
+    def __init__(self, app: ASGIApp, encoding: str, settings: CompressionSettings):
+        self.app = app
+        self.encoding = encoding
+        self.settings = settings
+        self.send: Send = None
+        self.start: Optional[Message] = None
+        self.compressor: Optional[_Compressor] = None
+        self.passthrough = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        self.send = send
+        await self.app(scope, receive, self.send_wrapper)
+
+    async def send_wrapper(self, message: Message):
+        if message["type"] == "http.response.start":
+            # Held back until the first body chunk shows whether to compress
+            self.start = message
+            return
+        if message["type"] != "http.response.body":
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.passthrough:
+            await self.send(message)
+            return
+        if self.compressor is None:
+            if not self._should_compress(body, more_body):
+                self.passthrough = True
+                await self.send(self.start)
+                await self.send(message)
+                return
+            self.compressor = _Compressor(self.encoding, self.settings)
+            compressed = self.compressor.compress(body, final=not more_body)
+            headers = MutableHeaders(raw=self.start["headers"])
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            if "etag" in headers and not headers["etag"].startswith("W/"):
+                # The encoded bytes differ from the identity representation
+                headers["ETag"] = f"W/{headers['etag']}"
+            if more_body:
+                del headers["Content-Length"]
+            else:
+                headers["Content-Length"] = str(len(compressed))
+            await self.send(self.start)
+            await self.send({"type": "http.response.body", "body": compressed, "more_body": more_body})
+            return
+
+        await self.send({
+            "type": "http.response.body",
+            "body": self.compressor.compress(body, final=not more_body),
+            "more_body": more_body,
+        })
+
+    def _should_compress(self, body: bytes, more_body: bool) -> bool:
+        """Whether this response is worth compressing (decided once, on the first chunk)."""
+        if self.start["status"] in UNCOMPRESSED_STATUSES:
+            return False
+        headers = Headers(raw=self.start["headers"])
+        if "content-encoding" in headers or "content-range" in headers:
+            return False
+        if not headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES):
+            return False
+        # Streamed bodies are compressed whatever the first chunk's size
+        return more_body or len(body) >= self.settings.compression_minimum_size
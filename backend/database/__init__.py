@@ -1,5 +1,5 @@
 """Database package."""
-from .models import Base, ClientProfile, Document, ExtractedField, Match, Mismatch, Export
+from .models import Base, ClientProfile, Document, ExtractedField, Match, Mismatch, Export, BackgroundJob
 from .connection import get_db, engine
 
 __all__ = [
@@ -10,6 +10,7 @@ __all__ = [
     "Match",
     "Mismatch",
     "Export",
+    "BackgroundJob",
     "get_db",
     "engine",
 ]
@@ -0,0 +1,4 @@
+-- Add a functional index for the case-insensitive duplicate check used by
+-- client dataset imports (INSERT ... SELECT ... WHERE NOT EXISTS lower(name))
+
+CREATE INDEX IF NOT EXISTS ix_client_profiles_lower_name ON client_profiles(lower(name));
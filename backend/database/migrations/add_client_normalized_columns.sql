@@ -0,0 +1,11 @@
+-- Add precomputed normalized-name and blocking-key columns to client_profiles
+-- Run this AFTER tables are created, then run `python backfill_client_keys.py`
+-- to populate the columns for rows uploaded before this migration
+
+ALTER TABLE client_profiles ADD COLUMN IF NOT EXISTS normalized_name VARCHAR(255);
+ALTER TABLE client_profiles ADD COLUMN IF NOT EXISTS block_key_first VARCHAR(16);
+ALTER TABLE client_profiles ADD COLUMN IF NOT EXISTS block_key_last VARCHAR(16);
+
+CREATE INDEX IF NOT EXISTS ix_client_profiles_normalized_name ON client_profiles(normalized_name);
+CREATE INDEX IF NOT EXISTS ix_client_profiles_block_key_first ON client_profiles(block_key_first);
+CREATE INDEX IF NOT EXISTS ix_client_profiles_block_key_last ON client_profiles(block_key_last);
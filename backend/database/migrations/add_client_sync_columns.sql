@@ -0,0 +1,29 @@
+-- Add roster-sync columns to client_profiles (POST /clients/upload?mode=sync)
+-- Run this AFTER `python backfill_client_keys.py`: sync keys are derived from normalized_name.
+-- The key/hash expressions must match ClientImportService.SYNC_KEY_SQL / CONTENT_HASH_SQL.
+
+ALTER TABLE client_profiles ADD COLUMN IF NOT EXISTS external_id VARCHAR(255);
+ALTER TABLE client_profiles ADD COLUMN IF NOT EXISTS sync_key VARCHAR(300);
+ALTER TABLE client_profiles ADD COLUMN IF NOT EXISTS content_hash VARCHAR(32);
+
+-- Existing duplicates (same normalized name + DOB): the oldest row owns the key,
+-- the others keep a NULL sync_key and are never touched by syncs
+UPDATE client_profiles c
+SET sync_key = keyed.sync_key
+FROM (
+    SELECT DISTINCT ON (sync_key) id, sync_key
+    FROM (
+        SELECT id, COALESCE('ext:' || external_id, 'nd:' || normalized_name || '|' || COALESCE(dob::text, '')) AS sync_key
+        FROM client_profiles
+        WHERE sync_key IS NULL AND normalized_name IS NOT NULL
+    ) candidates
+    ORDER BY sync_key, id
+) keyed
+WHERE c.id = keyed.id
+  AND NOT EXISTS (SELECT 1 FROM client_profiles e WHERE e.sync_key = keyed.sync_key);
+
+UPDATE client_profiles
+SET content_hash = md5(concat_ws('|', name, COALESCE(dob::text, ''), COALESCE(doa::text, ''), COALESCE(external_id, '')))
+WHERE content_hash IS NULL;
+
+CREATE UNIQUE INDEX IF NOT EXISTS ux_client_profiles_sync_key ON client_profiles(sync_key) WHERE sync_key IS NOT NULL;
@@ -0,0 +1,6 @@
+-- Indexes for the keyset-paginated, filterable document list (GET /documents/?limit=...)
+
+CREATE INDEX IF NOT EXISTS ix_documents_created_at_id ON documents(created_at, id);
+CREATE INDEX IF NOT EXISTS ix_documents_status_created_at_id ON documents(status, created_at, id);
+CREATE INDEX IF NOT EXISTS ix_documents_filename_prefix ON documents(filename varchar_pattern_ops);
+CREATE INDEX IF NOT EXISTS ix_matches_decision_doc_id ON matches(decision, doc_id);
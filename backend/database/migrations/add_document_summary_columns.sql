@@ -0,0 +1,30 @@
+-- Denormalized per-document match summary (decision, score, client, mismatch count)
+-- maintained by document processing and re-matching; backfilled here from existing rows
+
+ALTER TABLE documents ADD COLUMN IF NOT EXISTS match_decision VARCHAR(50);
+ALTER TABLE documents ADD COLUMN IF NOT EXISTS match_score DOUBLE PRECISION;
+ALTER TABLE documents ADD COLUMN IF NOT EXISTS matched_client_id INTEGER;
+ALTER TABLE documents ADD COLUMN IF NOT EXISTS matched_client_name VARCHAR(255);
+ALTER TABLE documents ADD COLUMN IF NOT EXISTS mismatch_count INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE documents ADD COLUMN IF NOT EXISTS summary_updated_at TIMESTAMP;
+
+UPDATE documents d SET
+    match_decision = m.decision,
+    match_score = m.match_score,
+    matched_client_id = m.client_id,
+    matched_client_name = c.name,
+    mismatch_count = (SELECT count(*) FROM mismatches mm WHERE mm.doc_id = d.id),
+    summary_updated_at = now()
+FROM documents target
+LEFT JOIN LATERAL (
+    SELECT decision, match_score, client_id
+    FROM matches
+    WHERE matches.doc_id = target.id
+    ORDER BY matches.id
+    LIMIT 1
+) m ON true
+LEFT JOIN client_profiles c ON c.id = m.client_id
+WHERE d.id = target.id;
+
+CREATE INDEX IF NOT EXISTS ix_documents_matched_client_id ON documents(matched_client_id);
+CREATE INDEX IF NOT EXISTS ix_documents_match_decision_created_at_id ON documents(match_decision, created_at, id);
@@ -0,0 +1,4 @@
+-- Document version, incremented on every status transition and match summary change
+-- (used by long-polling status requests: GET /documents/{id}/status?wait=..&since=<version>)
+
+ALTER TABLE documents ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 0;
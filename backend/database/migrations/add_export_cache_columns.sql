@@ -0,0 +1,8 @@
+-- Add content-addressed cache columns to exports
+-- Rows created before this migration have no content_hash and are pruned
+-- (with their blobs) the next time an export is requested for the document
+
+ALTER TABLE exports ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64);
+ALTER TABLE exports ADD COLUMN IF NOT EXISTS template_version VARCHAR(20);
+
+CREATE INDEX IF NOT EXISTS ix_exports_doc_id_content_hash ON exports(doc_id, content_hash);
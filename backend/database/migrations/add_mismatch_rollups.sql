@@ -0,0 +1,91 @@
+-- Mismatch rate rollups for GET /stats/mismatches
+-- mismatch_checks: fields compared by mismatch detection, per document (retracted on re-match)
+-- mismatch_rollup_deltas: count changes appended by triggers on mismatch_checks, folded into
+--   mismatch_rollups by readers
+-- mismatch_rollups: checked / mismatched counts per month (document upload month), client and field
+
+CREATE TABLE IF NOT EXISTS mismatch_checks (
+    doc_id INTEGER NOT NULL REFERENCES documents(id) ON DELETE CASCADE,
+    field VARCHAR(20) NOT NULL,
+    client_id INTEGER NOT NULL,
+    period DATE NOT NULL,
+    mismatched BOOLEAN NOT NULL,
+    PRIMARY KEY (doc_id, field)
+);
+
+CREATE TABLE IF NOT EXISTS mismatch_rollups (
+    period DATE NOT NULL,
+    client_id INTEGER NOT NULL,
+    field VARCHAR(20) NOT NULL,
+    checked BIGINT NOT NULL DEFAULT 0,
+    mismatched BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (period, client_id, field)
+);
+
+CREATE TABLE IF NOT EXISTS mismatch_rollup_deltas (
+    id BIGSERIAL PRIMARY KEY,
+    period DATE NOT NULL,
+    client_id INTEGER NOT NULL,
+    field VARCHAR(20) NOT NULL,
+    checked INTEGER NOT NULL,
+    mismatched INTEGER NOT NULL
+);
+
+-- Checks recorded or retracted (including by the documents ON DELETE CASCADE)
+-- append their rollup changes; mismatch_checks rows are never updated in place
+CREATE OR REPLACE FUNCTION mismatch_rollup_count_checks() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO mismatch_rollup_deltas (period, client_id, field, checked, mismatched)
+        SELECT period, client_id, field, count(*), count(*) FILTER (WHERE mismatched)
+        FROM new_rows GROUP BY period, client_id, field;
+    ELSE
+        INSERT INTO mismatch_rollup_deltas (period, client_id, field, checked, mismatched)
+        SELECT period, client_id, field, -count(*), -count(*) FILTER (WHERE mismatched)
+        FROM old_rows GROUP BY period, client_id, field;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Backfill from documents processed before this migration (one-time scan; re-running
+-- the migration recomputes). The rollups are written directly, so the triggers are
+-- installed after the backfill.
+-- A field counts as checked when the document has an extracted value and its
+-- matched client has an expected value (or a mismatch was recorded for it).
+LOCK TABLE mismatches, mismatch_checks IN SHARE ROW EXCLUSIVE MODE;
+
+DROP TRIGGER IF EXISTS mismatch_checks_insert ON mismatch_checks;
+DROP TRIGGER IF EXISTS mismatch_checks_delete ON mismatch_checks;
+
+DELETE FROM mismatch_rollup_deltas;
+DELETE FROM mismatch_checks;
+INSERT INTO mismatch_checks (doc_id, field, client_id, period, mismatched)
+SELECT DISTINCT ON (d.id, f.field_name)
+    d.id,
+    f.field_name,
+    m.client_id,
+    CAST(date_trunc('month', coalesce(d.created_at, now())) AS date),
+    EXISTS (SELECT 1 FROM mismatches mm WHERE mm.doc_id = d.id AND mm.field = f.field_name)
+FROM documents d
+JOIN LATERAL (
+    SELECT client_id FROM matches WHERE matches.doc_id = d.id ORDER BY matches.id LIMIT 1
+) m ON true
+JOIN client_profiles c ON c.id = m.client_id
+JOIN extracted_fields f ON f.doc_id = d.id AND f.field_name IN ('dob', 'doa')
+WHERE (
+    coalesce(f.normalized_value, '') <> ''
+    AND ((f.field_name = 'dob' AND c.dob IS NOT NULL) OR (f.field_name = 'doa' AND c.doa IS NOT NULL))
+) OR EXISTS (SELECT 1 FROM mismatches mm WHERE mm.doc_id = d.id AND mm.field = f.field_name)
+ORDER BY d.id, f.field_name, f.id DESC;
+
+DELETE FROM mismatch_rollups;
+INSERT INTO mismatch_rollups (period, client_id, field, checked, mismatched)
+SELECT period, client_id, field, count(*), count(*) FILTER (WHERE mismatched)
+FROM mismatch_checks
+GROUP BY period, client_id, field;
+
+CREATE TRIGGER mismatch_checks_insert AFTER INSERT ON mismatch_checks
+    REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION mismatch_rollup_count_checks();
+CREATE TRIGGER mismatch_checks_delete AFTER DELETE ON mismatch_checks
+    REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION mismatch_rollup_count_checks();
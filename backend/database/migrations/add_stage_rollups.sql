@@ -0,0 +1,16 @@
+-- Per-minute pipeline rollups for GET /stats/timeseries
+-- One row per minute, stage ('ocr', 'extraction', 'matching', 'total') and
+-- outcome ('success', 'failure'), written by the processing pipeline.
+-- histogram holds counts per latency bucket (services/stage_rollups.py LATENCY_BUCKETS_MS,
+-- plus one open-ended bucket).
+
+CREATE TABLE IF NOT EXISTS stage_rollups (
+    bucket_start TIMESTAMP NOT NULL,
+    stage VARCHAR(32) NOT NULL,
+    status VARCHAR(20) NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    total_ms BIGINT NOT NULL DEFAULT 0,
+    max_ms INTEGER NOT NULL DEFAULT 0,
+    histogram INTEGER[] NOT NULL,
+    PRIMARY KEY (bucket_start, stage, status)
+);
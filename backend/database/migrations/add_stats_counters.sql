@@ -0,0 +1,103 @@
+-- Incrementally maintained row counts for GET /stats
+-- Statement-level triggers append count deltas for the documents, matches and
+-- mismatches tables in the writing transaction. Writers only ever insert
+-- deltas, so they never wait on each other's counter rows; readers add the
+-- pending deltas to stats_counters instead of counting tables, and a periodic
+-- job folds them in. database/models.py installs the same triggers from
+-- create_all when they are missing.
+-- Counter names: 'documents', 'documents.<status>', 'matches', 'mismatches'.
+
+CREATE TABLE IF NOT EXISTS stats_counters (
+    name VARCHAR(64) PRIMARY KEY,
+    value BIGINT NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS stats_counter_deltas (
+    id BIGSERIAL PRIMARY KEY,
+    name VARCHAR(64) NOT NULL,
+    value BIGINT NOT NULL
+);
+
+-- Documents: total and per status (status changes move a document between counters)
+CREATE OR REPLACE FUNCTION stats_count_documents() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO stats_counter_deltas (name, value)
+        SELECT name, sum(delta) FROM (
+            SELECT 'documents' AS name, 1 AS delta FROM new_rows
+            UNION ALL SELECT 'documents.' || coalesce(status, 'pending'), 1 FROM new_rows
+        ) deltas GROUP BY name;
+    ELSIF TG_OP = 'DELETE' THEN
+        INSERT INTO stats_counter_deltas (name, value)
+        SELECT name, sum(delta) FROM (
+            SELECT 'documents' AS name, -1 AS delta FROM old_rows
+            UNION ALL SELECT 'documents.' || coalesce(status, 'pending'), -1 FROM old_rows
+        ) deltas GROUP BY name;
+    ELSE
+        -- Only rows whose status changed produce deltas
+        INSERT INTO stats_counter_deltas (name, value)
+        SELECT name, sum(delta) FROM (
+            SELECT 'documents.' || coalesce(n.status, 'pending') AS name, 1 AS delta
+            FROM new_rows n JOIN old_rows o ON o.id = n.id
+            WHERE n.status IS DISTINCT FROM o.status
+            UNION ALL
+            SELECT 'documents.' || coalesce(o.status, 'pending'), -1
+            FROM new_rows n JOIN old_rows o ON o.id = n.id
+            WHERE n.status IS DISTINCT FROM o.status
+        ) deltas GROUP BY name HAVING sum(delta) <> 0;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Plain row counts; the counter name is the trigger argument
+CREATE OR REPLACE FUNCTION stats_count_rows() RETURNS trigger AS $$
+DECLARE
+    delta BIGINT;
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        SELECT count(*) INTO delta FROM new_rows;
+    ELSE
+        SELECT -count(*) INTO delta FROM old_rows;
+    END IF;
+    IF delta <> 0 THEN
+        INSERT INTO stats_counter_deltas (name, value) VALUES (TG_ARGV[0], delta);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Block writers while the triggers are installed and the counters seeded
+LOCK TABLE documents, matches, mismatches IN SHARE ROW EXCLUSIVE MODE;
+
+DROP TRIGGER IF EXISTS stats_documents_insert ON documents;
+DROP TRIGGER IF EXISTS stats_documents_update ON documents;
+DROP TRIGGER IF EXISTS stats_documents_delete ON documents;
+DROP TRIGGER IF EXISTS stats_matches_insert ON matches;
+DROP TRIGGER IF EXISTS stats_matches_delete ON matches;
+DROP TRIGGER IF EXISTS stats_mismatches_insert ON mismatches;
+DROP TRIGGER IF EXISTS stats_mismatches_delete ON mismatches;
+
+CREATE TRIGGER stats_documents_insert AFTER INSERT ON documents
+    REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION stats_count_documents();
+CREATE TRIGGER stats_documents_update AFTER UPDATE ON documents
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION stats_count_documents();
+CREATE TRIGGER stats_documents_delete AFTER DELETE ON documents
+    REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION stats_count_documents();
+CREATE TRIGGER stats_matches_insert AFTER INSERT ON matches
+    REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION stats_count_rows('matches');
+CREATE TRIGGER stats_matches_delete AFTER DELETE ON matches
+    REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION stats_count_rows('matches');
+CREATE TRIGGER stats_mismatches_insert AFTER INSERT ON mismatches
+    REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION stats_count_rows('mismatches');
+CREATE TRIGGER stats_mismatches_delete AFTER DELETE ON mismatches
+    REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION stats_count_rows('mismatches');
+
+-- Seed from the current rows (re-running the migration recounts)
+DELETE FROM stats_counter_deltas;
+DELETE FROM stats_counters;
+INSERT INTO stats_counters (name, value)
+SELECT 'documents', count(*) FROM documents
+UNION ALL SELECT 'documents.' || coalesce(status, 'pending'), count(*) FROM documents GROUP BY 1
+UNION ALL SELECT 'matches', count(*) FROM matches
+UNION ALL SELECT 'mismatches', count(*) FROM mismatches;
@@ -2,7 +2,8 @@
 Database models for the document extraction system.
 """
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Float, Text, Date, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, Integer, BigInteger, String, Float, Text, Date, DateTime, Boolean, ForeignKey, UniqueConstraint, Index, DDL, event
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -16,11 +17,27 @@ class ClientProfile(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(255), nullable=False, index=True)
+    # Precomputed at upload time (see services.normalization.client_name_columns)
+    normalized_name = Column(String(255), nullable=True, index=True)
+    block_key_first = Column(String(16), nullable=True, index=True)
+    block_key_last = Column(String(16), nullable=True, index=True)
     dob = Column(Date, nullable=True)
     doa = Column(Date, nullable=True)
+    # Identifier from the uploaded roster, when it has one
+    external_id = Column(String(255), nullable=True)
+    # Upsert key for roster syncs and hash of the synced content
+    # (see services.client_import_service.ClientImportService)
+    sync_key = Column(String(300), nullable=True)
+    content_hash = Column(String(32), nullable=True)
     created_at = Column(DateTime, default=func.now())
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
 
+    __table_args__ = (
+        # Case-insensitive duplicate check during dataset imports
+        Index('ix_client_profiles_lower_name', func.lower(name)),
+        Index('ux_client_profiles_sync_key', sync_key, unique=True, postgresql_where=sync_key.isnot(None)),
+    )
+
 
 class Document(Base):
     """Document model."""
@@ -32,6 +49,16 @@ class Document(Base):
     status = Column(String(50), default="pending", index=True)
     created_at = Column(DateTime, default=func.now())
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+    # Incremented on every status transition and match summary change
+    version = Column(Integer, nullable=False, default=0, server_default='0')
+
+    # Denormalized match summary (see services/document_summary.py)
+    match_decision = Column(String(50), nullable=True)
+    match_score = Column(Float, nullable=True)
+    matched_client_id = Column(Integer, nullable=True, index=True)
+    matched_client_name = Column(String(255), nullable=True)
+    mismatch_count = Column(Integer, nullable=False, default=0, server_default='0')
+    summary_updated_at = Column(DateTime, nullable=True)
 
     # Relationships
     extracted_fields = relationship("ExtractedField", back_populates="document", cascade="all, delete-orphan")
@@ -39,6 +66,15 @@ class Document(Base):
     mismatches = relationship("Mismatch", back_populates="document", cascade="all, delete-orphan")
     exports = relationship("Export", back_populates="document", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # Keyset pagination of the document list, newest first (optionally within one status)
+        Index('ix_documents_created_at_id', created_at, id),
+        Index('ix_documents_status_created_at_id', status, created_at, id),
+        Index('ix_documents_match_decision_created_at_id', match_decision, created_at, id),
+        # Filename prefix search (LIKE 'prefix%')
+        Index('ix_documents_filename_prefix', filename, postgresql_ops={'filename': 'varchar_pattern_ops'}),
+    )
+
 
 class ExtractedField(Base):
     """Extracted field from OCR."""
@@ -78,6 +114,7 @@ class Match(Base):
 
     __table_args__ = (
         UniqueConstraint('doc_id', 'client_id', name='uq_matches_doc_client'),
+        Index('ix_matches_decision_doc_id', 'decision', 'doc_id'),
     )
 
 
@@ -106,8 +143,235 @@ class Export(Base):
     gcs_uri = Column(String(512), nullable=False)
     signed_url = Column(String(1024), nullable=True)
     expires_at = Column(DateTime, nullable=True)
+    # Hash of the report content + template version the artifact was built from
+    content_hash = Column(String(64), nullable=True)
+    template_version = Column(String(20), nullable=True)
     created_at = Column(DateTime, default=func.now())
 
     # Relationships
     document = relationship("Document", back_populates="exports")
 
+    __table_args__ = (
+        Index('ix_exports_doc_id_content_hash', 'doc_id', 'content_hash'),
+    )
+
+
+class BackgroundJob(Base):
+    """Long-running background job (client re-matching, imports, ...)."""
+    __tablename__ = "background_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    job_type = Column(String(50), nullable=False, index=True)  # e.g. 'rematch'
+    status = Column(String(50), default="pending", index=True)  # 'pending', 'running', 'completed', 'failed'
+    total = Column(Integer, default=0)
+    processed = Column(Integer, default=0)
+    message = Column(Text, nullable=True)
+    result = Column(Text, nullable=True)  # JSON-encoded job result
+    created_at = Column(DateTime, default=func.now())
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+
+
+class StatsCounter(Base):
+    """Row count behind GET /stats ('documents', 'documents.<status>', 'matches', 'mismatches')."""
+    __tablename__ = "stats_counters"
+
+    name = Column(String(64), primary_key=True)
+    value = Column(BigInteger, nullable=False, default=0)
+
+
+class StatsCounterDelta(Base):
+    """Pending change to a stats counter, appended by triggers and folded in by a periodic job."""
+    __tablename__ = "stats_counter_deltas"
+
+    id = Column(BigInteger, primary_key=True)
+    name = Column(String(64), nullable=False)
+    value = Column(BigInteger, nullable=False)
+
+
+class StageRollup(Base):
+    """Per-minute processing counts and latency histogram of one pipeline stage and outcome."""
+    __tablename__ = "stage_rollups"
+
+    bucket_start = Column(DateTime, primary_key=True)  # start of the minute
+    stage = Column(String(32), primary_key=True)  # 'ocr', 'extraction', 'matching', 'total'
+    status = Column(String(20), primary_key=True)  # 'success', 'failure'
+    count = Column(Integer, nullable=False, default=0)
+    total_ms = Column(BigInteger, nullable=False, default=0)
+    max_ms = Column(Integer, nullable=False, default=0)
+    # Counts per latency bucket (services.stage_rollups.LATENCY_BUCKETS_MS, last one open-ended)
+    histogram = Column(ARRAY(Integer), nullable=False)
+
+
+class MismatchCheck(Base):
+    """
+    Field comparison made by mismatch detection for one document (one row per checked field).
+
+    Records what the document contributed to the mismatch rollups, so the
+    contribution can be retracted when the document is re-matched or deleted
+    (triggers append the rollup deltas, see MISMATCH_CHECK_TRIGGERS_SQL).
+    """
+    __tablename__ = "mismatch_checks"
+
+    doc_id = Column(Integer, ForeignKey("documents.id", ondelete="CASCADE"), primary_key=True)
+    field = Column(String(20), primary_key=True)  # 'dob', 'doa'
+    client_id = Column(Integer, nullable=False)
+    period = Column(Date, nullable=False)  # first day of the document's upload month
+    mismatched = Column(Boolean, nullable=False)
+
+
+class MismatchRollup(Base):
+    """Checked and mismatched field counts per month, client and field."""
+    __tablename__ = "mismatch_rollups"
+
+    period = Column(Date, primary_key=True)
+    client_id = Column(Integer, primary_key=True)
+    field = Column(String(20), primary_key=True)
+    checked = Column(BigInteger, nullable=False, default=0)
+    mismatched = Column(BigInteger, nullable=False, default=0)
+
+
+class MismatchRollupDelta(Base):
+    """Pending change to a mismatch rollup, appended by writers and folded in by readers."""
+    __tablename__ = "mismatch_rollup_deltas"
+
+    id = Column(BigInteger, primary_key=True)
+    period = Column(Date, nullable=False)
+    client_id = Column(Integer, nullable=False)
+    field = Column(String(20), nullable=False)
+    checked = Column(Integer, nullable=False)
+    mismatched = Column(Integer, nullable=False)
+
+
+# Same function and triggers as database/migrations/add_mismatch_rollups.sql,
+# installed when create_all creates mismatch_checks
+MISMATCH_CHECK_TRIGGERS_SQL = """
+CREATE OR REPLACE FUNCTION mismatch_rollup_count_checks() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO mismatch_rollup_deltas (period, client_id, field, checked, mismatched)
+        SELECT period, client_id, field, count(*), count(*) FILTER (WHERE mismatched)
+        FROM new_rows GROUP BY period, client_id, field;
+    ELSE
+        INSERT INTO mismatch_rollup_deltas (period, client_id, field, checked, mismatched)
+        SELECT period, client_id, field, -count(*), -count(*) FILTER (WHERE mismatched)
+        FROM old_rows GROUP BY period, client_id, field;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS mismatch_checks_insert ON mismatch_checks;
+DROP TRIGGER IF EXISTS mismatch_checks_delete ON mismatch_checks;
+CREATE TRIGGER mismatch_checks_insert AFTER INSERT ON mismatch_checks
+    REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION mismatch_rollup_count_checks();
+CREATE TRIGGER mismatch_checks_delete AFTER DELETE ON mismatch_checks
+    REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION mismatch_rollup_count_checks();
+"""
+
+event.listen(
+    MismatchCheck.__table__, "after_create",
+    DDL(MISMATCH_CHECK_TRIGGERS_SQL).execute_if(dialect="postgresql")
+)
+
+
+# Same functions and triggers as database/migrations/add_stats_counters.sql,
+# installed (and the counters seeded) by create_all when they are missing
+STATS_COUNTER_TRIGGERS_SQL = """
+-- Documents: total and per status (status changes move a document between counters)
+CREATE OR REPLACE FUNCTION stats_count_documents() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO stats_counter_deltas (name, value)
+        SELECT name, sum(delta) FROM (
+            SELECT 'documents' AS name, 1 AS delta FROM new_rows
+            UNION ALL SELECT 'documents.' || coalesce(status, 'pending'), 1 FROM new_rows
+        ) deltas GROUP BY name;
+    ELSIF TG_OP = 'DELETE' THEN
+        INSERT INTO stats_counter_deltas (name, value)
+        SELECT name, sum(delta) FROM (
+            SELECT 'documents' AS name, -1 AS delta FROM old_rows
+            UNION ALL SELECT 'documents.' || coalesce(status, 'pending'), -1 FROM old_rows
+        ) deltas GROUP BY name;
+    ELSE
+        -- Only rows whose status changed produce deltas
+        INSERT INTO stats_counter_deltas (name, value)
+        SELECT name, sum(delta) FROM (
+            SELECT 'documents.' || coalesce(n.status, 'pending') AS name, 1 AS delta
+            FROM new_rows n JOIN old_rows o ON o.id = n.id
+            WHERE n.status IS DISTINCT FROM o.status
+            UNION ALL
+            SELECT 'documents.' || coalesce(o.status, 'pending'), -1
+            FROM new_rows n JOIN old_rows o ON o.id = n.id
+            WHERE n.status IS DISTINCT FROM o.status
+        ) deltas GROUP BY name HAVING sum(delta) <> 0;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Plain row counts; the counter name is the trigger argument
+CREATE OR REPLACE FUNCTION stats_count_rows() RETURNS trigger AS $$
+DECLARE
+    delta BIGINT;
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        SELECT count(*) INTO delta FROM new_rows;
+    ELSE
+        SELECT -count(*) INTO delta FROM old_rows;
+    END IF;
+    IF delta <> 0 THEN
+        INSERT INTO stats_counter_deltas (name, value) VALUES (TG_ARGV[0], delta);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Block writers while the triggers are installed and the counters seeded
+LOCK TABLE documents, matches, mismatches IN SHARE ROW EXCLUSIVE MODE;
+
+DROP TRIGGER IF EXISTS stats_documents_insert ON documents;
+DROP TRIGGER IF EXISTS stats_documents_update ON documents;
+DROP TRIGGER IF EXISTS stats_documents_delete ON documents;
+DROP TRIGGER IF EXISTS stats_matches_insert ON matches;
+DROP TRIGGER IF EXISTS stats_matches_delete ON matches;
+DROP TRIGGER IF EXISTS stats_mismatches_insert ON mismatches;
+DROP TRIGGER IF EXISTS stats_mismatches_delete ON mismatches;
+
+CREATE TRIGGER stats_documents_insert AFTER INSERT ON documents
+    REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION stats_count_documents();
+CREATE TRIGGER stats_documents_update AFTER UPDATE ON documents
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION stats_count_documents();
+CREATE TRIGGER stats_documents_delete AFTER DELETE ON documents
+    REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION stats_count_documents();
+CREATE TRIGGER stats_matches_insert AFTER INSERT ON matches
+    REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION stats_count_rows('matches');
+CREATE TRIGGER stats_matches_delete AFTER DELETE ON matches
+    REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION stats_count_rows('matches');
+CREATE TRIGGER stats_mismatches_insert AFTER INSERT ON mismatches
+    REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION stats_count_rows('mismatches');
+CREATE TRIGGER stats_mismatches_delete AFTER DELETE ON mismatches
+    REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION stats_count_rows('mismatches');
+
+-- Seed from the current rows
+DELETE FROM stats_counter_deltas;
+DELETE FROM stats_counters;
+INSERT INTO stats_counters (name, value)
+SELECT 'documents', count(*) FROM documents
+UNION ALL SELECT 'documents.' || coalesce(status, 'pending'), count(*) FROM documents GROUP BY 1
+UNION ALL SELECT 'matches', count(*) FROM matches
+UNION ALL SELECT 'mismatches', count(*) FROM mismatches;
+"""
+
+
+def _stats_triggers_missing(ddl, target, bind, **kw) -> bool:
+    """Whether the stats counter triggers still have to be installed."""
+    return not bind.exec_driver_sql(
+        "SELECT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'stats_documents_insert')"
+    ).scalar()
+
+
+# On the metadata: the triggers are on documents, matches and mismatches, which must exist first
+event.listen(
+    Base.metadata, "after_create",
+    DDL(STATS_COUNTER_TRIGGERS_SQL).execute_if(dialect="postgresql", callable_=_stats_triggers_missing)
+)
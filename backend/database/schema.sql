@@ -4,8 +4,14 @@
 CREATE TABLE IF NOT EXISTS client_profiles (
     id SERIAL PRIMARY KEY,
     name VARCHAR(255) NOT NULL,
+    normalized_name VARCHAR(255),
+    block_key_first VARCHAR(16),
+    block_key_last VARCHAR(16),
     dob DATE,
     doa DATE,
+    external_id VARCHAR(255),
+    sync_key VARCHAR(300),
+    content_hash VARCHAR(32),
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
@@ -17,7 +23,14 @@ CREATE TABLE IF NOT EXISTS documents (
     gcs_uri VARCHAR(512),
     status VARCHAR(50) DEFAULT 'pending',
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    version INTEGER NOT NULL DEFAULT 0,
+    match_decision VARCHAR(50),
+    match_score FLOAT,
+    matched_client_id INTEGER,
+    matched_client_name VARCHAR(255),
+    mismatch_count INTEGER NOT NULL DEFAULT 0,
+    summary_updated_at TIMESTAMP
 );
 
 -- Extracted fields table
@@ -60,9 +73,88 @@ CREATE TABLE IF NOT EXISTS exports (
     gcs_uri VARCHAR(512) NOT NULL,
     signed_url VARCHAR(1024),
     expires_at TIMESTAMP,
+    content_hash VARCHAR(64),
+    template_version VARCHAR(20),
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Background jobs table (client re-matching, imports, ...)
+CREATE TABLE IF NOT EXISTS background_jobs (
+    id SERIAL PRIMARY KEY,
+    job_type VARCHAR(50) NOT NULL,
+    status VARCHAR(50) DEFAULT 'pending', -- 'pending', 'running', 'completed', 'failed'
+    total INTEGER DEFAULT 0,
+    processed INTEGER DEFAULT 0,
+    message TEXT,
+    result TEXT, -- JSON-encoded job result
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Per-minute pipeline rollups (counts and latency histogram per stage and outcome)
+CREATE TABLE IF NOT EXISTS stage_rollups (
+    bucket_start TIMESTAMP NOT NULL,
+    stage VARCHAR(32) NOT NULL, -- 'ocr', 'extraction', 'matching', 'total'
+    status VARCHAR(20) NOT NULL, -- 'success', 'failure'
+    count INTEGER NOT NULL DEFAULT 0,
+    total_ms BIGINT NOT NULL DEFAULT 0,
+    max_ms INTEGER NOT NULL DEFAULT 0,
+    histogram INTEGER[] NOT NULL,
+    PRIMARY KEY (bucket_start, stage, status)
+);
+
+-- Mismatch rate rollups (checks per document, pending deltas, counts per month/client/field)
+CREATE TABLE IF NOT EXISTS mismatch_checks (
+    doc_id INTEGER NOT NULL REFERENCES documents(id) ON DELETE CASCADE,
+    field VARCHAR(20) NOT NULL,
+    client_id INTEGER NOT NULL,
+    period DATE NOT NULL,
+    mismatched BOOLEAN NOT NULL,
+    PRIMARY KEY (doc_id, field)
+);
+
+CREATE TABLE IF NOT EXISTS mismatch_rollups (
+    period DATE NOT NULL,
+    client_id INTEGER NOT NULL,
+    field VARCHAR(20) NOT NULL,
+    checked BIGINT NOT NULL DEFAULT 0,
+    mismatched BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (period, client_id, field)
+);
+
+CREATE TABLE IF NOT EXISTS mismatch_rollup_deltas (
+    id BIGSERIAL PRIMARY KEY,
+    period DATE NOT NULL,
+    client_id INTEGER NOT NULL,
+    field VARCHAR(20) NOT NULL,
+    checked INTEGER NOT NULL,
+    mismatched INTEGER NOT NULL
+);
+
+-- Checks recorded or retracted (including by the documents ON DELETE CASCADE)
+-- append their rollup changes; mismatch_checks rows are never updated in place
+CREATE OR REPLACE FUNCTION mismatch_rollup_count_checks() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO mismatch_rollup_deltas (period, client_id, field, checked, mismatched)
+        SELECT period, client_id, field, count(*), count(*) FILTER (WHERE mismatched)
+        FROM new_rows GROUP BY period, client_id, field;
+    ELSE
+        INSERT INTO mismatch_rollup_deltas (period, client_id, field, checked, mismatched)
+        SELECT period, client_id, field, -count(*), -count(*) FILTER (WHERE mismatched)
+        FROM old_rows GROUP BY period, client_id, field;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS mismatch_checks_insert ON mismatch_checks;
+DROP TRIGGER IF EXISTS mismatch_checks_delete ON mismatch_checks;
+CREATE TRIGGER mismatch_checks_insert AFTER INSERT ON mismatch_checks
+    REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION mismatch_rollup_count_checks();
+CREATE TRIGGER mismatch_checks_delete AFTER DELETE ON mismatch_checks
+    REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION mismatch_rollup_count_checks();
+
 -- Indexes for better query performance
 CREATE INDEX IF NOT EXISTS idx_documents_status ON documents(status);
 CREATE INDEX IF NOT EXISTS idx_extracted_fields_doc_id ON extracted_fields(doc_id);
@@ -70,4 +162,110 @@ CREATE INDEX IF NOT EXISTS idx_matches_doc_id ON matches(doc_id);
 CREATE INDEX IF NOT EXISTS idx_matches_client_id ON matches(client_id);
 CREATE INDEX IF NOT EXISTS idx_mismatches_doc_id ON mismatches(doc_id);
 CREATE INDEX IF NOT EXISTS idx_client_profiles_name ON client_profiles(name);
+CREATE INDEX IF NOT EXISTS ix_client_profiles_normalized_name ON client_profiles(normalized_name);
+CREATE INDEX IF NOT EXISTS ix_client_profiles_block_key_first ON client_profiles(block_key_first);
+CREATE INDEX IF NOT EXISTS ix_client_profiles_block_key_last ON client_profiles(block_key_last);
+CREATE INDEX IF NOT EXISTS ix_client_profiles_lower_name ON client_profiles(lower(name));
+CREATE UNIQUE INDEX IF NOT EXISTS ux_client_profiles_sync_key ON client_profiles(sync_key) WHERE sync_key IS NOT NULL;
+CREATE INDEX IF NOT EXISTS ix_exports_doc_id_content_hash ON exports(doc_id, content_hash);
+CREATE INDEX IF NOT EXISTS ix_documents_created_at_id ON documents(created_at, id);
+CREATE INDEX IF NOT EXISTS ix_documents_status_created_at_id ON documents(status, created_at, id);
+CREATE INDEX IF NOT EXISTS ix_documents_filename_prefix ON documents(filename varchar_pattern_ops);
+CREATE INDEX IF NOT EXISTS ix_matches_decision_doc_id ON matches(decision, doc_id);
+CREATE INDEX IF NOT EXISTS ix_documents_matched_client_id ON documents(matched_client_id);
+CREATE INDEX IF NOT EXISTS ix_documents_match_decision_created_at_id ON documents(match_decision, created_at, id);
+CREATE INDEX IF NOT EXISTS ix_background_jobs_job_type ON background_jobs(job_type);
+CREATE INDEX IF NOT EXISTS ix_background_jobs_status ON background_jobs(status);
+
+-- Row counts for GET /stats, maintained by statement-level triggers
+-- (writers append deltas; readers add them to stats_counters, a periodic job folds them in)
+CREATE TABLE IF NOT EXISTS stats_counters (
+    name VARCHAR(64) PRIMARY KEY,
+    value BIGINT NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS stats_counter_deltas (
+    id BIGSERIAL PRIMARY KEY,
+    name VARCHAR(64) NOT NULL,
+    value BIGINT NOT NULL
+);
+
+-- Documents: total and per status (status changes move a document between counters)
+CREATE OR REPLACE FUNCTION stats_count_documents() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO stats_counter_deltas (name, value)
+        SELECT name, sum(delta) FROM (
+            SELECT 'documents' AS name, 1 AS delta FROM new_rows
+            UNION ALL SELECT 'documents.' || coalesce(status, 'pending'), 1 FROM new_rows
+        ) deltas GROUP BY name;
+    ELSIF TG_OP = 'DELETE' THEN
+        INSERT INTO stats_counter_deltas (name, value)
+        SELECT name, sum(delta) FROM (
+            SELECT 'documents' AS name, -1 AS delta FROM old_rows
+            UNION ALL SELECT 'documents.' || coalesce(status, 'pending'), -1 FROM old_rows
+        ) deltas GROUP BY name;
+    ELSE
+        -- Only rows whose status changed produce deltas
+        INSERT INTO stats_counter_deltas (name, value)
+        SELECT name, sum(delta) FROM (
+            SELECT 'documents.' || coalesce(n.status, 'pending') AS name, 1 AS delta
+            FROM new_rows n JOIN old_rows o ON o.id = n.id
+            WHERE n.status IS DISTINCT FROM o.status
+            UNION ALL
+            SELECT 'documents.' || coalesce(o.status, 'pending'), -1
+            FROM new_rows n JOIN old_rows o ON o.id = n.id
+            WHERE n.status IS DISTINCT FROM o.status
+        ) deltas GROUP BY name HAVING sum(delta) <> 0;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Plain row counts; the counter name is the trigger argument
+CREATE OR REPLACE FUNCTION stats_count_rows() RETURNS trigger AS $$
+DECLARE
+    delta BIGINT;
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        SELECT count(*) INTO delta FROM new_rows;
+    ELSE
+        SELECT -count(*) INTO delta FROM old_rows;
+    END IF;
+    IF delta <> 0 THEN
+        INSERT INTO stats_counter_deltas (name, value) VALUES (TG_ARGV[0], delta);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS stats_documents_insert ON documents;
+DROP TRIGGER IF EXISTS stats_documents_update ON documents;
+DROP TRIGGER IF EXISTS stats_documents_delete ON documents;
+DROP TRIGGER IF EXISTS stats_matches_insert ON matches;
+DROP TRIGGER IF EXISTS stats_matches_delete ON matches;
+DROP TRIGGER IF EXISTS stats_mismatches_insert ON mismatches;
+DROP TRIGGER IF EXISTS stats_mismatches_delete ON mismatches;
+
+CREATE TRIGGER stats_documents_insert AFTER INSERT ON documents
+    REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION stats_count_documents();
+CREATE TRIGGER stats_documents_update AFTER UPDATE ON documents
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION stats_count_documents();
+CREATE TRIGGER stats_documents_delete AFTER DELETE ON documents
+    REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION stats_count_documents();
+CREATE TRIGGER stats_matches_insert AFTER INSERT ON matches
+    REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION stats_count_rows('matches');
+CREATE TRIGGER stats_matches_delete AFTER DELETE ON matches
+    REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION stats_count_rows('matches');
+CREATE TRIGGER stats_mismatches_insert AFTER INSERT ON mismatches
+    REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION stats_count_rows('mismatches');
+CREATE TRIGGER stats_mismatches_delete AFTER DELETE ON mismatches
+    REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION stats_count_rows('mismatches');
 
+-- Seed from the current rows
+INSERT INTO stats_counters (name, value)
+SELECT 'documents', count(*) FROM documents
+UNION ALL SELECT 'documents.' || coalesce(status, 'pending'), count(*) FROM documents GROUP BY 1
+UNION ALL SELECT 'matches', count(*) FROM matches
+UNION ALL SELECT 'mismatches', count(*) FROM mismatches
+ON CONFLICT (name) DO NOTHING;
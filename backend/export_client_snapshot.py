@@ -0,0 +1,29 @@
+"""
+Script to export the client dataset into the shared memory-mapped snapshot.
+"""
+from database.connection import SessionLocal
+from services.client_snapshot import client_snapshot_service
+import sys
+
+
+def export_snapshot():
+    """Export client_profiles and publish a new snapshot version."""
+    if not client_snapshot_service.enabled:
+        print("CLIENT_SNAPSHOT_DIR is not set", file=sys.stderr)
+        return 1
+
+    db = SessionLocal()
+    try:
+        print(f"Exporting client snapshot to {client_snapshot_service.snapshot_dir}...")
+        version = client_snapshot_service.export(db)
+        print(f"Published client snapshot v{version}")
+        return 0
+    except Exception as e:
+        print(f"Error exporting client snapshot: {e}", file=sys.stderr)
+        return 1
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(export_snapshot())
@@ -5,6 +5,7 @@ import os
 import asyncio
 import logging
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 
@@ -16,11 +17,13 @@ log_level = os.getenv("LOG_LEVEL", "INFO")
 setup_logging(log_level=log_level)
 
 # Now import routes and other modules
-from routes import documents_router, clients_router, exports_router, matches_router, stats_router
+from routes import documents_router, clients_router, exports_router, matches_router, stats_router, jobs_router
 from routes.auth import router as auth_router
 from routes.websocket import router as websocket_router, process_message_queue
 from database.models import Base
 from database.connection import engine
+from services.stats_service import run_counter_compaction
+from compression import CompressionMiddleware
 
 # Create logger for this module
 logger = logging.getLogger(__name__)
@@ -47,7 +50,9 @@ except Exception as e:
 app = FastAPI(
     title="Medical/Billing Document Date Mismatch Detection System",
     description="MVP system for detecting date mismatches in medical/billing documents",
-    version="1.0.0"
+    version="1.0.0",
+    # orjson: faster serialization, datetimes serialized natively
+    default_response_class=ORJSONResponse
 )
 
 # Configure CORS based on environment
@@ -72,6 +77,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress JSON/CSV responses (brotli when installed and accepted, else gzip)
+app.add_middleware(CompressionMiddleware)
+
 # Add request logging middleware
 @app.middleware("http")
 async def log_requests(request, call_next):
@@ -100,6 +108,7 @@ app.include_router(clients_router)
 app.include_router(exports_router)
 app.include_router(matches_router)
 app.include_router(stats_router)
+app.include_router(jobs_router)
 app.include_router(websocket_router)
 
 
@@ -108,6 +117,7 @@ async def startup_event():
     """Startup event to initialize background tasks."""
     logger.info("Starting up application...")
     asyncio.create_task(process_message_queue())
+    asyncio.create_task(run_counter_compaction())
     logger.info("Background tasks initialized")
 
 
@@ -123,10 +133,17 @@ def root():
             "list_documents": "GET /documents/",
             "document_status": "GET /documents/{id}/status",
             "document_details": "GET /documents/{id}",
+            "document_full": "GET /documents/{id}/full",
             "extracted_fields": "GET /documents/{id}/extracted-fields",
             "get_export": "GET /exports/{doc_id}",
+            "batch_export": "GET /exports/batch",
+            "bulk_export": "GET /exports/bulk/{entity}",
             "get_match": "GET /matches/{doc_id}",
-            "get_stats": "GET /stats/"
+            "simulate_thresholds": "POST /matches/simulate",
+            "get_stats": "GET /stats/",
+            "stats_timeseries": "GET /stats/timeseries?from=&to=&bucket=hour",
+            "stats_mismatches": "GET /stats/mismatches?group_by=month,client,field",
+            "get_job": "GET /jobs/{job_id}"
         }
     }
 
@@ -4,6 +4,7 @@ from .clients import router as clients_router
 from .exports import router as exports_router
 from .matches import router as matches_router
 from .stats import router as stats_router
+from .jobs import router as jobs_router
 from .auth import router as auth_router
 
 __all__ = [
@@ -12,6 +13,7 @@ __all__ = [
     "exports_router",
     "matches_router",
     "stats_router",
+    "jobs_router",
     "auth_router",
 ]
 
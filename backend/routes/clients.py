@@ -1,34 +1,54 @@
 """
 Client dataset upload routes.
 """
-from fastapi import APIRouter, UploadFile, File, Depends, HTTPException
+from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, BackgroundTasks
 from sqlalchemy.orm import Session
-from sqlalchemy import func
 from database.connection import get_db
-from database.models import ClientProfile
+from services.client_import_service import (
+    ClientImportService,
+    first_new_client_id,
+    queue_import_follow_ups,
+    run_client_import_job,
+)
+from services.job_service import JobService
+from services.rematch_service import run_rematch_job
 from auth import get_current_user
-import pandas as pd
-from io import BytesIO
-from datetime import datetime
-from dateutil import parser as date_parser
 import logging
+import shutil
+import tempfile
 import traceback
 
 router = APIRouter(prefix="/clients", tags=["clients"])
 logger = logging.getLogger(__name__)
 
+job_service = JobService()
+client_import_service = ClientImportService()
+
 
 @router.post("/upload")
-async def upload_client_dataset(
+def upload_client_dataset(
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
+    mode: str = "skip",
+    background: bool = False,
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user)
 ):
     """
     Upload client dataset (CSV or XLSX).
     
-    Expected columns: name, dob, doa (optional)
-    Optimized for large files (4000+ rows) using bulk operations.
+    Expected columns: name, dob, doa (optional), external/client ID (optional)
+    The file is streamed in chunks; rows are cleaned and parsed column-wise,
+    then bulk-loaded with COPY. The response includes per-stage timings.
+    
+    Modes:
+    - skip (default): insert new clients, skip names that already exist
+    - sync: upsert on external ID (or normalized name + DOB); existing clients
+      are updated only when their content changed. Reports inserted/updated/unchanged.
+    
+    With background=true the file is saved and imported by a background job; the
+    response returns the job ID immediately. Poll GET /jobs/{job_id} or listen on
+    /ws/status for progress (rows parsed, rejected, inserted).
     """
     # Validate file type
     file_ext = '.' + file.filename.split('.')[-1].lower() if '.' in file.filename else ''
@@ -39,173 +59,41 @@ async def upload_client_dataset(
             detail="Unsupported file type. Allowed: CSV, XLSX, XLS"
         )
     
+    if mode not in ClientImportService.MODES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid import mode '{mode}'. Allowed: {', '.join(ClientImportService.MODES)}"
+        )
+    
+    if background:
+        return _queue_import_job(background_tasks, file, file_ext, mode, db)
+    
     try:
         logger.info(f"📤 Starting dataset upload: {file.filename} ({file_ext})")
         
-        # Read file content
-        file_content = await file.read()
-        file_size_mb = len(file_content) / (1024 * 1024)
-        logger.info(f"📊 File size: {file_size_mb:.2f} MB")
-        
-        # Parse based on file type
-        logger.info("📖 Parsing file...")
-        if file_ext == '.csv':
-            try:
-                df = pd.read_csv(BytesIO(file_content), encoding='utf-8')
-            except UnicodeDecodeError:
-                logger.info("⚠️ UTF-8 failed, trying Latin-1...")
-                df = pd.read_csv(BytesIO(file_content), encoding='latin-1')
-        else:
-            df = pd.read_excel(BytesIO(file_content), engine='openpyxl')
-        
-        logger.info(f"✅ Parsed {len(df)} rows, {len(df.columns)} columns")
+        # The upload is spooled to disk by the server; stream it from there
+        if file.size is not None:
+            logger.info(f"📊 File size: {file.size / (1024 * 1024):.2f} MB")
         
-        # Normalize column names (case-insensitive, strip whitespace, replace spaces with underscores)
-        df.columns = df.columns.str.strip().str.lower().str.replace(' ', '_')
-        logger.info(f"📋 Columns found: {', '.join(df.columns.tolist())}")
+        min_new_client_id = first_new_client_id(db)
         
-        # Map common name column variations to standard 'name' column
-        name_column_variations = [
-            'name', 'client_name', 'patient_name', 'full_name', 
-            'clientname', 'patientname', 'fullname'
-        ]
-        
-        # Find the name column (check variations)
-        name_column = None
-        for col in df.columns:
-            if col in name_column_variations:
-                name_column = col
-                break
-        
-        if not name_column:
-            # Try partial match (contains 'name' but not 'first' or 'last')
-            for col in df.columns:
-                if 'name' in col and 'first' not in col and 'last' not in col:
-                    name_column = col
-                    logger.info(f"✅ Found name column by partial match: {col}")
-                    break
-        
-        if not name_column:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Could not find name column. Expected one of: {', '.join(name_column_variations)}. Found columns: {', '.join(df.columns.tolist())}"
+        # Parse, clean, normalize and bulk-load through a COPY staging table
+        try:
+            result = client_import_service.import_chunks(
+                db, client_import_service.read_chunks(file.file, file_ext), mode=mode
             )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        inserted_count = result["inserted"]
+        updated_count = result.get("updated", 0)
+        logger.info(f"✅ Successfully uploaded {inserted_count} client profiles ({updated_count} updated)")
         
-        logger.info(f"✅ Using name column: '{name_column}'")
-        
-        # Map common date column variations
-        dob_column = None
-        doa_column = None
-        
-        dob_variations = ['dob', 'date_of_birth', 'birth_date', 'birthdate', 'dateofbirth']
-        doa_variations = ['doa', 'date_of_accident', 'accident_date', 'incident_date', 'dateofaccident']
-        
-        for col in df.columns:
-            if col in dob_variations:
-                dob_column = col
-            elif col in doa_variations:
-                doa_column = col
-        
-        if dob_column:
-            logger.info(f"✅ Found DOB column: '{dob_column}'")
-        if doa_column:
-            logger.info(f"✅ Found DOA column: '{doa_column}'")
-        
-        # Clean and prepare data
-        logger.info("🧹 Cleaning data...")
-        # Remove rows with empty/invalid names (using the found name column)
-        df = df[df[name_column].notna()]
-        df[name_column] = df[name_column].astype(str).str.strip()
-        df = df[df[name_column].str.len() > 0]
-        df = df[~df[name_column].str.lower().isin(['nan', 'none', 'null', ''])]
-        
-        logger.info(f"✅ After cleaning: {len(df)} valid rows")
-        
-        if len(df) == 0:
-            raise HTTPException(
-                status_code=400,
-                detail="No valid rows found. Please ensure the dataset has at least one row with a valid 'name' column."
-            )
-        
-        # Get existing client names (case-insensitive) for duplicate checking
-        logger.info("🔍 Checking for existing clients...")
-        existing_names = set(
-            db.query(func.lower(ClientProfile.name)).all()
-        )
-        existing_names = {name[0] for name in existing_names if name[0]}
-        logger.info(f"📊 Found {len(existing_names)} existing clients in database")
-        
-        # Prepare bulk insert data
-        logger.info("📝 Preparing bulk insert...")
-        clients_to_insert = []
-        
-        for idx, row in df.iterrows():
-            name = str(row[name_column]).strip()
-            name_lower = name.lower()
-            
-            # Skip if already exists (case-insensitive)
-            if name_lower in existing_names:
-                continue
-            
-            # Parse dates (using found columns or default names)
-            dob = None
-            doa = None
-            
-            if dob_column and pd.notna(row.get(dob_column)):
-                try:
-                    dob = date_parser.parse(str(row[dob_column]), fuzzy=True).date()
-                except Exception as e:
-                    logger.debug(f"Could not parse DOB for row {idx}: {e}")
-                    pass
-            elif 'dob' in df.columns and pd.notna(row.get('dob')):
-                try:
-                    dob = date_parser.parse(str(row['dob']), fuzzy=True).date()
-                except Exception as e:
-                    logger.debug(f"Could not parse DOB for row {idx}: {e}")
-                    pass
-            
-            if doa_column and pd.notna(row.get(doa_column)):
-                try:
-                    doa = date_parser.parse(str(row[doa_column]), fuzzy=True).date()
-                except Exception as e:
-                    logger.debug(f"Could not parse DOA for row {idx}: {e}")
-                    pass
-            elif 'doa' in df.columns and pd.notna(row.get('doa')):
-                try:
-                    doa = date_parser.parse(str(row['doa']), fuzzy=True).date()
-                except Exception as e:
-                    logger.debug(f"Could not parse DOA for row {idx}: {e}")
-                    pass
-            
-            clients_to_insert.append(ClientProfile(
-                name=name,
-                dob=dob,
-                doa=doa
-            ))
-            
-            # Add to existing set to avoid duplicates within the same upload
-            existing_names.add(name_lower)
-        
-        logger.info(f"✅ Prepared {len(clients_to_insert)} new clients for insertion")
-        
-        # Bulk insert in batches (1000 at a time for better performance)
-        inserted_count = 0
-        batch_size = 1000
-        
-        for i in range(0, len(clients_to_insert), batch_size):
-            batch = clients_to_insert[i:i + batch_size]
-            db.bulk_save_objects(batch)
-            inserted_count += len(batch)
-            logger.info(f"💾 Inserted batch {i//batch_size + 1}: {len(batch)} clients (Total: {inserted_count})")
-        
-        db.commit()
-        logger.info(f"✅ Successfully uploaded {inserted_count} client profiles")
+        queue_import_follow_ups(db, result, min_new_client_id, background_tasks.add_task, job_service)
         
         return {
-            "message": f"Successfully uploaded {inserted_count} client profiles",
-            "total_rows": len(df),
-            "inserted": inserted_count,
-            "skipped": len(df) - inserted_count
+            "message": f"Successfully uploaded {inserted_count} client profiles"
+                       + (f" and updated {updated_count}" if updated_count else ""),
+            **result
         }
         
     except HTTPException:
@@ -221,3 +109,40 @@ async def upload_client_dataset(
             detail=f"Error processing file: {error_msg}"
         )
 
+
+def _queue_import_job(
+    background_tasks: BackgroundTasks,
+    file: UploadFile,
+    file_ext: str,
+    mode: str,
+    db: Session
+) -> dict:
+    """Save the upload to a temporary file and queue a client import job for it."""
+    with tempfile.NamedTemporaryFile(prefix="client_import_", suffix=file_ext, delete=False) as tmp:
+        shutil.copyfileobj(file.file, tmp)
+        file_path = tmp.name
+    
+    job = job_service.create(db, 'client_import', message=f'Queued import of {file.filename}')
+    background_tasks.add_task(run_client_import_job, job.id, file_path, file_ext, mode)
+    logger.info(f"📤 Queued client import job {job.id} for {file.filename} ({mode})")
+    return {
+        "message": "Client dataset import queued",
+        "job_id": job.id,
+        "status": job.status
+    }
+
+
+@router.post("/rematch")
+def rematch_documents(
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Re-match every completed document without a confident match against the current clients.
+    
+    Runs in the background; poll GET /jobs/{job_id} or listen on /ws/status for progress.
+    """
+    job = job_service.create(db, 'rematch', message='Queued by request')
+    background_tasks.add_task(run_rematch_job, job.id, None)
+    return {"job_id": job.id, "status": job.status}
@@ -1,19 +1,30 @@
 """
 Document upload and processing routes.
 """
-from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, BackgroundTasks
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import Optional
-from database.connection import get_db
+from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, BackgroundTasks, Query, Request, Response
+from fastapi.responses import ORJSONResponse
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import func, tuple_
+from typing import List, Optional, Tuple
+from database.connection import get_db, SessionLocal
 from database.models import Document, ExtractedField, Match, Mismatch, Export
 from services.ocr_service import OCRService
 from services.extraction_service import ExtractionService
 from services.matching_service import MatchingService
 from services.export_service import ExportService
+from services.document_summary import update_document_summaries
+from services.stage_rollups import StageTimings
+from services.mismatch_analytics import clear_mismatch_rollups
+from services.status_cache import FINAL_STATUSES, status_cache, status_entry
+from services.response_cache import NO_STORE, document_response, response_cache
+from services.status_notifier import status_notifier
+from services.document_view import REVIEW_FIELDS, document_view, extracted_fields_view, match_view
 from auth import get_current_user
-from pydantic import BaseModel
-from datetime import datetime
+from pydantic import BaseModel, Field
+from datetime import date, datetime, timedelta
+import asyncio
+import base64
 import logging
 
 # Get logger - will inherit configuration from root logger
@@ -27,6 +38,12 @@ matching_service = MatchingService()
 export_service = ExportService()
 
 
+MAX_BATCH_STATUS_IDS = 500
+MAX_STATUS_WAIT_SECONDS = 60
+# Parked status requests re-read the status at least this often (changes made by other workers send no wake-up)
+STATUS_WAIT_RECHECK_SECONDS = 5
+
+
 class DocumentStatusResponse(BaseModel):
     """Document status response."""
     id: int
@@ -34,6 +51,43 @@ class DocumentStatusResponse(BaseModel):
     status: str
     created_at: datetime
     updated_at: datetime
+    version: int = 0
+
+
+class BatchStatusRequest(BaseModel):
+    """Documents to report the status of."""
+    ids: List[int] = Field(..., max_length=MAX_BATCH_STATUS_IDS)
+
+
+@router.post("/status:batch")
+def get_document_statuses(
+    request: BatchStatusRequest,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Get the processing status of many documents in one request.
+    
+    Fresh entries come from the in-process status cache; the rest are read
+    with a single query and cached. IDs that do not exist are listed under "missing".
+    """
+    doc_ids = list(dict.fromkeys(request.ids))
+    found, uncached = status_cache.get_many(doc_ids)
+    
+    if uncached:
+        rows = db.query(
+            Document.id, Document.filename, Document.status, Document.created_at, Document.updated_at,
+            Document.version
+        ).filter(Document.id.in_(uncached)).all()
+        for row in rows:
+            entry = status_entry(row)
+            status_cache.put(entry)
+            found[row.id] = entry
+    
+    return {
+        "statuses": [DocumentStatusResponse(**found[doc_id]) for doc_id in doc_ids if doc_id in found],
+        "missing": [doc_id for doc_id in doc_ids if doc_id not in found]
+    }
 
 
 @router.post("/upload")
@@ -95,6 +149,7 @@ async def upload_document(
         db.add(document)
         db.commit()
         db.refresh(document)
+        status_cache.put_document(document)
         logger.info(f"✅ Document record created with ID: {document.id}")
         
         # Process document in background
@@ -117,6 +172,14 @@ async def upload_document(
         raise HTTPException(status_code=500, detail=f"Error uploading document: {str(e)}")
 
 
+def _set_status(db: Session, document: Document, status: str):
+    """Commit a document status transition and write it through to the status cache."""
+    document.status = status
+    document.version = Document.version + 1
+    db.commit()
+    status_cache.put_document(document)
+
+
 def process_document_task(doc_id: int, gcs_uri: str, mime_type: str):
     """
     Background task to process document.
@@ -139,6 +202,7 @@ def process_document_task(doc_id: int, gcs_uri: str, mime_type: str):
     from services.matching_service import MatchingService
     
     db = SessionLocal()
+    timings = StageTimings()
     
     # Initialize services - ensure we can update status even if this fails
     try:
@@ -152,8 +216,7 @@ def process_document_task(doc_id: int, gcs_uri: str, mime_type: str):
         try:
             document = db.query(Document).filter(Document.id == doc_id).first()
             if document:
-                document.status = 'failed'
-                db.commit()
+                _set_status(db, document, 'failed')
                 bg_logger.info(f"✅ Updated document {doc_id} status to 'failed' due to service initialization error")
                 try:
                     from routes.websocket import broadcast_status_update_sync
@@ -175,8 +238,8 @@ def process_document_task(doc_id: int, gcs_uri: str, mime_type: str):
             return
         
         bg_logger.info(f"📄 Found document: {document.filename}")
-        document.status = 'processing'
-        db.commit()
+        _set_status(db, document, 'processing')
+        timings.start()
         bg_logger.info("✅ Status updated to 'processing'")
         
         # Broadcast status update
@@ -190,14 +253,15 @@ def process_document_task(doc_id: int, gcs_uri: str, mime_type: str):
         # Run OCR
         bg_logger.info("🔍 Starting OCR processing...")
         bg_logger.info(f"📋 Using Document AI Processor: {ocr_service.processor_name}")
+        timings.begin('ocr')
         ocr_result = ocr_service.process_document_from_gcs(gcs_uri)
+        timings.end(ocr_result.get('success'))
         bg_logger.debug(f"OCR result success: {ocr_result.get('success')}")
         
         if not ocr_result.get('success'):
             error_msg = ocr_result.get('error', 'Unknown OCR error')
             bg_logger.error(f"❌ OCR processing failed: {error_msg}")
-            document.status = 'failed'
-            db.commit()
+            _set_status(db, document, 'failed')
             try:
                 from routes.websocket import broadcast_status_update_sync
                 broadcast_status_update_sync(doc_id, 'failed', f'OCR failed: {error_msg}')
@@ -227,6 +291,7 @@ def process_document_task(doc_id: int, gcs_uri: str, mime_type: str):
         
         # Extract fields
         bg_logger.info("📝 Extracting fields from OCR result...")
+        timings.begin('extraction')
         extracted_fields = extraction_service.extract_fields(ocr_result)
         bg_logger.info(f"✅ Extracted {len(extracted_fields)} fields: {list(extracted_fields.keys())}")
         
@@ -294,6 +359,7 @@ def process_document_task(doc_id: int, gcs_uri: str, mime_type: str):
                     raise  # Re-raise to trigger outer exception handler
             else:
                 raise  # Re-raise other database errors
+        timings.end()
         
         # Broadcast extracting fields status
         try:
@@ -304,6 +370,7 @@ def process_document_task(doc_id: int, gcs_uri: str, mime_type: str):
         
         # Match against client profiles
         bg_logger.info("🔍 Matching against client profiles...")
+        timings.begin('matching')
         matched_client_id, match_score, decision = matching_service.match_document(
             db, doc_id, extracted_fields
         )
@@ -317,9 +384,11 @@ def process_document_task(doc_id: int, gcs_uri: str, mime_type: str):
             )
             bg_logger.info(f"✅ Found {len(mismatches)} mismatches")
         
-        # Update status
-        document.status = 'completed'
-        db.commit()
+        # Update status together with the denormalized match summary
+        update_document_summaries(db, [doc_id])
+        _set_status(db, document, 'completed')
+        timings.end()
+        timings.flush(True)
         bg_logger.info("✅ Document processing completed successfully!")
         
         # Broadcast completion
@@ -329,60 +398,105 @@ def process_document_task(doc_id: int, gcs_uri: str, mime_type: str):
         except:
             pass
         
+        # Build the export now so the first download is a pointer lookup (EXPORT_PREGENERATE)
+        from services.export_service import pregenerate_export
+        pregenerate_export(doc_id)
+        
     except Exception as e:
         bg_logger.error(f"❌ Error processing document {doc_id}: {str(e)}", exc_info=True)
         # Update status to failed
         try:
             document = db.query(Document).filter(Document.id == doc_id).first()
             if document:
-                document.status = 'failed'
-                db.commit()
+                _set_status(db, document, 'failed')
                 from routes.websocket import broadcast_status_update_sync
                 broadcast_status_update_sync(doc_id, 'failed', f'Processing failed: {str(e)}')
         except Exception as e2:
             bg_logger.error(f"❌ Failed to update status: {str(e2)}", exc_info=True)
     finally:
         db.close()
+        # Records the run as failed unless it was already recorded as completed
+        timings.flush(False)
         bg_logger.info(f"🏁 Background task completed for document {doc_id}")
 
 
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
 @router.get("/")
 def list_documents(
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+    date_from: Optional[date] = Query(None, alias="from"),
+    date_to: Optional[date] = Query(None, alias="to"),
+    filename_prefix: Optional[str] = None,
+    decision: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user)
 ):
-    """List all documents."""
-    logger.info("📋 Listing all documents")
+    """
+    List documents, newest first, with their match summary (decision, score, client, mismatch count).
+    
+    Filters: status, from/to (upload date), filename_prefix, decision (match decision).
+    
+    With limit or cursor the list is keyset-paginated on (created_at, id): the
+    response carries next_cursor, which is passed back as cursor to fetch the
+    next page. Without either, every matching document is returned (legacy
+    behaviour, kept for existing clients).
+    
+    The list is rendered with orjson directly (no jsonable_encoder pass).
+    """
+    paginated = limit is not None or cursor is not None
+    logger.info(f"📋 Listing documents (paginated={paginated}, status={status}, decision={decision})")
     
     try:
-        logger.debug("🔍 Querying database for documents...")
-        documents = db.query(Document).order_by(Document.created_at.desc()).all()
-        
-        logger.info(f"✅ Found {len(documents)} documents in database")
+        query = db.query(
+            Document.id, Document.filename, Document.status, Document.created_at, Document.updated_at,
+            Document.match_decision, Document.match_score, Document.matched_client_id,
+            Document.matched_client_name, Document.mismatch_count
+        )
         
-        # Log document statuses
-        status_counts = {}
-        for doc in documents:
-            status_counts[doc.status] = status_counts.get(doc.status, 0) + 1
+        if status:
+            query = query.filter(Document.status == status)
+        if date_from:
+            query = query.filter(Document.created_at >= datetime.combine(date_from, datetime.min.time()))
+        if date_to:
+            query = query.filter(Document.created_at < datetime.combine(date_to + timedelta(days=1), datetime.min.time()))
+        if filename_prefix:
+            escaped = filename_prefix.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            query = query.filter(Document.filename.like(f"{escaped}%", escape='\\'))
+        if decision:
+            query = query.filter(Document.match_decision == decision)
+        if cursor:
+            try:
+                cursor_created_at, cursor_id = _decode_cursor(cursor)
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+            query = query.filter(tuple_(Document.created_at, Document.id) < tuple_(cursor_created_at, cursor_id))
         
-        logger.debug(f"📊 Document status breakdown: {status_counts}")
+        query = query.order_by(Document.created_at.desc(), Document.id.desc())
         
-        result = {
-            "documents": [
-                {
-                    "doc_id": doc.id,
-                    "filename": doc.filename,
-                    "status": doc.status,
-                    "created_at": doc.created_at.isoformat() if doc.created_at else None,
-                    "completed_at": doc.updated_at.isoformat() if doc.status == "completed" and doc.updated_at else None,
-                }
-                for doc in documents
-            ]
-        }
+        if not paginated:
+            documents = query.all()
+            logger.info(f"✅ Returning {len(documents)} documents to client")
+            return ORJSONResponse({"documents": [_document_summary(doc) for doc in documents]})
         
-        logger.info(f"✅ Returning {len(result['documents'])} documents to client")
+        page_size = limit or DEFAULT_PAGE_SIZE
+        # Fetch one extra row to know whether another page follows
+        documents = query.limit(page_size + 1).all()
+        has_more = len(documents) > page_size
+        documents = documents[:page_size]
         
-        return result
+        return ORJSONResponse({
+            "documents": [_document_summary(doc) for doc in documents],
+            "limit": page_size,
+            "has_more": has_more,
+            "next_cursor": _encode_cursor(documents[-1].created_at, documents[-1].id) if has_more else None
+        })
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"❌ Error listing documents: {str(e)}", exc_info=True)
         raise HTTPException(
@@ -391,6 +505,38 @@ def list_documents(
         )
 
 
+def _document_summary(doc) -> dict:
+    """One row of the document list (datetimes are serialized by orjson)."""
+    return {
+        "doc_id": doc.id,
+        "filename": doc.filename,
+        "status": doc.status,
+        "created_at": doc.created_at,
+        "completed_at": doc.updated_at if doc.status == "completed" else None,
+        "match_decision": doc.match_decision,
+        "match_score": doc.match_score,
+        "matched_client_id": doc.matched_client_id,
+        "matched_client_name": doc.matched_client_name,
+        "mismatch_count": doc.mismatch_count,
+    }
+
+
+def _encode_cursor(created_at: datetime, doc_id: int) -> str:
+    """Opaque pagination cursor for the position after (created_at, id)."""
+    raw = f"{created_at.isoformat()}|{doc_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Decode a cursor from _encode_cursor (raises ValueError if malformed)."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+        created_at, doc_id = raw.split("|")
+        return datetime.fromisoformat(created_at), int(doc_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
 @router.get("/{doc_id}")
 def get_document(
     doc_id: int,
@@ -403,75 +549,162 @@ def get_document(
     if not document:
         raise HTTPException(status_code=404, detail="Document not found")
     
-    return {
-        "document": {
-            "doc_id": document.id,
-            "filename": document.filename,
-            "status": document.status,
-            "created_at": document.created_at.isoformat() if document.created_at else None,
-            "updated_at": document.updated_at.isoformat() if document.updated_at else None,
-        }
-    }
+    return {"document": document_view(document)}
 
 
-@router.get("/{doc_id}/status")
-def get_document_status(
+@router.get("/{doc_id}/full")
+def get_document_full(
     doc_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user)
 ):
-    """Get document processing status."""
-    document = db.query(Document).filter(Document.id == doc_id).first()
+    """
+    Get everything the review page shows for a document in one request.
+    
+    Returns the document, its extracted fields and its field-by-field match,
+    in the same shapes as GET /documents/{id}, GET /documents/{id}/extracted-fields
+    and GET /matches/{id}. Fields, matches (with their client) and mismatches
+    are loaded together with the document instead of by separate requests.
+    Completed documents are served with a version ETag (304 on If-None-Match)
+    from the response cache.
+    """
+    state = _document_state(db, doc_id)
+    if state.status in FINAL_STATUSES:
+        return document_response(request, "full", doc_id, state.version, lambda: _document_full(db, doc_id))
+    
+    response.headers["Cache-Control"] = NO_STORE
+    return _document_full(db, doc_id)
+
+
+def _document_full(db: Session, doc_id: int) -> dict:
+    """Build the review page payload of a document."""
+    document = db.query(Document).options(
+        selectinload(Document.extracted_fields),
+        selectinload(Document.matches).joinedload(Match.client),
+        selectinload(Document.mismatches)
+    ).filter(Document.id == doc_id).first()
     
     if not document:
         raise HTTPException(status_code=404, detail="Document not found")
     
-    return DocumentStatusResponse(
-        id=document.id,
-        filename=document.filename,
-        status=document.status,
-        created_at=document.created_at,
-        updated_at=document.updated_at
-    )
+    fields = sorted(document.extracted_fields, key=lambda field: field.id)
+    match = min(document.matches, key=lambda m: m.id) if document.matches else None
+    mismatches = sorted(document.mismatches, key=lambda m: m.id)
+    
+    return {
+        "document": document_view(document),
+        "fields": extracted_fields_view(fields),
+        "match": match_view(match, match.client if match else None, fields, mismatches)
+    }
+
+
+def _document_state(db: Session, doc_id: int):
+    """Status and version of a document (404 if it does not exist)."""
+    state = db.query(Document.status, Document.version).filter(Document.id == doc_id).first()
+    if not state:
+        raise HTTPException(status_code=404, detail="Document not found")
+    return state
+
+
+@router.get("/{doc_id}/status")
+async def get_document_status(
+    doc_id: int,
+    wait: float = Query(0, ge=0, le=MAX_STATUS_WAIT_SECONDS),
+    since: Optional[int] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Get document processing status (served from the status cache when fresh).
+    
+    Long polling: with wait=N the request is held for up to N seconds until the
+    document's version moves past ``since`` (default: its version when the
+    request arrived), then returns the current status. Status changes made by
+    this worker wake the request immediately; others are noticed within a few
+    seconds, since a parked request re-reads the database rather than the
+    cache. Clients pass the returned version as ``since`` on the next call.
+    """
+    if wait <= 0:
+        entry = await run_in_threadpool(_load_status_entry, doc_id)
+        if entry is None:
+            raise HTTPException(status_code=404, detail="Document not found")
+        return DocumentStatusResponse(**entry)
+    
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + wait
+    # Subscribe before reading, so a change between the read and the wait is not missed
+    with status_notifier.subscribe(doc_id) as waiter:
+        entry = await run_in_threadpool(_load_status_entry, doc_id)
+        if entry is None:
+            raise HTTPException(status_code=404, detail="Document not found")
+        baseline = since if since is not None else entry['version']
+        
+        while entry['version'] <= baseline:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            await waiter.wait(min(remaining, STATUS_WAIT_RECHECK_SECONDS))
+            # Re-read the database: a cached final status can hide changes made by other workers
+            entry = await run_in_threadpool(_load_status_entry, doc_id, False)
+            if entry is None:
+                raise HTTPException(status_code=404, detail="Document not found")
+    
+    return DocumentStatusResponse(**entry)
+
+
+def _load_status_entry(doc_id: int, use_cache: bool = True) -> Optional[dict]:
+    """
+    Status entry of a document from the cache, else the database (None if it does not exist).
+    
+    With use_cache=False the database is always read; the cache is refreshed with the result.
+    """
+    if use_cache:
+        entry = status_cache.get(doc_id)
+        if entry is not None:
+            return entry
+    
+    # Own short-lived session: long-polling requests must not hold a pooled connection while parked
+    db = SessionLocal()
+    try:
+        document = db.query(
+            Document.id, Document.filename, Document.status, Document.created_at, Document.updated_at, Document.version
+        ).filter(Document.id == doc_id).first()
+        if not document:
+            return None
+        entry = status_entry(document)
+        status_cache.put(entry)
+        return entry
+    finally:
+        db.close()
 
 
 @router.get("/{doc_id}/extracted-fields")
 def get_extracted_fields(
     doc_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user)
 ):
-    """Get extracted fields for a document."""
-    document = db.query(Document).filter(Document.id == doc_id).first()
-    
-    if not document:
-        raise HTTPException(status_code=404, detail="Document not found")
+    """Get extracted fields for a document (version ETag and response cache once completed)."""
+    state = _document_state(db, doc_id)
+    if state.status in FINAL_STATUSES:
+        return document_response(request, "extracted-fields", doc_id, state.version, lambda: _extracted_fields(db, doc_id))
     
+    response.headers["Cache-Control"] = NO_STORE
+    return _extracted_fields(db, doc_id)
+
+
+def _extracted_fields(db: Session, doc_id: int) -> dict:
+    """Build the extracted fields payload of a document."""
     # Only get the 3 fields: patient_name, dob, doa (exclude referral and service_dates)
     fields = db.query(ExtractedField).filter(
         ExtractedField.doc_id == doc_id,
-        ExtractedField.field_name.in_(['patient_name', 'dob', 'doa'])
-    ).all()
-    
-    # Format field names for better display
-    field_name_map = {
-        'patient_name': 'Patient Name',
-        'dob': 'Date of Birth',
-        'doa': 'Date of Accident'
-    }
+        ExtractedField.field_name.in_(REVIEW_FIELDS)
+    ).order_by(ExtractedField.id).all()
     
-    return {
-        "fields": [
-            {
-                "field_name": field_name_map.get(field.field_name, field.field_name.replace('_', ' ').title()),
-                "value_raw": field.raw_value,
-                "value_norm": field.normalized_value,
-                "confidence": field.confidence_score,
-                "page_num": field.page_number if field.page_number else 1
-            }
-            for field in fields
-        ]
-    }
+    return {"fields": extracted_fields_view(fields)}
 
 
 @router.delete("/all")
@@ -501,7 +734,10 @@ def delete_all_documents(
         
         # Delete all documents (CASCADE will handle related records)
         deleted_docs = db.query(Document).delete()
+        clear_mismatch_rollups(db)
         db.commit()
+        status_cache.clear()
+        response_cache.clear()
         
         logger.info(f"✅ Successfully deleted {deleted_docs} documents and all related data")
         
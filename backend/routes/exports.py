@@ -1,21 +1,32 @@
 """
 Export routes.
 """
-from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, Query
+from fastapi.responses import FileResponse, StreamingResponse
+from starlette.background import BackgroundTask
 from sqlalchemy.orm import Session
-from database.connection import get_db
+from database.connection import get_db, SessionLocal
 from database.models import Export, Document
-from services.export_service import ExportService
+from services.export_service import ExportService, SIGNED_URL_REFRESH_MARGIN, XLSX_MEDIA_TYPE
+from services.batch_export_service import BatchExportService
+from services.bulk_export_service import BulkExportService, parquet_available
+from services.response_cache import (
+    CACHE_CONTROL, CachedResponse, cached_json, etag_matches, not_modified, response_cache, serialize
+)
 from auth import get_current_user
 from pydantic import BaseModel
-from typing import Optional
-import base64
+from typing import Iterator, Optional, Tuple
+from datetime import date, datetime, timedelta
 import logging
+import os
+import tempfile
 
 router = APIRouter(prefix="/exports", tags=["exports"])
 logger = logging.getLogger(__name__)
 
 export_service = ExportService()
+batch_export_service = BatchExportService()
+bulk_export_service = BulkExportService()
 
 
 class ExportResponse(BaseModel):
@@ -23,20 +34,191 @@ class ExportResponse(BaseModel):
     export_id: int
     gcs_uri: Optional[str] = None
     signed_url: Optional[str] = None
-    expires_at: Optional[str] = None
-    file_content: Optional[str] = None
+    expires_at: Optional[datetime] = None
     filename: Optional[str] = None
     direct_download: bool = False
+    cached: bool = False
+
+
+@router.get("/batch")
+def get_batch_export(
+    date_from: Optional[date] = Query(None, alias="from"),
+    date_to: Optional[date] = Query(None, alias="to"),
+    status: Optional[str] = None,
+    format: str = "xlsx",
+    upload: bool = False,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Export every document uploaded in a date range (and optionally with a status) into one file.
+    
+    One row per document: extracted values, match, expected client values and
+    field statuses. Rows are streamed from the database in batches, so memory
+    stays constant regardless of the number of documents.
+    
+    - format=csv streams the file as it is generated
+    - format=xlsx builds a write-only workbook in a temporary file, then sends it
+    - upload=true uploads the file to storage in chunks and returns a signed URL
+    """
+    if format not in BatchExportService.FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported format '{format}'. Allowed: {', '.join(BatchExportService.FORMATS)}"
+        )
+    if date_from and date_to and date_from > date_to:
+        raise HTTPException(status_code=400, detail="'from' must not be after 'to'")
+    if upload and not export_service.settings.gcs_bucket_name:
+        raise HTTPException(status_code=400, detail="Storage bucket not configured; download the export instead")
+    
+    filename = f"documents_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{format}"
+    media_type = BatchExportService.MEDIA_TYPES[format]
+    headers = {'Content-Disposition': f'attachment; filename="{filename}"'}
+    logger.info(f"📦 Batch export ({format}): from={date_from} to={date_to} status={status}")
+    
+    if format == 'csv' and not upload:
+        def stream_csv():
+            # The request session is closed before the body is streamed; use our own
+            stream_db = SessionLocal()
+            try:
+                yield from batch_export_service.iter_csv(
+                    batch_export_service.iter_rows(stream_db, date_from, date_to, status)
+                )
+            finally:
+                stream_db.close()
+        
+        return StreamingResponse(stream_csv(), media_type=media_type, headers=headers)
+    
+    tmp = tempfile.NamedTemporaryFile(prefix="batch_export_", suffix=f".{format}", delete=False)
+    tmp.close()
+    try:
+        rows = batch_export_service.iter_rows(db, date_from, date_to, status)
+        if format == 'xlsx':
+            count = batch_export_service.write_xlsx(rows, tmp.name)
+        else:
+            count = batch_export_service.write_csv(rows, tmp.name)
+        logger.info(f"✅ Batch export wrote {count} documents")
+        
+        if upload:
+            blob_name = f"exports/batch/{filename}"
+            gcs_uri = export_service._upload_file_to_gcs(tmp.name, blob_name, media_type)
+            signed_url = export_service._generate_signed_url(blob_name, expiration_minutes=60)
+            os.remove(tmp.name)
+            return {
+                "gcs_uri": gcs_uri,
+                "signed_url": signed_url,
+                "expires_at": datetime.now() + timedelta(hours=1),
+                "filename": filename,
+                "documents": count
+            }
+        
+        return FileResponse(
+            tmp.name,
+            media_type=media_type,
+            filename=filename,
+            background=BackgroundTask(os.remove, tmp.name)
+        )
+    except Exception as e:
+        if os.path.exists(tmp.name):
+            os.remove(tmp.name)
+        logger.error(f"❌ Error generating batch export: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Error generating batch export: {str(e)}")
+
+
+@router.get("/bulk/{entity}")
+def get_bulk_export(
+    entity: str,
+    date_from: Optional[date] = Query(None, alias="from"),
+    date_to: Optional[date] = Query(None, alias="to"),
+    status: Optional[str] = None,
+    format: str = "csv",
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Export one table of results for analytics: documents, fields, matches or mismatches.
+    
+    Rows are filtered by document upload date and status and read from a
+    server-side cursor in batches, so memory stays constant.
+    
+    - format=csv / format=jsonl stream rows as they are read
+    - format=parquet writes a Parquet file (one row group per batch), then sends it
+    """
+    if entity not in BulkExportService.ENTITIES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown entity '{entity}'. Allowed: {', '.join(BulkExportService.ENTITIES)}"
+        )
+    if format not in BulkExportService.FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported format '{format}'. Allowed: {', '.join(BulkExportService.FORMATS)}"
+        )
+    if format == 'parquet' and not parquet_available():
+        raise HTTPException(status_code=501, detail="Parquet export requires pyarrow, which is not installed")
+    if date_from and date_to and date_from > date_to:
+        raise HTTPException(status_code=400, detail="'from' must not be after 'to'")
+    
+    filename = f"{entity}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{format}"
+    media_type = BulkExportService.MEDIA_TYPES[format]
+    logger.info(f"📦 Bulk export {entity} ({format}): from={date_from} to={date_to} status={status}")
+    
+    if format in ('csv', 'jsonl'):
+        encode = bulk_export_service.iter_csv if format == 'csv' else bulk_export_service.iter_jsonl
+        
+        def stream_rows():
+            # The request session is closed before the body is streamed; use our own
+            stream_db = SessionLocal()
+            try:
+                yield from encode(entity, bulk_export_service.iter_batches(stream_db, entity, date_from, date_to, status))
+            finally:
+                stream_db.close()
+        
+        return StreamingResponse(
+            stream_rows(),
+            media_type=media_type,
+            headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+        )
+    
+    tmp = tempfile.NamedTemporaryFile(prefix="bulk_export_", suffix=f".{format}", delete=False)
+    tmp.close()
+    try:
+        count = bulk_export_service.write_parquet(
+            entity, bulk_export_service.iter_batches(db, entity, date_from, date_to, status), tmp.name
+        )
+        logger.info(f"✅ Bulk export wrote {count} {entity} rows")
+        return FileResponse(
+            tmp.name,
+            media_type=media_type,
+            filename=filename,
+            background=BackgroundTask(os.remove, tmp.name)
+        )
+    except Exception as e:
+        if os.path.exists(tmp.name):
+            os.remove(tmp.name)
+        logger.error(f"❌ Error generating bulk export: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Error generating bulk export: {str(e)}")
 
 
 @router.get("/{doc_id}")
 def get_export(
     doc_id: int,
+    request: Request,
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user)
 ):
     """
     Generate or retrieve Excel export for a document.
+    
+    Exports are content-addressed: repeat requests for an unchanged document
+    reuse the stored workbook and only refresh its signed URL.
+    
+    Without storage the workbook is streamed from the local export cache with
+    an ETag (the content hash): If-None-Match returns 304 and Range requests
+    return 206 partial content.
+    
+    The signed URL response is kept in the response cache per document version
+    until the URL is due for refresh, with an ETag for conditional requests.
     """
     # Check if document exists
     document = db.query(Document).filter(Document.id == doc_id).first()
@@ -50,40 +232,123 @@ def get_export(
             detail=f"Document is not ready for export. Status: {document.status}"
         )
     
-    # Check if export already exists
-    existing_export = db.query(Export).filter(Export.doc_id == doc_id).first()
-    
-    if existing_export:
-        # Check if signed URL is still valid
-        from datetime import datetime
-        if existing_export.expires_at and existing_export.expires_at > datetime.now():
-            return ExportResponse(
-                export_id=existing_export.id,
-                gcs_uri=existing_export.gcs_uri,
-                signed_url=existing_export.signed_url,
-                expires_at=existing_export.expires_at.isoformat()
-            )
+    key = ("export", doc_id, document.version)
+    cached = response_cache.get(key)
+    if cached is not None:
+        if etag_matches(request.headers.get('if-none-match'), cached.etag):
+            return not_modified(cached.etag)
+        return cached_json(cached)
     
-    # Generate new export
+    # Reuse the stored export if the report content is unchanged, otherwise generate it
     try:
-        export_data = export_service.generate_excel_report(db, doc_id)
+        export_data = export_service.get_export(db, doc_id)
         
-        # If direct download (GCS failed), return file directly
-        if export_data.get('direct_download') and export_data.get('file_content'):
-            file_content = base64.b64decode(export_data['file_content'])
-            filename = export_data.get('filename', f'report_{doc_id}.xlsx')
-            
-            return Response(
-                content=file_content,
-                media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-                headers={
-                    'Content-Disposition': f'attachment; filename="{filename}"'
-                }
+        # If direct download (GCS failed), stream the cached file
+        if export_data.get('direct_download') and export_data.get('file_path'):
+            return _file_response(
+                request,
+                export_data['file_path'],
+                export_data.get('filename', f'report_{doc_id}.xlsx'),
+                XLSX_MEDIA_TYPE,
+                export_data['etag']
             )
         
         # Otherwise return signed URL response
-        return ExportResponse(**export_data)
+        response = ExportResponse(**export_data)
     except Exception as e:
         logger.error(f"❌ Error generating export: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error generating export: {str(e)}")
+    
+    if not response.expires_at:
+        return response
+    # Cache until the signed URL is due for refresh; the ETag changes with the URL
+    expires_at = response.expires_at
+    ttl = (expires_at - SIGNED_URL_REFRESH_MARGIN - datetime.now()).total_seconds()
+    cached = CachedResponse(
+        f'"{doc_id}-v{document.version}-{response.export_id}-{int(expires_at.timestamp())}"',
+        serialize(response.model_dump())
+    )
+    if ttl > 0:
+        response_cache.put(key, cached, ttl=ttl)
+    if etag_matches(request.headers.get('if-none-match'), cached.etag):
+        return not_modified(cached.etag)
+    return cached_json(cached)
+
+
+FILE_CHUNK_SIZE = 64 * 1024
+
+
+def _file_response(request: Request, path: str, filename: str, media_type: str, etag: str) -> Response:
+    """
+    Serve a file with an ETag, honoring If-None-Match (304) and single byte ranges (206).
+    
+    The file is streamed from disk in chunks; it is never read into memory whole.
+    """
+    quoted_etag = f'"{etag}"'
+    headers = {
+        'ETag': quoted_etag,
+        'Accept-Ranges': 'bytes',
+        'Cache-Control': CACHE_CONTROL,
+        'Content-Disposition': f'attachment; filename="{filename}"'
+    }
+    
+    if etag_matches(request.headers.get('if-none-match'), etag):
+        return Response(status_code=304, headers={k: headers[k] for k in ('ETag', 'Cache-Control')})
+    
+    size = os.path.getsize(path)
+    range_header = request.headers.get('range')
+    if_range = request.headers.get('if-range')
+    if range_header and (not if_range or etag_matches(if_range, etag)):
+        byte_range = _parse_range(range_header, size)
+        if byte_range is None:
+            return Response(status_code=416, headers={'Content-Range': f'bytes */{size}', 'ETag': quoted_etag})
+        if byte_range != (0, size - 1):
+            start, end = byte_range
+            headers['Content-Range'] = f'bytes {start}-{end}/{size}'
+            headers['Content-Length'] = str(end - start + 1)
+            return StreamingResponse(
+                _iter_file(path, start, end - start + 1), status_code=206, media_type=media_type, headers=headers
+            )
+    
+    headers.pop('Content-Disposition')
+    return FileResponse(path, media_type=media_type, filename=filename, headers=headers)
+
+
+def _parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single ``bytes=`` range into inclusive (start, end) offsets.
+    
+    Multiple, malformed or invalid (last byte before first) ranges are ignored
+    and answered with the whole file; None means unsatisfiable (RFC 9110 §14.2).
+    """
+    unit, _, spec = header.partition('=')
+    if unit.strip().lower() != 'bytes' or ',' in spec:
+        return (0, size - 1)
+    start_text, _, end_text = spec.strip().partition('-')
+    try:
+        if start_text:
+            start = int(start_text)
+            end = int(end_text) if end_text else size - 1
+            if end_text and end < start:
+                return (0, size - 1)
+            end = min(end, size - 1)
+        else:
+            # Suffix range: the last N bytes
+            start, end = max(size - int(end_text), 0), size - 1
+    except ValueError:
+        return (0, size - 1)
+    if start >= size:
+        return None
+    return (start, end)
+
 
+def _iter_file(path: str, offset: int, length: int) -> Iterator[bytes]:
+    """Read ``length`` bytes of a file from ``offset`` in chunks."""
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        while length > 0:
+            chunk = f.read(min(FILE_CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
@@ -0,0 +1,25 @@
+"""
+Background job routes.
+"""
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from database.connection import get_db
+from services.job_service import JobService
+from auth import get_current_user
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+job_service = JobService()
+
+
+@router.get("/{job_id}")
+def get_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """Get progress of a background job (re-matching, imports, ...)."""
+    job = job_service.get(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_service.to_dict(job)
@@ -1,46 +1,113 @@
 """
 Statistics routes.
 """
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import func
 from database.connection import get_db
-from database.models import Document, Match, Mismatch
+from services.stats_service import StatsService
+from services.stage_rollups import BUCKET_SIZES, LATENCY_BUCKETS_MS, MAX_TIMESERIES_POINTS, get_timeseries
+from services.mismatch_analytics import GROUP_COLUMNS, get_mismatch_rates
 from auth import get_current_user
+from datetime import date, datetime, timedelta
+from typing import Optional
 
 router = APIRouter(prefix="/stats", tags=["stats"])
 
+stats_service = StatsService()
+
 
 @router.get("/")
 def get_stats(
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user)
 ):
-    """Get system statistics."""
-    # Count documents by status
-    total_docs = db.query(func.count(Document.id)).scalar() or 0
-    completed_docs = db.query(func.count(Document.id)).filter(
-        Document.status == "completed"
-    ).scalar() or 0
-    processing_docs = db.query(func.count(Document.id)).filter(
-        Document.status.in_(["pending", "processing"])
-    ).scalar() or 0
-    failed_docs = db.query(func.count(Document.id)).filter(
-        Document.status == "failed"
-    ).scalar() or 0
+    """Get system statistics (from the maintained counters, cached for a few seconds)."""
+    return stats_service.get_stats(db)
+
+
+@router.get("/timeseries")
+def get_stats_timeseries(
+    date_from: Optional[datetime] = Query(None, alias="from"),
+    date_to: Optional[datetime] = Query(None, alias="to"),
+    bucket: str = "hour",
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Get processing throughput, failure rate and latency over time, per pipeline stage.
+    
+    Served from the per-minute stage rollups written by the pipeline. Stages are
+    'ocr', 'extraction', 'matching' and 'total' (a whole run; its count is the
+    number of documents processed). Latency percentiles are estimated from
+    histograms with bucket bounds ``latency_buckets_ms``.
     
-    # Count matches
-    total_matches = db.query(func.count(Match.id)).scalar() or 0
+    Args:
+        from: Start of the range (default: 24 hours before ``to``)
+        to: End of the range, exclusive (default: now)
+        bucket: 'minute', 'hour' or 'day'
+    """
+    if bucket not in BUCKET_SIZES:
+        raise HTTPException(status_code=400, detail=f"Invalid bucket: {bucket}. Allowed: {', '.join(BUCKET_SIZES)}")
     
-    # Count mismatches
-    total_mismatches = db.query(func.count(Mismatch.id)).scalar() or 0
+    date_to = _local_naive(date_to) if date_to else datetime.now()
+    date_from = _local_naive(date_from) if date_from else date_to - timedelta(days=1)
+    if date_from >= date_to:
+        raise HTTPException(status_code=400, detail="'from' must be before 'to'")
+    if (date_to - date_from) / BUCKET_SIZES[bucket] > MAX_TIMESERIES_POINTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Range too large for bucket '{bucket}' (at most {MAX_TIMESERIES_POINTS} buckets)"
+        )
     
     return {
-        "total_documents": total_docs,
-        "completed_documents": completed_docs,
-        "processing_documents": processing_docs,
-        "failed_documents": failed_docs,
-        "total_matches": total_matches,
-        "total_mismatches": total_mismatches
+        "from": date_from,
+        "to": date_to,
+        "bucket": bucket,
+        "latency_buckets_ms": list(LATENCY_BUCKETS_MS),
+        "series": get_timeseries(db, date_from, date_to, bucket)
     }
 
+
+@router.get("/mismatches")
+def get_mismatch_stats(
+    group_by: str = "field",
+    date_from: Optional[date] = Query(None, alias="from"),
+    date_to: Optional[date] = Query(None, alias="to"),
+    field: Optional[str] = None,
+    client_id: Optional[int] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Get mismatch rates (mismatched / checked fields) from the mismatch rollups.
+    
+    Args:
+        group_by: Comma-separated dimensions: 'month', 'client', 'field' (empty for overall totals)
+        from: First month to include (any day of it)
+        to: Last month to include (any day of it)
+        field: Only 'dob' or 'doa'
+        client_id: Only this client
+        limit: Maximum rows (ordered by month, then most mismatches)
+    """
+    dimensions = list(dict.fromkeys(dimension.strip() for dimension in group_by.split(',') if dimension.strip()))
+    unknown = set(dimensions) - set(GROUP_COLUMNS)
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid group_by: {', '.join(sorted(unknown))}. Allowed: {', '.join(GROUP_COLUMNS)}"
+        )
+    if date_from and date_to and date_from > date_to:
+        raise HTTPException(status_code=400, detail="'from' must not be after 'to'")
+    
+    return {
+        "group_by": dimensions,
+        "rates": get_mismatch_rates(db, dimensions, date_from, date_to, field=field, client_id=client_id, limit=limit)
+    }
+
+
+def _local_naive(value: datetime) -> datetime:
+    """Convert a timezone-aware datetime to naive local time (rollups are stored in server local time)."""
+    if value.tzinfo is not None:
+        return value.astimezone().replace(tzinfo=None)
+    return value
@@ -8,6 +8,7 @@ import asyncio
 from threading import Thread
 import queue
 from auth import verify_token
+from services.status_notifier import status_notifier
 
 router = APIRouter()
 
@@ -115,6 +116,13 @@ def broadcast_status_update_sync(doc_id: int, status: str, message: str = None):
         "message": message or status
     }
     message_queue.put(update)
+    # Wake requests long-polling this document's status
+    status_notifier.notify(doc_id)
+
+
+def broadcast_message_sync(message: dict):
+    """Broadcast an arbitrary message (e.g. job progress) from a synchronous context."""
+    message_queue.put(message)
 
 
 async def process_message_queue():
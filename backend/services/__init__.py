@@ -3,11 +3,13 @@ from .ocr_service import OCRService
 from .extraction_service import ExtractionService
 from .matching_service import MatchingService
 from .export_service import ExportService
+from .client_snapshot import ClientSnapshotService
 
 __all__ = [
     "OCRService",
     "ExtractionService",
     "MatchingService",
     "ExportService",
+    "ClientSnapshotService",
 ]
 
@@ -0,0 +1,216 @@
+"""
+Service for exporting many documents into one workbook or CSV file.
+"""
+import csv
+import io
+import logging
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, PatternFill, Alignment
+from openpyxl.utils import get_column_letter
+from sqlalchemy.orm import Session
+from database.models import Document, ExtractedField, Match, Mismatch, ClientProfile
+from services.export_service import field_match_status
+
+logger = logging.getLogger(__name__)
+
+
+class BatchExportService:
+    """
+    Service for multi-document exports with constant memory.
+
+    Documents are read through a server-side cursor and their fields,
+    matches, clients and mismatches are loaded with one IN query per batch,
+    so each row is written and discarded before the next batch is fetched.
+    """
+
+    FORMATS = ('xlsx', 'csv')
+    MEDIA_TYPES = {
+        'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        'csv': 'text/csv',
+    }
+
+    COLUMNS = [
+        'Document ID', 'File Name', 'Status', 'Uploaded At', 'Processed At',
+        'Extracted Name', 'Extracted DOB', 'Extracted DOA',
+        'Match Status', 'Match Score (%)', 'Matched Client ID', 'Matched Client Name',
+        'Expected DOB', 'Expected DOA', 'DOB Status', 'DOA Status', 'Mismatch Count',
+    ]
+
+    def __init__(self, batch_size: int = 1000):
+        """Initialize batch export service."""
+        self.batch_size = batch_size
+
+    def iter_rows(
+        self,
+        db: Session,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        status: Optional[str] = None
+    ) -> Iterator[List[Any]]:
+        """
+        Stream one export row per document, ordered by document ID.
+
+        Args:
+            db: Database session
+            date_from: First upload date to include
+            date_to: Last upload date to include
+            status: Only include documents with this status
+
+        Returns:
+            Iterator of rows matching COLUMNS
+        """
+        query = db.query(Document.id, Document.filename, Document.status, Document.created_at, Document.updated_at)
+        if date_from:
+            query = query.filter(Document.created_at >= datetime.combine(date_from, datetime.min.time()))
+        if date_to:
+            query = query.filter(Document.created_at < datetime.combine(date_to + timedelta(days=1), datetime.min.time()))
+        if status:
+            query = query.filter(Document.status == status)
+
+        batch = []
+        for document in query.order_by(Document.id).yield_per(self.batch_size):
+            batch.append(document)
+            if len(batch) >= self.batch_size:
+                yield from self._build_rows(db, batch)
+                batch = []
+        if batch:
+            yield from self._build_rows(db, batch)
+
+    def _build_rows(self, db: Session, documents: List[Any]) -> Iterator[List[Any]]:
+        """Load related records for a batch of documents and build their rows."""
+        doc_ids = [document.id for document in documents]
+
+        fields: Dict[int, Dict[str, Any]] = {}
+        for field in db.query(
+            ExtractedField.doc_id, ExtractedField.field_name, ExtractedField.raw_value, ExtractedField.normalized_value
+        ).filter(
+            ExtractedField.doc_id.in_(doc_ids),
+            ExtractedField.field_name.in_(['patient_name', 'dob', 'doa'])
+        ):
+            fields.setdefault(field.doc_id, {})[field.field_name] = field.normalized_value or field.raw_value or ''
+
+        matches: Dict[int, Any] = {}
+        for match in db.query(Match.doc_id, Match.client_id, Match.match_score, Match.decision).filter(
+            Match.doc_id.in_(doc_ids)
+        ).order_by(Match.id):
+            # First match per document, as in the single-document export
+            matches.setdefault(match.doc_id, match)
+
+        client_ids = {match.client_id for match in matches.values()}
+        clients = {
+            client.id: client
+            for client in db.query(ClientProfile.id, ClientProfile.name, ClientProfile.dob, ClientProfile.doa).filter(
+                ClientProfile.id.in_(client_ids)
+            )
+        } if client_ids else {}
+
+        mismatch_fields: Dict[int, set] = {}
+        for mismatch in db.query(Mismatch.doc_id, Mismatch.field).filter(Mismatch.doc_id.in_(doc_ids)):
+            mismatch_fields.setdefault(mismatch.doc_id, set()).add(mismatch.field)
+
+        for document in documents:
+            doc_fields = fields.get(document.id, {})
+            match = matches.get(document.id)
+            client = clients.get(match.client_id) if match else None
+            expected_dob = client.dob.strftime('%m/%d/%Y') if client and client.dob else None
+            expected_doa = client.doa.strftime('%m/%d/%Y') if client and client.doa else None
+            doc_mismatches = mismatch_fields.get(document.id, set())
+
+            yield [
+                document.id,
+                document.filename,
+                document.status,
+                document.created_at.strftime('%Y-%m-%d %H:%M:%S') if document.created_at else '',
+                document.updated_at.strftime('%Y-%m-%d %H:%M:%S') if document.updated_at else '',
+                doc_fields.get('patient_name', ''),
+                doc_fields.get('dob', ''),
+                doc_fields.get('doa', ''),
+                match.decision if match else 'No Match',
+                round(match.match_score, 1) if match and match.match_score else None,
+                match.client_id if match else None,
+                client.name if client else None,
+                expected_dob,
+                expected_doa,
+                field_match_status('dob', expected_dob, doc_fields.get('dob'), doc_mismatches),
+                field_match_status('doa', expected_doa, doc_fields.get('doa'), doc_mismatches),
+                len(doc_mismatches),
+            ]
+
+    def write_xlsx(self, rows: Iterator[List[Any]], path: str) -> int:
+        """
+        Write rows into a write-only workbook at ``path``.
+
+        Rows are serialized as they arrive; openpyxl never holds the sheet in memory.
+
+        Returns:
+            Number of data rows written
+        """
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet('Documents')
+        sheet.freeze_panes = 'A2'
+        widths = [max(len(column) + 2, 12) for column in self.COLUMNS]
+        widths[1] = widths[5] = widths[11] = 40  # file and person names
+        for index, width in enumerate(widths, start=1):
+            sheet.column_dimensions[get_column_letter(index)].width = width
+
+        header_font = Font(bold=True, color="FFFFFF", size=11)
+        header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+        header_alignment = Alignment(horizontal='center', vertical='center')
+        header = []
+        for column in self.COLUMNS:
+            cell = WriteOnlyCell(sheet, value=column)
+            cell.font = header_font
+            cell.fill = header_fill
+            cell.alignment = header_alignment
+            header.append(cell)
+        sheet.append(header)
+
+        count = 0
+        for row in rows:
+            sheet.append(row)
+            count += 1
+            if count % 5000 == 0:
+                logger.info(f"📝 Wrote {count} export rows...")
+
+        workbook.save(path)
+        return count
+
+    def iter_csv(self, rows: Iterator[List[Any]], rows_per_chunk: int = 500) -> Iterator[bytes]:
+        """Encode rows as CSV, yielding UTF-8 chunks (with BOM so Excel detects the encoding)."""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        buffer.write('\ufeff')
+        writer.writerow(self.COLUMNS)
+        pending = 0
+        for row in rows:
+            writer.writerow(['' if value is None else value for value in row])
+            pending += 1
+            if pending >= rows_per_chunk:
+                yield buffer.getvalue().encode('utf-8')
+                buffer.seek(0)
+                buffer.truncate(0)
+                pending = 0
+        yield buffer.getvalue().encode('utf-8')
+
+    def write_csv(self, rows: Iterator[List[Any]], path: str) -> int:
+        """
+        Write rows as CSV to ``path``.
+
+        Returns:
+            Number of data rows written
+        """
+        count = 0
+
+        def counted():
+            nonlocal count
+            for row in rows:
+                count += 1
+                yield row
+
+        with open(path, 'wb') as f:
+            for chunk in self.iter_csv(counted()):
+                f.write(chunk)
+        return count
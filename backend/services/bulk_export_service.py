@@ -0,0 +1,205 @@
+"""
+Service for bulk, analytics-oriented exports of documents, fields, matches and mismatches.
+"""
+import csv
+import io
+import json
+import logging
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from database.models import Document, ExtractedField, Match, Mismatch, ClientProfile
+
+logger = logging.getLogger(__name__)
+
+# (output column, SQL expression, type) per entity; types map onto Parquet columns
+ENTITY_COLUMNS = {
+    'documents': [
+        ('doc_id', Document.id, 'int'),
+        ('filename', Document.filename, 'string'),
+        ('status', Document.status, 'string'),
+        ('gcs_uri', Document.gcs_uri, 'string'),
+        ('created_at', Document.created_at, 'timestamp'),
+        ('updated_at', Document.updated_at, 'timestamp'),
+    ],
+    'fields': [
+        ('field_id', ExtractedField.id, 'int'),
+        ('doc_id', ExtractedField.doc_id, 'int'),
+        ('field_name', ExtractedField.field_name, 'string'),
+        ('raw_value', ExtractedField.raw_value, 'string'),
+        ('normalized_value', ExtractedField.normalized_value, 'string'),
+        ('confidence_score', ExtractedField.confidence_score, 'float'),
+        ('page_number', ExtractedField.page_number, 'int'),
+        ('created_at', ExtractedField.created_at, 'timestamp'),
+    ],
+    'matches': [
+        ('match_id', Match.id, 'int'),
+        ('doc_id', Match.doc_id, 'int'),
+        ('client_id', Match.client_id, 'int'),
+        ('client_name', ClientProfile.name, 'string'),
+        ('client_external_id', ClientProfile.external_id, 'string'),
+        ('match_score', Match.match_score, 'float'),
+        ('decision', Match.decision, 'string'),
+        ('created_at', Match.created_at, 'timestamp'),
+    ],
+    'mismatches': [
+        ('mismatch_id', Mismatch.id, 'int'),
+        ('doc_id', Mismatch.doc_id, 'int'),
+        ('field', Mismatch.field, 'string'),
+        ('expected_value', Mismatch.expected_value, 'string'),
+        ('observed_value', Mismatch.observed_value, 'string'),
+        ('page_number', Mismatch.page_number, 'int'),
+        ('created_at', Mismatch.created_at, 'timestamp'),
+    ],
+}
+
+ENTITY_MODELS = {
+    'documents': Document,
+    'fields': ExtractedField,
+    'matches': Match,
+    'mismatches': Mismatch,
+}
+
+
+def parquet_available() -> bool:
+    """Whether the optional pyarrow dependency needed for Parquet exports is installed."""
+    try:
+        import pyarrow  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class BulkExportService:
+    """
+    Service for streaming whole tables out as CSV, JSONL or Parquet.
+
+    Rows are read through a server-side cursor in batches of ``batch_size``
+    and encoded batch by batch, so memory stays constant regardless of how
+    many rows are exported.
+    """
+
+    ENTITIES = tuple(ENTITY_COLUMNS)
+    FORMATS = ('csv', 'jsonl', 'parquet')
+    MEDIA_TYPES = {
+        'csv': 'text/csv',
+        'jsonl': 'application/x-ndjson',
+        'parquet': 'application/vnd.apache.parquet',
+    }
+
+    def __init__(self, batch_size: int = 5000):
+        """Initialize bulk export service."""
+        self.batch_size = batch_size
+
+    def columns(self, entity: str) -> List[str]:
+        """Output column names of ``entity``."""
+        return [name for name, _, _ in ENTITY_COLUMNS[entity]]
+
+    def iter_batches(
+        self,
+        db: Session,
+        entity: str,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        status: Optional[str] = None
+    ) -> Iterator[Sequence[Tuple[Any, ...]]]:
+        """
+        Stream the rows of one entity in batches, ordered by its ID.
+
+        Args:
+            db: Database session
+            entity: One of ENTITIES
+            date_from: First document upload date to include
+            date_to: Last document upload date to include
+            status: Only include rows of documents with this status
+
+        Returns:
+            Iterator of row batches (tuples in ENTITY_COLUMNS order)
+        """
+        model = ENTITY_MODELS[entity]
+        stmt = select(*[expression for _, expression, _ in ENTITY_COLUMNS[entity]])
+        if model is not Document:
+            stmt = stmt.select_from(model).join(Document, Document.id == model.doc_id)
+        if model is Match:
+            stmt = stmt.outerjoin(ClientProfile, ClientProfile.id == Match.client_id)
+        if date_from:
+            stmt = stmt.where(Document.created_at >= datetime.combine(date_from, datetime.min.time()))
+        if date_to:
+            stmt = stmt.where(Document.created_at < datetime.combine(date_to + timedelta(days=1), datetime.min.time()))
+        if status:
+            stmt = stmt.where(Document.status == status)
+        stmt = stmt.order_by(model.id).execution_options(yield_per=self.batch_size)
+
+        # yield_per streams from a server-side cursor instead of buffering the result
+        result = db.execute(stmt)
+        try:
+            for partition in result.partitions():
+                yield partition
+        finally:
+            result.close()
+
+    def iter_csv(self, entity: str, batches: Iterator[Sequence[Tuple[Any, ...]]]) -> Iterator[bytes]:
+        """Encode batches as CSV (header first), one UTF-8 chunk per batch."""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(self.columns(entity))
+        for batch in batches:
+            writer.writerows([_csv_value(value) for value in row] for row in batch)
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate(0)
+        yield buffer.getvalue().encode('utf-8')
+
+    def iter_jsonl(self, entity: str, batches: Iterator[Sequence[Tuple[Any, ...]]]) -> Iterator[bytes]:
+        """Encode batches as JSON Lines (one object per row), one UTF-8 chunk per batch."""
+        columns = self.columns(entity)
+        for batch in batches:
+            lines = [json.dumps(dict(zip(columns, row)), default=_json_default) for row in batch]
+            yield ('\n'.join(lines) + '\n').encode('utf-8')
+
+    def write_parquet(self, entity: str, batches: Iterator[Sequence[Tuple[Any, ...]]], path: str) -> int:
+        """
+        Write batches to a Parquet file at ``path``, one row group per batch.
+
+        Requires pyarrow (see parquet_available).
+
+        Returns:
+            Number of rows written
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        arrow_types = {
+            'int': pa.int64(),
+            'float': pa.float64(),
+            'string': pa.string(),
+            'timestamp': pa.timestamp('us'),
+        }
+        schema = pa.schema([(name, arrow_types[kind]) for name, _, kind in ENTITY_COLUMNS[entity]])
+
+        count = 0
+        with pq.ParquetWriter(path, schema, compression='snappy') as writer:
+            for batch in batches:
+                arrays = [pa.array(list(values), type=field.type) for values, field in zip(zip(*batch), schema)]
+                writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+                count += len(batch)
+            if not count:
+                writer.write_table(schema.empty_table())
+        logger.info(f"📝 Wrote {count} {entity} rows to Parquet")
+        return count
+
+
+def _csv_value(value: Any) -> Any:
+    if value is None:
+        return ''
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
@@ -0,0 +1,615 @@
+"""
+Service for bulk-importing client datasets.
+"""
+import codecs
+import io
+import logging
+import os
+import time
+from datetime import date
+from typing import BinaryIO, Callable, Dict, Any, Iterable, Iterator, Optional, Tuple
+import pandas as pd
+from dateutil import parser as date_parser
+from dotenv import load_dotenv
+from openpyxl import load_workbook
+from pydantic_settings import BaseSettings
+from sqlalchemy import func, text
+from sqlalchemy.orm import Session
+
+from database.models import ClientProfile
+from services.client_snapshot import client_snapshot_service, refresh_client_snapshot
+from services.document_summary import refresh_documents_of_clients
+from services.job_service import JobService
+from services.normalization import BLOCK_PREFIX_LENGTH
+from services.rematch_service import run_rematch_job
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+
+class ClientImportSettings(BaseSettings):
+    """Client import configuration."""
+    # Rows parsed, cleaned and staged at a time; bounds peak memory per upload
+    client_import_chunk_size: int = int(os.getenv("CLIENT_IMPORT_CHUNK_SIZE", "50000"))
+
+    class Config:
+        env_file = ".env"
+        extra = "ignore"  # Ignore extra fields from .env
+
+
+class ClientImportService:
+    """
+    Vectorized client dataset ingestion.
+
+    Uploads are read in bounded chunks (CSV via ``chunksize``, XLSX row by
+    row in openpyxl read-only mode). Each chunk is cleaned, normalized and
+    date-parsed with pandas column operations, then streamed into a
+    temporary staging table with COPY FROM STDIN, so peak memory does not
+    grow with the file size. A single set-based INSERT ... SELECT moves the new,
+    de-duplicated clients into client_profiles at the end.
+    """
+
+    NAME_COLUMN_VARIATIONS = [
+        'name', 'client_name', 'patient_name', 'full_name',
+        'clientname', 'patientname', 'fullname'
+    ]
+    DOB_VARIATIONS = ['dob', 'date_of_birth', 'birth_date', 'birthdate', 'dateofbirth']
+    DOA_VARIATIONS = ['doa', 'date_of_accident', 'accident_date', 'incident_date', 'dateofaccident']
+    EXTERNAL_ID_VARIATIONS = [
+        'external_id', 'externalid', 'client_id', 'clientid',
+        'member_id', 'memberid', 'patient_id', 'patientid', 'mrn'
+    ]
+    INVALID_NAMES = ['nan', 'none', 'null', '']
+
+    # Explicit formats tried (vectorized) before falling back to dateutil.
+    # Two-digit years are left to dateutil so its century pivot is preserved.
+    DATE_FORMATS = [
+        '%Y-%m-%d', '%m/%d/%Y', '%m-%d-%Y', '%Y/%m/%d',
+        '%Y-%m-%d %H:%M:%S', '%m/%d/%Y %H:%M:%S',
+        '%d-%b-%Y', '%b %d, %Y', '%B %d, %Y',
+    ]
+
+    ENCODING_PROBE_BLOCK = 1024 * 1024
+
+    # 'skip' leaves existing clients untouched; 'sync' upserts on sync_key
+    MODES = ('skip', 'sync')
+    # Rows upserted per statement in sync mode
+    SYNC_BATCH_SIZE = 5000
+
+    STAGING_TABLE = "client_import_staging"
+    SYNC_TABLE = "client_import_sync"
+    STAGING_COLUMNS = [
+        'row_number', 'name', 'normalized_name', 'block_key_first', 'block_key_last', 'dob', 'doa', 'external_id'
+    ]
+
+    # Identity of a client across roster refreshes: the external ID when the file
+    # has one, otherwise normalized name + DOB. Must match add_client_sync_columns.sql.
+    SYNC_KEY_SQL = "COALESCE('ext:' || external_id, 'nd:' || normalized_name || '|' || COALESCE(dob::text, ''))"
+    CONTENT_HASH_SQL = (
+        "md5(concat_ws('|', name, COALESCE(dob::text, ''), COALESCE(doa::text, ''), COALESCE(external_id, '')))"
+    )
+
+    def __init__(self):
+        """Initialize client import service."""
+        self.settings = ClientImportSettings()
+
+    def read_chunks(self, fileobj: BinaryIO, file_ext: str, chunk_size: Optional[int] = None) -> Iterator[pd.DataFrame]:
+        """
+        Stream an uploaded dataset as DataFrame chunks without loading it whole.
+
+        Args:
+            fileobj: Seekable binary file object positioned at the start
+            file_ext: '.csv', '.xlsx' or '.xls'
+            chunk_size: Rows per chunk (defaults to CLIENT_IMPORT_CHUNK_SIZE)
+
+        Returns:
+            Iterator of DataFrames sharing the file's header row
+        """
+        chunk_size = chunk_size or self.settings.client_import_chunk_size
+        if file_ext == '.csv':
+            return self._read_csv_chunks(fileobj, chunk_size)
+        return self._read_xlsx_chunks(fileobj, chunk_size)
+
+    def _read_csv_chunks(self, fileobj: BinaryIO, chunk_size: int) -> Iterator[pd.DataFrame]:
+        """Read a CSV in fixed-size chunks."""
+        encoding = self._detect_csv_encoding(fileobj)
+        logger.info(f"📖 Streaming CSV ({encoding}) in chunks of {chunk_size} rows...")
+        # Read every column as text so chunks agree on dtypes
+        with pd.read_csv(fileobj, encoding=encoding, chunksize=chunk_size, dtype=str) as reader:
+            for chunk in reader:
+                yield chunk
+
+    def _detect_csv_encoding(self, fileobj: BinaryIO) -> str:
+        """Check that the whole file decodes as UTF-8 (block by block), else fall back to Latin-1."""
+        decoder = codecs.getincrementaldecoder('utf-8')()
+        try:
+            while True:
+                block = fileobj.read(self.ENCODING_PROBE_BLOCK)
+                decoder.decode(block, final=not block)
+                if not block:
+                    return 'utf-8'
+        except UnicodeDecodeError:
+            logger.info("⚠️ UTF-8 failed, trying Latin-1...")
+            return 'latin-1'
+        finally:
+            fileobj.seek(0)
+
+    def _read_xlsx_chunks(self, fileobj: BinaryIO, chunk_size: int) -> Iterator[pd.DataFrame]:
+        """Read the first worksheet row by row (openpyxl read-only mode)."""
+        logger.info(f"📖 Streaming workbook in chunks of {chunk_size} rows...")
+        workbook = load_workbook(fileobj, read_only=True, data_only=True)
+        try:
+            rows = workbook.worksheets[0].iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                return
+            columns = [str(col) if col is not None else f"unnamed_{i}" for i, col in enumerate(header)]
+
+            batch = []
+            for row in rows:
+                if not any(value is not None for value in row):
+                    continue
+                batch.append(row[:len(columns)])
+                if len(batch) >= chunk_size:
+                    yield pd.DataFrame.from_records(batch, columns=columns)
+                    batch = []
+            if batch:
+                yield pd.DataFrame.from_records(batch, columns=columns)
+        finally:
+            workbook.close()
+
+    def import_chunks(
+        self,
+        db: Session,
+        chunks: Iterable[pd.DataFrame],
+        mode: str = 'skip',
+        progress: Optional[Callable[[Dict[str, int]], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        Import client rows from one or more DataFrame chunks.
+
+        Args:
+            db: Database session (committed on success)
+            chunks: DataFrames with the raw uploaded columns
+            mode: 'skip' inserts only clients whose name is new (case-insensitive);
+                'sync' inserts new clients and updates those whose content changed
+            progress: Optional callback receiving parsed/staged/rejected row counts
+                after every chunk. It must not use ``db``: committing would drop
+                the staging table.
+
+        Returns:
+            Import summary with per-stage timings in milliseconds. ``updated_client_ids``
+            lists the existing clients whose values changed (sync mode); it is for
+            the follow-up re-matching, not for responses.
+
+        Raises:
+            ValueError: If the mode is unknown, or no name column or no valid rows are found
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"Invalid import mode '{mode}'. Allowed: {', '.join(self.MODES)}")
+
+        timings = {stage: 0.0 for stage in ['parse', 'clean', 'dates', 'normalize', 'copy', 'insert']}
+        columns: Optional[Tuple[str, Optional[str], Optional[str], Optional[str]]] = None
+        parsed_rows = 0
+        valid_rows = 0
+
+        self._create_staging_table(db)
+
+        chunk_iter = iter(chunks)
+        try:
+            while True:
+                started = time.perf_counter()
+                try:
+                    df = next(chunk_iter)
+                except StopIteration:
+                    break
+                timings['parse'] += time.perf_counter() - started
+
+                df.columns = df.columns.astype(str).str.strip().str.lower().str.replace(' ', '_')
+                if columns is None:
+                    columns = self.detect_columns(list(df.columns))
+                parsed_rows += len(df)
+
+                frame = self._prepare_chunk(df, *columns, timings=timings, offset=parsed_rows - len(df))
+                valid_rows += len(frame)
+
+                started = time.perf_counter()
+                self._copy_to_staging(db, frame)
+                timings['copy'] += time.perf_counter() - started
+
+                logger.info(f"📥 Staged {valid_rows} valid rows ({parsed_rows} parsed)")
+                if progress:
+                    progress({"parsed": parsed_rows, "staged": valid_rows, "rejected": parsed_rows - valid_rows})
+        finally:
+            # Release the reader (and its file handle) even when a chunk fails
+            if hasattr(chunk_iter, 'close'):
+                chunk_iter.close()
+
+        if columns is None:
+            raise ValueError("No rows found in the uploaded file")
+
+        if valid_rows == 0:
+            raise ValueError("No valid rows found. Please ensure the dataset has at least one row with a valid 'name' column.")
+
+        started = time.perf_counter()
+        if mode == 'sync':
+            counts = self._upsert_from_staging(db)
+            updated_client_ids = counts.pop("updated_client_ids")
+        else:
+            counts = {"inserted": self._insert_from_staging(db)}
+            counts["skipped"] = valid_rows - counts["inserted"]
+            updated_client_ids = []
+        db.commit()
+        timings['insert'] += time.perf_counter() - started
+
+        timings_ms = {stage: round(seconds * 1000, 1) for stage, seconds in timings.items()}
+        logger.info(f"✅ Imported client dataset ({mode}) from {valid_rows} valid rows: {counts}. Timings (ms): {timings_ms}")
+        return {
+            "mode": mode,
+            "total_rows": valid_rows,
+            **counts,
+            "rejected": parsed_rows - valid_rows,
+            "timings_ms": timings_ms,
+            "updated_client_ids": updated_client_ids,
+        }
+
+    def detect_columns(self, columns: list) -> Tuple[str, Optional[str], Optional[str], Optional[str]]:
+        """
+        Find the name, DOB, DOA and external ID columns among normalized column names.
+
+        Raises:
+            ValueError: If no name column is found
+        """
+        logger.info(f"📋 Columns found: {', '.join(columns)}")
+
+        name_column = next((col for col in columns if col in self.NAME_COLUMN_VARIATIONS), None)
+        if not name_column:
+            # Try partial match (contains 'name' but not 'first' or 'last')
+            name_column = next(
+                (col for col in columns if 'name' in col and 'first' not in col and 'last' not in col),
+                None
+            )
+            if name_column:
+                logger.info(f"✅ Found name column by partial match: {name_column}")
+
+        if not name_column:
+            raise ValueError(
+                f"Could not find name column. Expected one of: {', '.join(self.NAME_COLUMN_VARIATIONS)}. "
+                f"Found columns: {', '.join(columns)}"
+            )
+
+        dob_column = None
+        doa_column = None
+        external_id_column = None
+        for col in columns:
+            if col in self.DOB_VARIATIONS:
+                dob_column = col
+            elif col in self.DOA_VARIATIONS:
+                doa_column = col
+            elif col in self.EXTERNAL_ID_VARIATIONS and external_id_column is None:
+                external_id_column = col
+
+        logger.info(
+            f"✅ Using name column: '{name_column}', DOB column: '{dob_column}', "
+            f"DOA column: '{doa_column}', external ID column: '{external_id_column}'"
+        )
+        return name_column, dob_column, doa_column, external_id_column
+
+    def parse_dates(self, values: pd.Series) -> pd.Series:
+        """
+        Parse a column of dates into Python date objects (None when unparseable).
+
+        Explicit formats are tried as vectorized passes; only the leftovers go
+        through dateutil, once per distinct value.
+        """
+        result = pd.Series(None, index=values.index, dtype=object)
+        if pd.api.types.is_datetime64_any_dtype(values):
+            present = values.notna()
+            result[present] = values[present].dt.date
+            return result
+
+        remaining = values.notna()
+        text_values = values[remaining].astype(str).str.strip()
+        remaining[text_values.index[text_values == '']] = False
+
+        for fmt in self.DATE_FORMATS:
+            if not remaining.any():
+                break
+            attempt = pd.to_datetime(text_values[remaining[text_values.index]], format=fmt, errors='coerce')
+            hits = attempt[attempt.notna()]
+            if len(hits):
+                result[hits.index] = hits.dt.date
+                remaining[hits.index] = False
+
+        if remaining.any():
+            leftovers = text_values[remaining[text_values.index]]
+            lookup = {value: self._parse_date_fallback(value) for value in leftovers.unique()}
+            result[leftovers.index] = leftovers.map(lookup)
+
+        return result
+
+    def _parse_date_fallback(self, value: str) -> Optional[date]:
+        """Parse a free-form date with dateutil."""
+        try:
+            return date_parser.parse(value, fuzzy=True).date()
+        except Exception as e:
+            logger.debug(f"Could not parse date '{value}': {e}")
+            return None
+
+    def _prepare_chunk(
+        self,
+        df: pd.DataFrame,
+        name_column: str,
+        dob_column: Optional[str],
+        doa_column: Optional[str],
+        external_id_column: Optional[str],
+        timings: Dict[str, float],
+        offset: int = 0
+    ) -> pd.DataFrame:
+        """Clean names, parse dates and compute normalized columns for one chunk."""
+        started = time.perf_counter()
+        names = df[name_column]
+        names = names[names.notna()].astype(str).str.strip()
+        names = names[~names.str.lower().isin(self.INVALID_NAMES)]
+        timings['clean'] += time.perf_counter() - started
+
+        frame = pd.DataFrame({'name': names})
+        # Positional row numbers keep the file order across chunks
+        frame['row_number'] = df.index.get_indexer(names.index) + offset
+
+        started = time.perf_counter()
+        for column, source in (('dob', dob_column), ('doa', doa_column)):
+            frame[column] = self.parse_dates(df.loc[names.index, source]) if source else None
+        timings['dates'] += time.perf_counter() - started
+
+        started = time.perf_counter()
+        normalized = (
+            names.str.lower()
+            .str.replace(r'[^\w\s]', '', regex=True)
+            .str.split()
+            .str.join(' ')
+        )
+        tokens = normalized.str.split()
+        frame['normalized_name'] = normalized
+        frame['block_key_first'] = tokens.str[0].str[:BLOCK_PREFIX_LENGTH].fillna('')
+        frame['block_key_last'] = tokens.str[-1].str[:BLOCK_PREFIX_LENGTH].fillna('')
+        if external_id_column:
+            external_ids = df.loc[names.index, external_id_column]
+            cleaned = external_ids.astype(str).str.strip()
+            frame['external_id'] = cleaned.where(
+                external_ids.notna() & ~cleaned.str.lower().isin(self.INVALID_NAMES)
+            )
+        else:
+            frame['external_id'] = None
+        timings['normalize'] += time.perf_counter() - started
+
+        return frame[self.STAGING_COLUMNS]
+
+    def _create_staging_table(self, db: Session):
+        """Create the per-transaction staging table."""
+        db.execute(text(f"""
+            CREATE TEMP TABLE IF NOT EXISTS {self.STAGING_TABLE} (
+                row_number BIGINT,
+                name VARCHAR(255),
+                normalized_name VARCHAR(255),
+                block_key_first VARCHAR(16),
+                block_key_last VARCHAR(16),
+                dob DATE,
+                doa DATE,
+                external_id VARCHAR(255)
+            ) ON COMMIT DROP
+        """))
+
+    def _copy_to_staging(self, db: Session, frame: pd.DataFrame):
+        """Stream a prepared chunk into the staging table with COPY FROM STDIN."""
+        if frame.empty:
+            return
+        buffer = io.StringIO()
+        frame.to_csv(buffer, index=False, header=False, date_format='%Y-%m-%d')
+        buffer.seek(0)
+
+        cursor = db.connection().connection.cursor()
+        try:
+            cursor.copy_expert(
+                f"COPY {self.STAGING_TABLE} ({', '.join(self.STAGING_COLUMNS)}) FROM STDIN "
+                f"WITH (FORMAT csv, FORCE_NOT_NULL (normalized_name, block_key_first, block_key_last))",
+                buffer
+            )
+        finally:
+            cursor.close()
+
+    def _insert_from_staging(self, db: Session) -> int:
+        """Insert staged clients whose name (case-insensitive) is new, keeping file order."""
+        result = db.execute(text(f"""
+            INSERT INTO client_profiles (
+                name, normalized_name, block_key_first, block_key_last, dob, doa,
+                external_id, sync_key, content_hash, created_at, updated_at
+            )
+            SELECT
+                name, normalized_name, block_key_first, block_key_last, dob, doa,
+                external_id, {self.SYNC_KEY_SQL}, {self.CONTENT_HASH_SQL}, now(), now()
+            FROM (
+                SELECT DISTINCT ON (lower(s.name)) s.*
+                FROM {self.STAGING_TABLE} s
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM client_profiles c WHERE lower(c.name) = lower(s.name)
+                )
+                ORDER BY lower(s.name), s.row_number
+            ) new_clients
+            ORDER BY row_number
+            ON CONFLICT (sync_key) WHERE sync_key IS NOT NULL DO NOTHING
+        """))
+        return result.rowcount
+
+    def _upsert_from_staging(self, db: Session) -> Dict[str, Any]:
+        """
+        Upsert staged clients on sync_key in batches.
+
+        The last occurrence of a key in the file wins. Existing rows are only
+        rewritten when their content hash changed, so unchanged clients cost
+        no writes. Returns the counts and the IDs of the updated clients.
+        """
+        db.execute(text(f"""
+            CREATE TEMP TABLE {self.SYNC_TABLE} ON COMMIT DROP AS
+            SELECT row_number() OVER (ORDER BY row_number) AS seq, latest.*
+            FROM (
+                SELECT DISTINCT ON (keyed.sync_key) keyed.*
+                FROM (
+                    SELECT s.*, {self.SYNC_KEY_SQL} AS sync_key, {self.CONTENT_HASH_SQL} AS content_hash
+                    FROM {self.STAGING_TABLE} s
+                ) keyed
+                ORDER BY keyed.sync_key, keyed.row_number DESC
+            ) latest
+        """))
+        staged = db.execute(text(f"SELECT count(*) FROM {self.SYNC_TABLE}")).scalar()
+        staging_rows = db.execute(text(f"SELECT count(*) FROM {self.STAGING_TABLE}")).scalar()
+
+        inserted = 0
+        updated_ids = []
+        for start in range(0, staged, self.SYNC_BATCH_SIZE):
+            rows = db.execute(text(f"""
+                INSERT INTO client_profiles (
+                    name, normalized_name, block_key_first, block_key_last, dob, doa,
+                    external_id, sync_key, content_hash, created_at, updated_at
+                )
+                SELECT
+                    name, normalized_name, block_key_first, block_key_last, dob, doa,
+                    external_id, sync_key, content_hash, now(), now()
+                FROM {self.SYNC_TABLE}
+                WHERE seq > :start AND seq <= :end
+                ORDER BY seq
+                ON CONFLICT (sync_key) WHERE sync_key IS NOT NULL DO UPDATE SET
+                    name = EXCLUDED.name,
+                    normalized_name = EXCLUDED.normalized_name,
+                    block_key_first = EXCLUDED.block_key_first,
+                    block_key_last = EXCLUDED.block_key_last,
+                    dob = EXCLUDED.dob,
+                    doa = EXCLUDED.doa,
+                    external_id = EXCLUDED.external_id,
+                    content_hash = EXCLUDED.content_hash,
+                    updated_at = now()
+                WHERE client_profiles.content_hash IS DISTINCT FROM EXCLUDED.content_hash
+                RETURNING id, (xmax = 0) AS inserted
+            """), {"start": start, "end": start + self.SYNC_BATCH_SIZE}).fetchall()
+            inserted += sum(1 for row in rows if row.inserted)
+            updated_ids.extend(row.id for row in rows if not row.inserted)
+            logger.info(f"💾 Synced {min(start + self.SYNC_BATCH_SIZE, staged)}/{staged} clients")
+
+        # Keep the client shown on matched documents current
+        refresh_documents_of_clients(db, updated_ids)
+
+        return {
+            "inserted": inserted,
+            "updated": len(updated_ids),
+            "unchanged": staged - inserted - len(updated_ids),
+            # Repeated keys within the file (only the last occurrence is applied)
+            "skipped": staging_rows - staged,
+            "updated_client_ids": updated_ids,
+        }
+
+
+def first_new_client_id(db: Session) -> int:
+    """Lowest ID clients imported from now on can get (re-matching only looks at those)."""
+    return (db.query(func.max(ClientProfile.id)).scalar() or 0) + 1
+
+
+def queue_import_follow_ups(
+    db: Session,
+    result: Dict[str, Any],
+    min_new_client_id: int,
+    schedule: Callable[..., None],
+    job_service: Optional[JobService] = None
+) -> Dict[str, Any]:
+    """
+    Queue the work that follows a client import: a client snapshot refresh and
+    a re-matching job for the new and updated clients.
+
+    Pops ``updated_client_ids`` from ``result`` and sets ``rematch_job_id``.
+
+    Args:
+        db: Database session (the re-matching job record is committed)
+        result: Summary returned by ClientImportService.import_chunks
+        min_new_client_id: first_new_client_id() taken before the import
+        schedule: Called as ``schedule(task, *args)`` to run a task after the import is reported
+        job_service: Job service creating the re-matching job
+
+    Returns:
+        The updated result
+    """
+    job_service = job_service or JobService()
+    updated_client_ids = result.pop("updated_client_ids", [])
+    changed = bool(result["inserted"] or updated_client_ids)
+
+    # Publish a fresh shared client snapshot for the matching workers
+    if changed and client_snapshot_service.enabled:
+        schedule(refresh_client_snapshot)
+
+    # Re-evaluate unmatched/ambiguous documents the new or updated clients could affect,
+    # and re-detect mismatches of documents matched to updated clients
+    rematch_job = None
+    if changed:
+        rematch_job = job_service.create(db, 'rematch', message='Queued after client dataset upload')
+        schedule(run_rematch_job, rematch_job.id, min_new_client_id, updated_client_ids)
+    result["rematch_job_id"] = rematch_job.id if rematch_job else None
+    return result
+
+
+def run_client_import_job(job_id: int, file_path: str, file_ext: str, mode: str = 'skip'):
+    """
+    Background task to import an uploaded client dataset saved at ``file_path``.
+
+    Progress is reported through the job (and the status websocket) after every
+    chunk. On success the client snapshot is refreshed and a re-matching job is
+    run for the new and updated clients. The file is removed afterwards.
+    """
+    from database.connection import SessionLocal
+
+    db = SessionLocal()
+    # Job updates commit, so they go through their own session
+    job_db = SessionLocal()
+    import_service = ClientImportService()
+    job_service = JobService()
+    try:
+        job_service.update(job_db, job_id, status='running', processed=0, message='Importing client dataset...')
+
+        min_new_client_id = first_new_client_id(db)
+
+        def report(counts: Dict[str, int]):
+            job_service.update(
+                job_db, job_id, processed=counts["parsed"],
+                message=f"Parsed {counts['parsed']} rows ({counts['staged']} valid, {counts['rejected']} rejected)"
+            )
+
+        with open(file_path, 'rb') as f:
+            result = import_service.import_chunks(db, import_service.read_chunks(f, file_ext), mode=mode, progress=report)
+
+        # Snapshot refresh and re-matching run once the job is reported complete
+        follow_ups = []
+        queue_import_follow_ups(
+            job_db, result, min_new_client_id, lambda task, *args: follow_ups.append((task, args)), job_service
+        )
+
+        parsed = result["total_rows"] + result["rejected"]
+        job_service.update(
+            job_db, job_id, status='completed', total=parsed, processed=parsed, result=result,
+            message=f"Imported {result['inserted']} new clients"
+                    + (f", updated {result['updated']}" if result.get("updated") else "")
+        )
+
+        for task, args in follow_ups:
+            task(*args)
+    except Exception as e:
+        logger.error(f"❌ Client import job {job_id} failed: {str(e)}", exc_info=True)
+        db.rollback()
+        try:
+            job_service.update(job_db, job_id, status='failed', message=f'Import failed: {str(e)}')
+        except Exception as e2:
+            logger.error(f"❌ Failed to update job status: {str(e2)}", exc_info=True)
+    finally:
+        db.close()
+        job_db.close()
+        try:
+            os.remove(file_path)
+        except OSError:
+            pass
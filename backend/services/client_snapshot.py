@@ -0,0 +1,315 @@
+"""
+Memory-mapped columnar snapshot of the client dataset.
+
+The snapshot is a directory of NumPy ``.npy`` columns that every worker
+process maps read-only, so N workers share one copy of the client index
+through the OS page cache instead of each holding its own.
+
+Layout::
+
+    <snapshot_dir>/
+        CURRENT                 # name of the active version directory
+        v<version>/
+            manifest.json
+            ids.npy             # int64   client_profiles.id
+            name_offsets.npy    # int64   n + 1 offsets into name_data
+            name_data.npy       # uint8   UTF-8 normalized names, concatenated
+            block_first.npy     # S12     blocking key of the first name token
+            block_last.npy      # S12     blocking key of the last name token
+            dob.npy             # int32   date ordinal, 0 = missing
+            doa.npy             # int32   date ordinal, 0 = missing
+
+A new version is written next to the active one and published by atomically
+replacing ``CURRENT``; readers notice the change on their next lookup.
+"""
+import json
+import logging
+import os
+import shutil
+import threading
+import uuid
+from datetime import date, datetime
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+from dotenv import load_dotenv
+from pydantic_settings import BaseSettings
+from sqlalchemy.orm import Session
+
+from database.models import ClientProfile
+from services.normalization import (
+    BLOCK_PREFIX_LENGTH,
+    blocking_keys,
+    date_to_ordinal,
+    normalize_name,
+    ordinal_to_date,
+)
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+CURRENT_POINTER = "CURRENT"
+# Blocking keys are stored as fixed-width UTF-8 (up to 4 bytes per character)
+BLOCK_KEY_DTYPE = f"S{BLOCK_PREFIX_LENGTH * 4}"
+# Number of previous versions kept on disk for readers still mapping them
+KEEP_PREVIOUS_VERSIONS = 1
+
+
+class ClientSnapshotSettings(BaseSettings):
+    """Client snapshot configuration."""
+    client_snapshot_dir: str = os.getenv("CLIENT_SNAPSHOT_DIR", "")
+
+    class Config:
+        env_file = ".env"
+        extra = "ignore"  # Ignore extra fields from .env
+
+
+class ClientSnapshot:
+    """Read-only, memory-mapped view of one snapshot version."""
+
+    def __init__(self, path: str):
+        """Map every column of the snapshot at ``path``."""
+        self.path = path
+        with open(os.path.join(path, "manifest.json"), "r") as f:
+            self.manifest = json.load(f)
+        self.version = self.manifest["version"]
+
+        def _load(column: str) -> np.ndarray:
+            return np.load(os.path.join(path, f"{column}.npy"), mmap_mode="r")
+
+        self.ids = _load("ids")
+        self.name_offsets = _load("name_offsets")
+        self.name_data = _load("name_data")
+        self.block_first = _load("block_first")
+        self.block_last = _load("block_last")
+        self.dob = _load("dob")
+        self.doa = _load("doa")
+
+    def __len__(self) -> int:
+        return int(self.ids.shape[0])
+
+    def name(self, index: int) -> str:
+        """Get the normalized name stored at row ``index``."""
+        start, end = self.name_offsets[index], self.name_offsets[index + 1]
+        return bytes(self.name_data[start:end]).decode("utf-8")
+
+    def client_id(self, index: int) -> int:
+        """Get the client_profiles.id stored at row ``index``."""
+        return int(self.ids[index])
+
+    def dates(self, index: int) -> Tuple[Optional[date], Optional[date]]:
+        """Get the (dob, doa) stored at row ``index``."""
+        return ordinal_to_date(self.dob[index]), ordinal_to_date(self.doa[index])
+
+    def candidate_indices(self, normalized_name: str) -> np.ndarray:
+        """
+        Get the rows sharing at least one blocking key with ``normalized_name``.
+
+        Only the matching rows are ever decoded into Python strings, so the
+        bulk of the mapped pages stay shared between processes.
+        """
+        keys = np.array(
+            [key.encode("utf-8") for key in set(blocking_keys(normalized_name)) if key],
+            dtype=BLOCK_KEY_DTYPE,
+        )
+        if keys.size == 0 or len(self) == 0:
+            return np.empty(0, dtype=np.int64)
+        mask = np.isin(self.block_first, keys) | np.isin(self.block_last, keys)
+        return np.flatnonzero(mask)
+
+    def candidates(self, normalized_name: str) -> Tuple[List[int], List[str]]:
+        """Get (client_ids, normalized_names) of the blocking candidates for a name."""
+        indices = self.candidate_indices(normalized_name)
+        return [self.client_id(i) for i in indices], [self.name(i) for i in indices]
+
+
+def write_snapshot(
+    snapshot_dir: str,
+    rows: Iterable[Tuple[int, str, Optional[date], Optional[date]]],
+    version: Optional[str] = None,
+) -> str:
+    """
+    Write a new snapshot version from ``(id, normalized_name, dob, doa)`` rows and publish it.
+
+    Args:
+        snapshot_dir: Root snapshot directory
+        rows: Client rows with already-normalized names
+        version: Optional explicit version label
+
+    Returns:
+        The published version label
+    """
+    version = version or f"{datetime.now().strftime('%Y%m%d%H%M%S%f')}-{uuid.uuid4().hex[:8]}"
+    os.makedirs(snapshot_dir, exist_ok=True)
+    staging_path = os.path.join(snapshot_dir, f".tmp-v{version}")
+    final_path = os.path.join(snapshot_dir, f"v{version}")
+
+    ids: List[int] = []
+    offsets: List[int] = [0]
+    name_chunks: List[bytes] = []
+    block_first: List[bytes] = []
+    block_last: List[bytes] = []
+    dobs: List[int] = []
+    doas: List[int] = []
+
+    for client_id, normalized, dob, doa in rows:
+        encoded = normalized.encode("utf-8")
+        first, last = blocking_keys(normalized)
+        ids.append(client_id)
+        name_chunks.append(encoded)
+        offsets.append(offsets[-1] + len(encoded))
+        block_first.append(first.encode("utf-8"))
+        block_last.append(last.encode("utf-8"))
+        dobs.append(date_to_ordinal(dob))
+        doas.append(date_to_ordinal(doa))
+
+    os.makedirs(staging_path)
+    try:
+        columns = {
+            "ids": np.array(ids, dtype=np.int64),
+            "name_offsets": np.array(offsets, dtype=np.int64),
+            "name_data": np.frombuffer(b"".join(name_chunks), dtype=np.uint8),
+            "block_first": np.array(block_first, dtype=BLOCK_KEY_DTYPE),
+            "block_last": np.array(block_last, dtype=BLOCK_KEY_DTYPE),
+            "dob": np.array(dobs, dtype=np.int32),
+            "doa": np.array(doas, dtype=np.int32),
+        }
+        for column, values in columns.items():
+            np.save(os.path.join(staging_path, f"{column}.npy"), values)
+
+        with open(os.path.join(staging_path, "manifest.json"), "w") as f:
+            json.dump({
+                "version": version,
+                "count": len(ids),
+                "created_at": datetime.now().isoformat(),
+            }, f)
+
+        os.rename(staging_path, final_path)
+    except Exception:
+        shutil.rmtree(staging_path, ignore_errors=True)
+        raise
+
+    # Publish atomically: readers either see the old or the new pointer
+    pointer_tmp = os.path.join(snapshot_dir, f".{CURRENT_POINTER}.{version}")
+    with open(pointer_tmp, "w") as f:
+        f.write(f"v{version}")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(pointer_tmp, os.path.join(snapshot_dir, CURRENT_POINTER))
+
+    _prune_versions(snapshot_dir, keep=f"v{version}")
+    logger.info(f"✅ Published client snapshot v{version} ({len(ids)} clients)")
+    return version
+
+
+def _prune_versions(snapshot_dir: str, keep: str):
+    """Remove old snapshot versions, keeping the newest few for in-flight readers."""
+    versions = sorted(
+        entry for entry in os.listdir(snapshot_dir)
+        if entry.startswith("v") and entry != keep
+    )
+    stale = versions[:-KEEP_PREVIOUS_VERSIONS] if KEEP_PREVIOUS_VERSIONS else versions
+    for entry in stale:
+        # Mapped pages stay valid for processes that still hold them open
+        shutil.rmtree(os.path.join(snapshot_dir, entry), ignore_errors=True)
+
+
+class ClientSnapshotService:
+    """Exports client snapshots and hands out the current mapped version."""
+
+    def __init__(self, snapshot_dir: Optional[str] = None):
+        """Initialize client snapshot service."""
+        self.settings = ClientSnapshotSettings()
+        self.snapshot_dir = snapshot_dir if snapshot_dir is not None else self.settings.client_snapshot_dir
+        self._lock = threading.Lock()
+        self._snapshot: Optional[ClientSnapshot] = None
+        self._pointer_mtime: Optional[int] = None
+
+    @property
+    def enabled(self) -> bool:
+        """Whether a snapshot directory is configured."""
+        return bool(self.snapshot_dir)
+
+    def export(self, db: Session, batch_size: int = 10000) -> str:
+        """
+        Export client_profiles into a new snapshot version and publish it.
+
+        Args:
+            db: Database session
+            batch_size: Rows fetched per round trip
+
+        Returns:
+            The published version label
+        """
+        if not self.enabled:
+            raise ValueError("Client snapshot directory not configured")
+        rows = (
+            db.query(
+                ClientProfile.id,
+                ClientProfile.name,
+                ClientProfile.normalized_name,
+                ClientProfile.dob,
+                ClientProfile.doa,
+            )
+            .order_by(ClientProfile.id)
+            .yield_per(batch_size)
+        )
+        return write_snapshot(self.snapshot_dir, (
+            (
+                row.id,
+                # Rows not yet backfilled are normalized on the fly
+                row.normalized_name if row.normalized_name is not None else normalize_name(row.name),
+                row.dob,
+                row.doa,
+            )
+            for row in rows
+        ))
+
+    def current(self) -> Optional[ClientSnapshot]:
+        """
+        Get the currently published snapshot, remapping it if a newer one was published.
+
+        Returns None when snapshots are disabled or none has been published yet.
+        """
+        if not self.enabled:
+            return None
+        pointer_path = os.path.join(self.snapshot_dir, CURRENT_POINTER)
+        try:
+            mtime = os.stat(pointer_path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+        if self._snapshot is not None and mtime == self._pointer_mtime:
+            return self._snapshot
+
+        with self._lock:
+            if self._snapshot is None or mtime != self._pointer_mtime:
+                try:
+                    with open(pointer_path, "r") as f:
+                        version_dir = f.read().strip()
+                    self._snapshot = ClientSnapshot(os.path.join(self.snapshot_dir, version_dir))
+                    self._pointer_mtime = mtime
+                    logger.info(f"📦 Mapped client snapshot {self._snapshot.version} ({len(self._snapshot)} clients)")
+                except Exception as e:
+                    logger.warning(f"⚠️ Could not map client snapshot: {str(e)}")
+                    return self._snapshot
+        return self._snapshot
+
+
+# Process-wide instance so every request in a worker shares the same mapping
+client_snapshot_service = ClientSnapshotService()
+
+
+def refresh_client_snapshot():
+    """Background task: export a fresh snapshot after the client dataset changed."""
+    if not client_snapshot_service.enabled:
+        return
+    from database.connection import SessionLocal
+
+    db = SessionLocal()
+    try:
+        client_snapshot_service.export(db)
+    except Exception as e:
+        logger.error(f"❌ Failed to refresh client snapshot: {str(e)}", exc_info=True)
+    finally:
+        db.close()
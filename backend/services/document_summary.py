@@ -0,0 +1,87 @@
+"""
+Denormalized per-document match summary.
+
+Each document row carries its match decision, score, matched client and
+mismatch count, so list and review screens render from a single scan of
+``documents`` instead of querying matches, client_profiles and mismatches
+per document. The summary is written by whoever changes a document's match
+(the processing pipeline and re-matching) in the same transaction.
+"""
+import logging
+from typing import List
+from sqlalchemy import bindparam, text
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# The first match per document is the one shown everywhere else (export, match view)
+SUMMARY_UPDATE_SQL = """
+    UPDATE documents d SET
+        match_decision = m.decision,
+        match_score = m.match_score,
+        matched_client_id = m.client_id,
+        matched_client_name = c.name,
+        mismatch_count = (SELECT count(*) FROM mismatches mm WHERE mm.doc_id = d.id),
+        summary_updated_at = now(),
+        version = d.version + 1
+    FROM documents target
+    LEFT JOIN LATERAL (
+        SELECT decision, match_score, client_id
+        FROM matches
+        WHERE matches.doc_id = target.id
+        ORDER BY matches.id
+        LIMIT 1
+    ) m ON true
+    LEFT JOIN client_profiles c ON c.id = m.client_id
+    WHERE d.id = target.id AND target.id IN :doc_ids
+"""
+
+
+def update_document_summaries(db: Session, doc_ids: List[int]):
+    """
+    Recompute the summary columns of ``doc_ids`` from their match and mismatch rows.
+
+    Does not commit: callers commit together with the match/mismatch changes
+    (and status) so readers never see a summary out of step with its rows.
+
+    Args:
+        db: Database session
+        doc_ids: Documents whose match or mismatches changed
+    """
+    if not doc_ids:
+        return
+    db.flush()
+    db.execute(
+        text(SUMMARY_UPDATE_SQL).bindparams(bindparam("doc_ids", expanding=True)),
+        {"doc_ids": list(doc_ids)}
+    )
+
+
+def refresh_documents_of_clients(db: Session, client_ids: List[int]) -> int:
+    """
+    Refresh the client name and version of documents matched to updated clients.
+
+    Bumping the version revalidates cached match views (which show the
+    client's values) as soon as the update commits; their mismatches are
+    re-detected afterwards by the re-matching job. Does not commit.
+
+    Args:
+        db: Database session
+        client_ids: Clients updated in the current transaction
+
+    Returns:
+        Number of documents updated
+    """
+    if not client_ids:
+        return 0
+    result = db.execute(text("""
+        UPDATE documents d SET
+            matched_client_name = c.name,
+            summary_updated_at = now(),
+            version = d.version + 1
+        FROM client_profiles c
+        WHERE d.matched_client_id = c.id AND c.id IN :client_ids
+    """).bindparams(bindparam("client_ids", expanding=True)), {"client_ids": list(client_ids)})
+    if result.rowcount:
+        logger.info(f"🔄 Refreshed {result.rowcount} documents matched to updated clients")
+    return result.rowcount
@@ -0,0 +1,170 @@
+"""
+Response views of a document, its extracted fields and its field-by-field match.
+
+Shared by the individual endpoints (/documents/{id}, /documents/{id}/extracted-fields,
+/matches/{id}) and the aggregate /documents/{id}/full, which loads everything
+in one go and builds the same views from the loaded rows.
+"""
+import re
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+from dateutil import parser as date_parser
+from database.models import ClientProfile, Document, ExtractedField, Match, Mismatch
+
+# Only these fields are shown on the review screens (referral/service dates are excluded)
+REVIEW_FIELDS = ['patient_name', 'dob', 'doa']
+
+FIELD_DISPLAY_NAMES = {
+    'patient_name': 'Patient Name',
+    'dob': 'Date of Birth',
+    'doa': 'Date of Accident'
+}
+
+DISPLAY_DATE_PATTERN = re.compile(r'^\d{2}/\d{2}/\d{4}$')
+
+
+def field_display_name(field_name: str) -> str:
+    """Display name of an extracted field."""
+    return FIELD_DISPLAY_NAMES.get(field_name, field_name.replace('_', ' ').title())
+
+
+@lru_cache(maxsize=4096)
+def display_date(value: str) -> str:
+    """
+    Format an extracted date as MM/DD/YYYY, leaving values that cannot be parsed as-is.
+
+    Cached: the same handful of extracted values is rendered on every review page load.
+    """
+    if DISPLAY_DATE_PATTERN.match(value):
+        return value
+    try:
+        return date_parser.parse(value, fuzzy=True).strftime('%m/%d/%Y')
+    except (ValueError, OverflowError):
+        return value
+
+
+def document_view(document: Document) -> Dict[str, Any]:
+    """Document metadata, as returned by GET /documents/{id}."""
+    return {
+        "doc_id": document.id,
+        "filename": document.filename,
+        "status": document.status,
+        "created_at": document.created_at,
+        "updated_at": document.updated_at,
+    }
+
+
+def extracted_fields_view(fields: List[ExtractedField]) -> List[Dict[str, Any]]:
+    """Extracted review fields, as returned by GET /documents/{id}/extracted-fields."""
+    return [
+        {
+            "field_name": field_display_name(field.field_name),
+            "value_raw": field.raw_value,
+            "value_norm": field.normalized_value,
+            "confidence": field.confidence_score,
+            "page_num": field.page_number if field.page_number else 1
+        }
+        for field in fields
+        if field.field_name in REVIEW_FIELDS
+    ]
+
+
+def match_view(
+    match: Optional[Match],
+    client: Optional[ClientProfile],
+    fields: List[ExtractedField],
+    mismatches: List[Mismatch]
+) -> Dict[str, Any]:
+    """
+    Field-by-field match information, as returned by GET /matches/{id}.
+
+    Args:
+        match: The document's match (None if it has not been matched)
+        client: The matched client profile
+        fields: The document's extracted fields
+        mismatches: The document's mismatch records
+
+    Returns:
+        Match summary with per-field match status and mismatch details
+    """
+    if not match:
+        return {
+            "client_id": None,
+            "score": None,
+            "decision": "No match found yet",
+            "client_name": None,
+            "field_matches": {}
+        }
+
+    client_name = client.name if client else None
+    mismatch_lookup = {m.field: m for m in mismatches}
+    mismatch_details = [
+        {
+            "field": m.field,
+            "expected_value": m.expected_value,
+            "observed_value": m.observed_value,
+            "page_number": m.page_number or 1
+        }
+        for m in mismatches
+    ]
+
+    field_matches = {}
+    for field in fields:
+        field_name = field.field_name
+        if field_name not in REVIEW_FIELDS:
+            continue
+
+        # Dates are shown as MM/DD/YYYY
+        extracted_value = field.normalized_value or field.raw_value
+        if field_name in ['dob', 'doa'] and extracted_value:
+            extracted_value = display_date(extracted_value)
+
+        page_number = field.page_number if field.page_number else 1
+        expected_value = None
+
+        if field_name == 'patient_name':
+            # Name matching is done at document level
+            expected_value = client_name
+            if match.decision in ['match', 'ambiguous']:
+                match_status, is_match = "matched", True
+            else:
+                match_status, is_match = "not_matched", False
+        elif field_name in mismatch_lookup:
+            mismatch = mismatch_lookup[field_name]
+            match_status, is_match = "mismatch", False
+            expected_value = mismatch.expected_value
+            page_number = mismatch.page_number if mismatch.page_number else page_number
+        else:
+            client_value = None
+            if client:
+                client_date = client.dob if field_name == 'dob' else client.doa
+                client_value = client_date.strftime('%m/%d/%Y') if client_date else None
+
+            if client_value:
+                expected_value = client_value
+                if extracted_value == client_value:
+                    match_status, is_match = "matched", True
+                else:
+                    match_status, is_match = "mismatch", False
+            else:
+                # Client doesn't have this field in dataset
+                match_status, is_match = "not_in_dataset", None
+
+        field_matches[field_name] = {
+            "display_name": field_display_name(field_name),
+            "extracted_value": extracted_value,
+            "expected_value": expected_value,
+            "match_status": match_status,
+            "is_match": is_match,
+            "confidence": field.confidence_score,
+            "page_number": page_number
+        }
+
+    return {
+        "client_id": match.client_id,
+        "client_name": client_name,
+        "score": match.match_score,
+        "decision": match.decision,
+        "field_matches": field_matches,
+        "mismatches": mismatch_details
+    }
@@ -0,0 +1,179 @@
+"""
+Single-pass styled Excel writer.
+
+Cells are written once, already styled, through an openpyxl write-only
+workbook. Styles are registered as named styles, so every cell references
+one shared style record instead of carrying its own Font/Fill/Border
+objects, and column widths are computed from the row data before the first
+row is written.
+"""
+import io
+from copy import copy
+from typing import Any, Callable, Dict, List, Optional, Sequence, Union
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Border, Font, NamedStyle, PatternFill, Side
+from openpyxl.styles.fonts import DEFAULT_FONT
+from openpyxl.utils import get_column_letter
+
+MAX_COLUMN_WIDTH = 50
+
+HEADER_COLORS = {
+    'header_blue': "366092",
+    'header_green': "70AD47",
+    'header_red': "C00000",
+}
+
+ROW_FILLS = {
+    'row_matched': "C6EFCE",
+    'row_mismatch': "FFC7CE",
+    'row_not_in_dataset': "FFEB9C",
+    'row_neutral': "D9D9D9",
+}
+
+RowStyle = Union[str, Callable[[Sequence[Any]], str]]
+
+
+def _thin_border() -> Border:
+    side = Side(style='thin')
+    return Border(left=side, right=side, top=side, bottom=side)
+
+
+def _build_named_styles() -> List[NamedStyle]:
+    """Create the report's named styles (NamedStyle objects belong to one workbook)."""
+    styles = []
+    for name, color in HEADER_COLORS.items():
+        for wrap in (False, True):
+            styles.append(NamedStyle(
+                name=f"{name}_wrap" if wrap else name,
+                font=Font(bold=True, color="FFFFFF", size=11),
+                fill=PatternFill(start_color=color, end_color=color, fill_type="solid"),
+                alignment=Alignment(horizontal='center', vertical='center', wrap_text=wrap),
+                border=_thin_border(),
+            ))
+
+    styles.append(NamedStyle(
+        name='cell', font=copy(DEFAULT_FONT), alignment=Alignment(vertical='center'), border=_thin_border()
+    ))
+    for name, color in ROW_FILLS.items():
+        for wrap in (False, True):
+            styles.append(NamedStyle(
+                name=f"{name}_wrap" if wrap else name,
+                font=copy(DEFAULT_FONT),
+                fill=PatternFill(start_color=color, end_color=color, fill_type="solid"),
+                alignment=Alignment(vertical='center', wrap_text=wrap),
+                border=_thin_border(),
+            ))
+    return styles
+
+
+def column_widths(columns: Sequence[str], rows: Sequence[Sequence[Any]]) -> List[int]:
+    """Compute column widths from the longest value per column (capped at MAX_COLUMN_WIDTH)."""
+    widths = [len(str(column)) for column in columns]
+    for row in rows:
+        for index, value in enumerate(row):
+            if value is not None:
+                widths[index] = max(widths[index], len(str(value)))
+    return [min(width + 2, MAX_COLUMN_WIDTH) for width in widths]
+
+
+class StyledWorkbookWriter:
+    """Builds a formatted workbook sheet by sheet in a single pass."""
+
+    def __init__(self):
+        """Create an empty write-only workbook with the report styles registered."""
+        self.workbook = Workbook(write_only=True)
+        for style in _build_named_styles():
+            self.workbook.add_named_style(style)
+
+    def add_sheet(
+        self,
+        title: str,
+        columns: Sequence[str],
+        rows: Sequence[Sequence[Any]],
+        header_style: str,
+        row_style: RowStyle = 'cell',
+        widths: Optional[List[int]] = None
+    ):
+        """
+        Append a sheet with a styled header row and styled data rows.
+
+        Args:
+            title: Sheet name
+            columns: Header labels
+            rows: Data rows (already materialized so widths can be computed first)
+            header_style: Named style for the header row
+            row_style: Named style for data cells, or a function choosing one per row
+            widths: Optional precomputed column widths
+        """
+        sheet = self.workbook.create_sheet(title)
+        for index, width in enumerate(widths or column_widths(columns, rows), start=1):
+            sheet.column_dimensions[get_column_letter(index)].width = width
+
+        sheet.append([self._cell(sheet, column, header_style) for column in columns])
+        for row in rows:
+            style = row_style(row) if callable(row_style) else row_style
+            sheet.append([self._cell(sheet, value, style) for value in row])
+
+    @staticmethod
+    def _cell(sheet, value: Any, style: str) -> WriteOnlyCell:
+        cell = WriteOnlyCell(sheet, value=value)
+        cell.style = style
+        return cell
+
+    def to_bytes(self) -> bytes:
+        """Serialize the workbook."""
+        buffer = io.BytesIO()
+        self.workbook.save(buffer)
+        return buffer.getvalue()
+
+    def save(self, path: str):
+        """Write the workbook to ``path``."""
+        self.workbook.save(path)
+
+
+def field_status_style(status: str) -> str:
+    """Row style for a Field Matching row, by its match status."""
+    return {
+        'Matched': 'row_matched_wrap',
+        'Mismatch': 'row_mismatch_wrap',
+        'Not in Dataset': 'row_not_in_dataset_wrap',
+    }.get(status, 'row_neutral_wrap')
+
+
+def _report_writer(report: Dict[str, Any]) -> StyledWorkbookWriter:
+    writer = StyledWorkbookWriter()
+    writer.add_sheet('Summary', report['summary_columns'], report['summary_rows'], 'header_blue')
+    status_index = report['field_columns'].index('Match Status')
+    writer.add_sheet(
+        'Field Matching', report['field_columns'], report['field_rows'], 'header_green_wrap',
+        row_style=lambda row: field_status_style(row[status_index])
+    )
+    if report['mismatch_rows']:
+        writer.add_sheet('Mismatches', report['mismatch_columns'], report['mismatch_rows'], 'header_red',
+                         row_style='row_mismatch')
+    return writer
+
+
+def build_report_workbook(report: Dict[str, Any]) -> bytes:
+    """
+    Build the single-document export workbook.
+
+    Args:
+        report: Output of ExportService.collect_report_data
+
+    Returns:
+        The .xlsx file content
+    """
+    return _report_writer(report).to_bytes()
+
+
+def write_report_workbook(report: Dict[str, Any], path: str):
+    """
+    Write the single-document export workbook straight to ``path``.
+
+    Args:
+        report: Output of ExportService.collect_report_data
+        path: Destination file
+    """
+    _report_writer(report).save(path)
@@ -1,26 +1,56 @@
 """
 Service for generating Excel exports.
 """
-import pandas as pd
+import hashlib
+import json
+import logging
+import tempfile
+import threading
 from datetime import datetime, timedelta
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from sqlalchemy.orm import Session
 from database.models import Document, ExtractedField, Match, Mismatch, ClientProfile, Export
 from google.cloud import storage
 from pydantic_settings import BaseSettings
 import os
 from dotenv import load_dotenv
-import io
-from openpyxl import load_workbook
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-from openpyxl.utils import get_column_letter
+from services.excel_writer import write_report_workbook
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# Bump whenever the workbook layout or styling changes, so cached exports are rebuilt
+EXPORT_TEMPLATE_VERSION = "2"
+XLSX_MEDIA_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+# Signed URLs closer than this to expiry are re-signed before being handed out
+SIGNED_URL_REFRESH_MARGIN = timedelta(minutes=5)
+
+SUMMARY_COLUMNS = [
+    'Document ID', 'File Name', 'Processed At', 'Match Status',
+    'Match Score (%)', 'Matched Client ID', 'Matched Client Name',
+]
+FIELD_COLUMNS = ['Field Name', 'Extracted Value', 'Expected Value (from Dataset)', 'Match Status', 'Confidence (%)']
+MISMATCH_COLUMNS = ['Field', 'Expected Value', 'Observed Value', 'Page Number', 'Mismatch Type']
+
+
+def field_match_status(field: str, expected: Optional[str], extracted: Optional[str], mismatch_fields) -> str:
+    """Get the export status of a date field ('Matched', 'Mismatch', 'Not in Dataset', 'Not Extracted')."""
+    if field in mismatch_fields:
+        return 'Mismatch'
+    if not expected:
+        return 'Not in Dataset'
+    if not extracted:
+        return 'Not Extracted'
+    return 'Matched'
+
 
 class ExportSettings(BaseSettings):
     """Export configuration."""
     gcs_bucket_name: str = os.getenv("GCS_BUCKET_NAME", "")
+    export_cache_dir: str = os.getenv("EXPORT_CACHE_DIR", os.path.join(tempfile.gettempdir(), "export_cache"))
+    export_pregenerate: bool = os.getenv("EXPORT_PREGENERATE", "false").lower() == "true"
+    export_pregenerate_concurrency: int = int(os.getenv("EXPORT_PREGENERATE_CONCURRENCY", "1"))
 
     class Config:
         env_file = ".env"
@@ -35,10 +65,76 @@ class ExportService:
         self.settings = ExportSettings()
         self.storage_client = storage.Client()
 
+    def get_export(self, db: Session, doc_id: int) -> Dict[str, Any]:
+        """
+        Get the export for a document, reusing the stored artifact when the report is unchanged.
+        
+        Exports are keyed by a hash of the report content and template version.
+        A matching artifact only needs its signed URL refreshed (or, without
+        storage, is served from the local export cache); otherwise the workbook
+        is built and uploaded. Artifacts for older content are pruned.
+        
+        Args:
+            db: Database session
+            doc_id: Document ID
+            
+        Returns:
+            Dictionary with export information (as generate_excel_report)
+        """
+        report = self.collect_report_data(db, doc_id)
+        content_hash = self.compute_content_hash(report)
+        
+        cached = db.query(Export).filter(
+            Export.doc_id == doc_id,
+            Export.content_hash == content_hash,
+            Export.template_version == EXPORT_TEMPLATE_VERSION
+        ).order_by(Export.id.desc()).first()
+        
+        if cached and not cached.gcs_uri.startswith('gs://'):
+            # Built without storage: reusable while the local file is still there
+            if not self.settings.gcs_bucket_name and os.path.exists(self._local_path(doc_id, content_hash)):
+                logger.info(f"♻️ Reusing local export {cached.id} for document {doc_id} ({content_hash[:12]})")
+                self._prune_exports(db, doc_id, keep=cached)
+                return self._local_export_info(cached, doc_id, content_hash, cached=True)
+            cached = None
+        
+        if cached:
+            try:
+                if not cached.expires_at or cached.expires_at < datetime.now() + SIGNED_URL_REFRESH_MARGIN:
+                    cached.signed_url = self._generate_signed_url(self._blob_name(cached.gcs_uri), expiration_minutes=60)
+                    cached.expires_at = datetime.now() + timedelta(hours=1)
+                    db.commit()
+                logger.info(f"♻️ Reusing export {cached.id} for document {doc_id} ({content_hash[:12]})")
+                self._prune_exports(db, doc_id, keep=cached)
+                return {
+                    'export_id': cached.id,
+                    'gcs_uri': cached.gcs_uri,
+                    'signed_url': cached.signed_url,
+                    'expires_at': cached.expires_at,
+                    'direct_download': False,
+                    'cached': True
+                }
+            except Exception as e:
+                db.rollback()
+                logger.warning(f"⚠️ Could not reuse export {cached.id}, regenerating: {str(e)}")
+        
+        return self.generate_excel_report(db, doc_id, report=report, content_hash=content_hash)
+
+    def compute_content_hash(self, report: Dict[str, Any]) -> str:
+        """Hash the report content (fields, match, mismatches) together with the template version."""
+        payload = json.dumps(
+            {'template_version': EXPORT_TEMPLATE_VERSION, 'report': report},
+            sort_keys=True,
+            default=str
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
     def generate_excel_report(
         self,
         db: Session,
-        doc_id: int
+        doc_id: int,
+        report: Optional[Dict[str, Any]] = None,
+        content_hash: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Generate Excel report for a document.
@@ -46,10 +142,73 @@ class ExportService:
         Args:
             db: Database session
             doc_id: Document ID
+            report: Report data, if already collected
+            content_hash: Content hash of ``report``, if already computed
             
         Returns:
             Dictionary with export information
         """
+        if report is None:
+            report = self.collect_report_data(db, doc_id)
+        content_hash = content_hash or self.compute_content_hash(report)
+        
+        # The workbook is written straight to the local export cache and uploaded
+        # from there, so its bytes are never held in memory
+        local_path = self._local_path(doc_id, content_hash)
+        if not os.path.exists(local_path):
+            self._write_workbook(report, local_path)
+        
+        # Try to upload to GCS, fallback to direct download if it fails.
+        # The blob name is derived from the content, so identical reports share one artifact.
+        filename = f"exports/{doc_id}/{content_hash}.xlsx"
+        gcs_uri = None
+        signed_url = None
+        
+        try:
+            if self.settings.gcs_bucket_name:
+                gcs_uri = self._upload_file_to_gcs(local_path, filename, XLSX_MEDIA_TYPE)
+                signed_url = self._generate_signed_url(filename, expiration_minutes=60)
+        except Exception as e:
+            logger.warning(f"⚠️ GCS upload failed, will use direct download: {str(e)}")
+            # Continue without GCS - we'll serve the local file directly
+        
+        # Save export record (even if GCS failed)
+        export = Export(
+            doc_id=doc_id,
+            gcs_uri=gcs_uri or "N/A",
+            signed_url=signed_url or "N/A",
+            expires_at=datetime.now() + timedelta(hours=1) if signed_url else None,
+            content_hash=content_hash,
+            template_version=EXPORT_TEMPLATE_VERSION
+        )
+        db.add(export)
+        db.commit()
+        self._prune_exports(db, doc_id, keep=export)
+        
+        # If GCS failed, the route streams the local file
+        if not signed_url:
+            return self._local_export_info(export, doc_id, content_hash)
+        
+        self._remove_local(doc_id, content_hash)
+        return {
+            'export_id': export.id,
+            'gcs_uri': gcs_uri,
+            'signed_url': signed_url,
+            'expires_at': export.expires_at,
+            'direct_download': False
+        }
+
+    def collect_report_data(self, db: Session, doc_id: int) -> Dict[str, Any]:
+        """
+        Gather the rows of a document's export workbook.
+        
+        Args:
+            db: Database session
+            doc_id: Document ID
+            
+        Returns:
+            Dictionary with the column headers and rows of each sheet
+        """
         # Get document
         document = db.query(Document).filter(Document.id == doc_id).first()
         if not document:
@@ -70,7 +229,7 @@ class ExportService:
             }
         
         # Get match
-        match = db.query(Match).filter(Match.doc_id == doc_id).first()
+        match = db.query(Match).filter(Match.doc_id == doc_id).order_by(Match.id).first()
         matched_client_id = None
         match_score = 0.0
         if match:
@@ -80,6 +239,7 @@ class ExportService:
         # Get client profile if matched
         expected_dob = None
         expected_doa = None
+        client_name = None
         if matched_client_id:
             client = db.query(ClientProfile).filter(
                 ClientProfile.id == matched_client_id
@@ -87,18 +247,12 @@ class ExportService:
             if client:
                 expected_dob = client.dob.strftime('%m/%d/%Y') if client.dob else None
                 expected_doa = client.doa.strftime('%m/%d/%Y') if client.doa else None
+                client_name = client.name
         
         # Get mismatches
         mismatches = db.query(Mismatch).filter(Mismatch.doc_id == doc_id).all()
         mismatch_dict = {m.field: {'expected': m.expected_value, 'observed': m.observed_value} for m in mismatches}
         
-        # Get client name if matched
-        client_name = None
-        if matched_client_id:
-            client = db.query(ClientProfile).filter(ClientProfile.id == matched_client_id).first()
-            if client:
-                client_name = client.name
-        
         # Prepare extracted field data (only the 3 fields: name, dob, doa)
         extracted_name = fields_dict.get('patient_name', {}).get('normalized_value', '') or fields_dict.get('patient_name', {}).get('raw_value', '')
         extracted_dob = fields_dict.get('dob', {}).get('normalized_value', '') or fields_dict.get('dob', {}).get('raw_value', '')
@@ -112,173 +266,137 @@ class ExportService:
         # Note: service_dates and referral are no longer included
         
         # Determine match status for each field
-        dob_match_status = 'Matched'
-        if 'dob' in mismatch_dict:
-            dob_match_status = 'Mismatch'
-        elif not expected_dob:
-            dob_match_status = 'Not in Dataset'
-        elif not extracted_dob:
-            dob_match_status = 'Not Extracted'
-        
-        doa_match_status = 'Matched'
-        if 'doa' in mismatch_dict:
-            doa_match_status = 'Mismatch'
-        elif not expected_doa:
-            doa_match_status = 'Not in Dataset'
-        elif not extracted_doa:
-            doa_match_status = 'Not Extracted'
+        dob_match_status = field_match_status('dob', expected_dob, extracted_dob, mismatch_dict)
+        doa_match_status = field_match_status('doa', expected_doa, extracted_doa, mismatch_dict)
         
         name_match_status = 'Matched' if match and match.decision in ['match', 'ambiguous'] else ('No Match' if match else 'Not Checked')
         
-        # Create main results DataFrame
-        results_data = {
-            'Document ID': [doc_id],
-            'File Name': [document.filename],
-            'Processed At': [document.updated_at.strftime('%Y-%m-%d %H:%M:%S') if document.updated_at else ''],
-            'Match Status': [match.decision if match else 'No Match'],
-            'Match Score (%)': [f"{match_score:.1f}" if match_score else "N/A"],
-            'Matched Client ID': [matched_client_id if matched_client_id else 'N/A'],
-            'Matched Client Name': [client_name if client_name else 'N/A'],
-        }
-        
-        # Create field-by-field DataFrame (only 3 fields: name, dob, doa)
-        fields_data = {
-            'Field Name': [
+        summary_row = [
+            doc_id,
+            document.filename,
+            document.updated_at.strftime('%Y-%m-%d %H:%M:%S') if document.updated_at else '',
+            match.decision if match else 'No Match',
+            f"{match_score:.1f}" if match_score else "N/A",
+            matched_client_id if matched_client_id else 'N/A',
+            client_name if client_name else 'N/A',
+        ]
+        
+        # Field-by-field rows (only 3 fields: name, dob, doa)
+        field_rows = [
+            [
                 'Patient Name',
-                'Date of Birth',
-                'Date of Accident'
-            ],
-            'Extracted Value': [
                 extracted_name,
-                extracted_dob,
-                extracted_doa
-            ],
-            'Expected Value (from Dataset)': [
                 client_name if client_name else 'N/A',
-                expected_dob if expected_dob else 'Not in Dataset',
-                expected_doa if expected_doa else 'Not in Dataset'
-            ],
-            'Match Status': [
                 name_match_status,
-                dob_match_status,
-                doa_match_status
-            ],
-            'Confidence (%)': [
                 f"{(name_confidence * 100):.1f}" if name_confidence else "N/A",
+            ],
+            [
+                'Date of Birth',
+                extracted_dob,
+                expected_dob if expected_dob else 'Not in Dataset',
+                dob_match_status,
                 f"{(dob_confidence * 100):.1f}" if dob_confidence else "N/A",
-                f"{(doa_confidence * 100):.1f}" if doa_confidence else "N/A"
-            ]
-        }
-        
-        # Create mismatches DataFrame if any
-        mismatches_data = None
-        if mismatches:
-            mismatches_data = {
-                'Field': [m.field.upper() for m in mismatches],
-                'Expected Value': [m.expected_value for m in mismatches],
-                'Observed Value': [m.observed_value for m in mismatches],
-                'Page Number': [m.page_number if m.page_number else 1 for m in mismatches],
-                'Mismatch Type': ['Date Mismatch' for _ in mismatches]
-            }
-        
-        # Generate Excel file in memory
-        excel_buffer = io.BytesIO()
-        
-        with pd.ExcelWriter(excel_buffer, engine='openpyxl') as writer:
-            # Write Results sheet
-            df_results = pd.DataFrame(results_data)
-            df_results.to_excel(writer, index=False, sheet_name='Summary')
-            
-            # Write Fields sheet
-            df_fields = pd.DataFrame(fields_data)
-            df_fields.to_excel(writer, index=False, sheet_name='Field Matching')
-            
-            # Write Mismatches sheet if any
-            if mismatches_data:
-                df_mismatches = pd.DataFrame(mismatches_data)
-                df_mismatches.to_excel(writer, index=False, sheet_name='Mismatches')
-            
-            # Service Dates sheet removed - only showing 3 fields now
-        
-        # Apply formatting
-        excel_buffer.seek(0)
-        workbook = load_workbook(excel_buffer)
-        
-        # Format Summary sheet
-        self._format_summary_sheet(workbook['Summary'])
-        
-        # Format Field Matching sheet
-        self._format_fields_sheet(workbook['Field Matching'])
-        
-        # Format Mismatches sheet if exists
-        if 'Mismatches' in workbook.sheetnames:
-            self._format_mismatches_sheet(workbook['Mismatches'])
-        
-        # Service Dates sheet removed - only showing 3 fields now
-        
-        # Save formatted workbook
-        excel_buffer = io.BytesIO()
-        workbook.save(excel_buffer)
-        excel_buffer.seek(0)
-        excel_content = excel_buffer.read()
-        
-        # Try to upload to GCS, fallback to direct download if it fails
-        filename = f"exports/report_{doc_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-        gcs_uri = None
-        signed_url = None
+            ],
+            [
+                'Date of Accident',
+                extracted_doa,
+                expected_doa if expected_doa else 'Not in Dataset',
+                doa_match_status,
+                f"{(doa_confidence * 100):.1f}" if doa_confidence else "N/A",
+            ],
+        ]
         
-        try:
-            if self.settings.gcs_bucket_name:
-                gcs_uri = self._upload_to_gcs(excel_content, filename)
-                signed_url = self._generate_signed_url(filename, expiration_minutes=60)
-        except Exception as e:
-            import logging
-            logger = logging.getLogger(__name__)
-            logger.warning(f"⚠️ GCS upload failed, will use direct download: {str(e)}")
-            # Continue without GCS - we'll return the file directly
+        mismatch_rows = [
+            [m.field.upper(), m.expected_value, m.observed_value, m.page_number if m.page_number else 1, 'Date Mismatch']
+            for m in mismatches
+        ]
         
-        # Save export record (even if GCS failed)
-        export = Export(
-            doc_id=doc_id,
-            gcs_uri=gcs_uri or "N/A",
-            signed_url=signed_url or "N/A",
-            expires_at=datetime.now() + timedelta(hours=1) if signed_url else None
-        )
-        db.add(export)
+        return {
+            'summary_columns': SUMMARY_COLUMNS,
+            'summary_rows': [summary_row],
+            'field_columns': FIELD_COLUMNS,
+            'field_rows': field_rows,
+            'mismatch_columns': MISMATCH_COLUMNS,
+            'mismatch_rows': mismatch_rows,
+        }
+
+    def _prune_exports(self, db: Session, doc_id: int, keep: Export):
+        """Delete a document's other export rows and any blobs no longer referenced."""
+        stale = db.query(Export).filter(Export.doc_id == doc_id, Export.id != keep.id).all()
+        if not stale:
+            return
+        for export in stale:
+            if export.gcs_uri and export.gcs_uri.startswith('gs://') and export.gcs_uri != keep.gcs_uri:
+                try:
+                    self._delete_from_gcs(self._blob_name(export.gcs_uri))
+                except Exception as e:
+                    logger.warning(f"⚠️ Could not delete stale export blob {export.gcs_uri}: {str(e)}")
+            if export.content_hash and export.content_hash != keep.content_hash:
+                self._remove_local(doc_id, export.content_hash)
+            db.delete(export)
         db.commit()
-        
-        # If GCS failed, return file content directly
-        if not signed_url:
-            # Store file content in a way that can be returned
-            # We'll use base64 encoding for the response
-            import base64
-            file_base64 = base64.b64encode(excel_content).decode('utf-8')
-            
-            return {
-                'export_id': export.id,
-                'gcs_uri': None,
-                'signed_url': None,
-                'file_content': file_base64,
-                'filename': f"report_{doc_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
-                'expires_at': None,
-                'direct_download': True
-            }
-        
+        logger.info(f"🧹 Pruned {len(stale)} stale export(s) for document {doc_id}")
+
+    def _local_path(self, doc_id: int, content_hash: str) -> str:
+        """Path of a workbook in the local export cache."""
+        return os.path.join(self.settings.export_cache_dir, str(doc_id), f"{content_hash}.xlsx")
+
+    def _local_export_info(self, export: Export, doc_id: int, content_hash: str, cached: bool = False) -> Dict[str, Any]:
+        """Export information for a workbook served from the local export cache."""
         return {
             'export_id': export.id,
-            'gcs_uri': gcs_uri,
-            'signed_url': signed_url,
-            'expires_at': export.expires_at.isoformat(),
-            'direct_download': False
+            'gcs_uri': None,
+            'signed_url': None,
+            'expires_at': None,
+            'file_path': self._local_path(doc_id, content_hash),
+            'filename': f"report_{doc_id}_{content_hash[:8]}.xlsx",
+            'etag': content_hash,
+            'direct_download': True,
+            'cached': cached
         }
 
-    def _upload_to_gcs(self, content: bytes, filename: str) -> str:
-        """Upload file to GCS."""
+    def _write_workbook(self, report: Dict[str, Any], path: str):
+        """Write the report workbook to ``path`` atomically (concurrent builds never see a partial file)."""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.xlsx.tmp')
+        os.close(fd)
+        try:
+            write_report_workbook(report, tmp_path)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _remove_local(self, doc_id: int, content_hash: str):
+        """Remove a workbook from the local export cache, if present."""
+        try:
+            os.remove(self._local_path(doc_id, content_hash))
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"⚠️ Could not remove cached export file: {str(e)}")
+
+    def _blob_name(self, gcs_uri: str) -> str:
+        """Get the object name from a gs://bucket/name URI."""
+        return gcs_uri.split('/', 3)[3]
+
+    def _delete_from_gcs(self, filename: str):
+        """Delete a GCS object (missing objects are ignored)."""
+        from google.api_core.exceptions import NotFound
+        bucket = self.storage_client.bucket(self.settings.gcs_bucket_name)
+        try:
+            bucket.blob(filename).delete()
+        except NotFound:
+            pass
+
+    def _upload_file_to_gcs(self, path: str, filename: str, content_type: str, chunk_size: int = 8 * 1024 * 1024) -> str:
+        """Upload a local file to GCS as a resumable upload, sent in chunks."""
         if not self.settings.gcs_bucket_name:
             raise ValueError("GCS bucket name not configured")
         bucket = self.storage_client.bucket(self.settings.gcs_bucket_name)
-        blob = bucket.blob(filename)
-        blob.upload_from_string(content, content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+        blob = bucket.blob(filename, chunk_size=chunk_size)
+        blob.upload_from_filename(path, content_type=content_type)
         return f"gs://{self.settings.gcs_bucket_name}/{filename}"
 
     def _generate_signed_url(self, filename: str, expiration_minutes: int = 60) -> str:
@@ -293,172 +411,56 @@ class ExportService:
             method='GET'
         )
         return url
+
+
+_pregenerate_service: Optional[ExportService] = None
+_pregenerate_slots: Optional[threading.BoundedSemaphore] = None
+_pregenerate_lock = threading.Lock()
+
+
+def pregenerate_export(doc_id: int) -> bool:
+    """
+    Build and upload a document's export ahead of the first download request.
     
-    def _format_summary_sheet(self, sheet):
-        """Format the Summary sheet."""
-        # Header style
-        header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-        header_font = Font(bold=True, color="FFFFFF", size=11)
-        border = Border(
-            left=Side(style='thin'),
-            right=Side(style='thin'),
-            top=Side(style='thin'),
-            bottom=Side(style='thin')
-        )
-        
-        # Format header row
-        for cell in sheet[1]:
-            cell.fill = header_fill
-            cell.font = header_font
-            cell.alignment = Alignment(horizontal='center', vertical='center')
-            cell.border = border
-        
-        # Format data rows
-        for row in sheet.iter_rows(min_row=2, max_row=sheet.max_row):
-            for cell in row:
-                cell.border = border
-                cell.alignment = Alignment(vertical='center')
-        
-        # Auto-adjust column widths
-        for column in sheet.columns:
-            max_length = 0
-            column_letter = get_column_letter(column[0].column)
-            for cell in column:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            adjusted_width = min(max_length + 2, 50)
-            sheet.column_dimensions[column_letter].width = adjusted_width
+    Called at the end of document processing when EXPORT_PREGENERATE is enabled.
+    At most EXPORT_PREGENERATE_CONCURRENCY exports are built at once; when every
+    slot is busy the document is skipped and its export is built on first request
+    instead, so pre-generation never queues up behind (or holds back) OCR work.
     
-    def _format_fields_sheet(self, sheet):
-        """Format the Field Matching sheet."""
-        # Header style
-        header_fill = PatternFill(start_color="70AD47", end_color="70AD47", fill_type="solid")
-        header_font = Font(bold=True, color="FFFFFF", size=11)
-        border = Border(
-            left=Side(style='thin'),
-            right=Side(style='thin'),
-            top=Side(style='thin'),
-            bottom=Side(style='thin')
-        )
-        
-        # Format header row
-        for cell in sheet[1]:
-            cell.fill = header_fill
-            cell.font = header_font
-            cell.alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
-            cell.border = border
-        
-        # Format data rows with conditional coloring
-        for row_idx, row in enumerate(sheet.iter_rows(min_row=2, max_row=sheet.max_row), start=2):
-            match_status_cell = sheet[f'D{row_idx}']  # Match Status column
-            match_status = match_status_cell.value
-            
-            # Color code based on match status
-            if match_status == 'Matched':
-                row_fill = PatternFill(start_color="C6EFCE", end_color="C6EFCE", fill_type="solid")
-            elif match_status == 'Mismatch':
-                row_fill = PatternFill(start_color="FFC7CE", end_color="FFC7CE", fill_type="solid")
-            elif match_status == 'Not in Dataset':
-                row_fill = PatternFill(start_color="FFEB9C", end_color="FFEB9C", fill_type="solid")
-            else:
-                row_fill = PatternFill(start_color="D9D9D9", end_color="D9D9D9", fill_type="solid")
-            
-            for cell in row:
-                cell.fill = row_fill
-                cell.border = border
-                cell.alignment = Alignment(vertical='center', wrap_text=True)
-        
-        # Auto-adjust column widths
-        for column in sheet.columns:
-            max_length = 0
-            column_letter = get_column_letter(column[0].column)
-            for cell in column:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            adjusted_width = min(max_length + 2, 50)
-            sheet.column_dimensions[column_letter].width = adjusted_width
+    Args:
+        doc_id: Document ID
+        
+    Returns:
+        True if an export artifact is now stored for the document
+    """
+    global _pregenerate_service, _pregenerate_slots
+    from database.connection import SessionLocal
     
-    def _format_mismatches_sheet(self, sheet):
-        """Format the Mismatches sheet."""
-        # Header style
-        header_fill = PatternFill(start_color="C00000", end_color="C00000", fill_type="solid")
-        header_font = Font(bold=True, color="FFFFFF", size=11)
-        border = Border(
-            left=Side(style='thin'),
-            right=Side(style='thin'),
-            top=Side(style='thin'),
-            bottom=Side(style='thin')
-        )
-        
-        # Format header row
-        for cell in sheet[1]:
-            cell.fill = header_fill
-            cell.font = header_font
-            cell.alignment = Alignment(horizontal='center', vertical='center')
-            cell.border = border
-        
-        # Format data rows (red background for mismatches)
-        mismatch_fill = PatternFill(start_color="FFC7CE", end_color="FFC7CE", fill_type="solid")
-        for row in sheet.iter_rows(min_row=2, max_row=sheet.max_row):
-            for cell in row:
-                cell.fill = mismatch_fill
-                cell.border = border
-                cell.alignment = Alignment(vertical='center')
-        
-        # Auto-adjust column widths
-        for column in sheet.columns:
-            max_length = 0
-            column_letter = get_column_letter(column[0].column)
-            for cell in column:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            adjusted_width = min(max_length + 2, 50)
-            sheet.column_dimensions[column_letter].width = adjusted_width
+    settings = ExportSettings()
+    if not settings.export_pregenerate or not settings.gcs_bucket_name:
+        return False
     
-    def _format_service_dates_sheet(self, sheet):
-        """Format the Service Dates sheet."""
-        # Header style
-        header_fill = PatternFill(start_color="0070C0", end_color="0070C0", fill_type="solid")
-        header_font = Font(bold=True, color="FFFFFF", size=11)
-        border = Border(
-            left=Side(style='thin'),
-            right=Side(style='thin'),
-            top=Side(style='thin'),
-            bottom=Side(style='thin')
-        )
-        
-        # Format header row
-        for cell in sheet[1]:
-            cell.fill = header_fill
-            cell.font = header_font
-            cell.alignment = Alignment(horizontal='center', vertical='center')
-            cell.border = border
-        
-        # Format data rows
-        for row in sheet.iter_rows(min_row=2, max_row=sheet.max_row):
-            for cell in row:
-                cell.border = border
-                cell.alignment = Alignment(vertical='center', wrap_text=True)
-        
-        # Auto-adjust column widths
-        for column in sheet.columns:
-            max_length = 0
-            column_letter = get_column_letter(column[0].column)
-            for cell in column:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            adjusted_width = min(max_length + 2, 50)
-            sheet.column_dimensions[column_letter].width = adjusted_width
-
+    with _pregenerate_lock:
+        if _pregenerate_service is None:
+            _pregenerate_service = ExportService()
+            _pregenerate_slots = threading.BoundedSemaphore(max(1, settings.export_pregenerate_concurrency))
+    service = _pregenerate_service
+    
+    if not _pregenerate_slots.acquire(blocking=False):
+        logger.info(f"⏭️ Export pre-generation busy, document {doc_id} will be exported on demand")
+        return False
+    
+    db = SessionLocal()
+    try:
+        export_data = service.get_export(db, doc_id)
+        stored = not export_data.get('direct_download')
+        if stored:
+            logger.info(f"📦 Pre-generated export {export_data['export_id']} for document {doc_id}")
+        return stored
+    except Exception as e:
+        db.rollback()
+        logger.warning(f"⚠️ Export pre-generation failed for document {doc_id}: {str(e)}")
+        return False
+    finally:
+        db.close()
+        _pregenerate_slots.release()
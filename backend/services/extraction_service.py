@@ -5,6 +5,7 @@ import re
 from datetime import datetime
 from typing import Dict, Any, Optional, List
 from dateutil import parser as date_parser
+from services.normalization import normalize_name
 
 
 class ExtractionService:
@@ -479,15 +480,7 @@ class ExtractionService:
 
     def _normalize_name(self, name: str) -> str:
         """Normalize name for matching (lowercase, remove punctuation)."""
-        if not name:
-            return ""
-        # Convert to lowercase
-        normalized = name.lower()
-        # Remove punctuation
-        normalized = re.sub(r'[^\w\s]', '', normalized)
-        # Remove extra whitespace
-        normalized = ' '.join(normalized.split())
-        return normalized
+        return normalize_name(name)
 
     def _normalize_date(self, date_str: str) -> Optional[str]:
         """
@@ -0,0 +1,91 @@
+"""
+Service for tracking long-running background jobs.
+"""
+import json
+import logging
+from typing import Any, Dict, Optional
+from sqlalchemy.orm import Session
+from database.models import BackgroundJob
+
+logger = logging.getLogger(__name__)
+
+
+class JobService:
+    """Service for creating, updating and reporting background jobs."""
+
+    def create(self, db: Session, job_type: str, message: Optional[str] = None) -> BackgroundJob:
+        """
+        Create a pending job.
+        
+        Args:
+            db: Database session
+            job_type: Job type, e.g. 'rematch'
+            message: Optional initial progress message
+            
+        Returns:
+            The created job
+        """
+        job = BackgroundJob(job_type=job_type, status='pending', message=message)
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+        return job
+
+    def update(
+        self,
+        db: Session,
+        job_id: int,
+        status: Optional[str] = None,
+        total: Optional[int] = None,
+        processed: Optional[int] = None,
+        message: Optional[str] = None,
+        result: Optional[Dict[str, Any]] = None
+    ) -> Optional[BackgroundJob]:
+        """
+        Update job progress, commit it and broadcast it over the status websocket.
+        
+        Only the provided fields are changed.
+        """
+        job = db.query(BackgroundJob).filter(BackgroundJob.id == job_id).first()
+        if not job:
+            logger.warning(f"⚠️ Job {job_id} not found")
+            return None
+        
+        if status is not None:
+            job.status = status
+        if total is not None:
+            job.total = total
+        if processed is not None:
+            job.processed = processed
+        if message is not None:
+            job.message = message
+        if result is not None:
+            job.result = json.dumps(result)
+        db.commit()
+        
+        try:
+            from routes.websocket import broadcast_message_sync
+            broadcast_message_sync({"type": "job", **self.to_dict(job)})
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to broadcast job progress: {str(e)}")
+        
+        return job
+
+    def get(self, db: Session, job_id: int) -> Optional[BackgroundJob]:
+        """Get a job by ID."""
+        return db.query(BackgroundJob).filter(BackgroundJob.id == job_id).first()
+
+    @staticmethod
+    def to_dict(job: BackgroundJob) -> Dict[str, Any]:
+        """Serialize a job for API responses and websocket messages."""
+        return {
+            "job_id": job.id,
+            "job_type": job.job_type,
+            "status": job.status,
+            "total": job.total or 0,
+            "processed": job.processed or 0,
+            "message": job.message,
+            "result": json.loads(job.result) if job.result else None,
+            "created_at": job.created_at.isoformat() if job.created_at else None,
+            "updated_at": job.updated_at.isoformat() if job.updated_at else None,
+        }
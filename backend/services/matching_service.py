@@ -1,12 +1,16 @@
 """
 Service for matching extracted data against client profiles.
 """
-from rapidfuzz import fuzz
-from typing import Dict, Any, List, Optional, Tuple
+from rapidfuzz import fuzz, process
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+import numpy as np
 from datetime import datetime
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from database.models import ClientProfile, ExtractedField, Match, Mismatch
-import re
+from services.client_snapshot import ClientSnapshotService, client_snapshot_service
+from services.mismatch_analytics import record_mismatch_checks
+from services.normalization import normalize_name
 
 
 class MatchingService:
@@ -17,6 +21,20 @@ class MatchingService:
     HIGH_CONFIDENCE_THRESHOLD = 90
     LOW_CONFIDENCE_THRESHOLD = 70
 
+    # Name scorers that can be blended (see rank_top_two)
+    SCORERS = {
+        'WRatio': fuzz.WRatio,
+        'QRatio': fuzz.QRatio,
+        'ratio': fuzz.ratio,
+        'partial_ratio': fuzz.partial_ratio,
+        'token_sort_ratio': fuzz.token_sort_ratio,
+        'token_set_ratio': fuzz.token_set_ratio,
+    }
+
+    def __init__(self, snapshot_service: Optional[ClientSnapshotService] = None):
+        """Initialize matching service."""
+        self.snapshot_service = snapshot_service or client_snapshot_service
+
     def match_document(
         self, 
         db: Session, 
@@ -43,67 +61,177 @@ class MatchingService:
         if not extracted_name:
             return None, 0.0, 'no_match'
         
-        # Get all client profiles
-        clients = db.query(ClientProfile).all()
+        # Exact normalized-name hit via the index: WRatio would score it 100 anyway
+        exact_client_id = db.query(ClientProfile.id).filter(
+            ClientProfile.normalized_name == extracted_name
+        ).order_by(ClientProfile.id).limit(1).scalar()
+        if exact_client_id is not None:
+            self._save_match(db, doc_id, exact_client_id, 100.0, 'match')
+            return exact_client_id, 100.0, 'match'
+        
+        # Get candidate client profiles
+        client_ids, client_names = self._load_candidates(db, extracted_name)
         
-        if not clients:
+        if not client_ids:
             return None, 0.0, 'no_match'
         
-        # Calculate match scores for all clients
-        matches = []
-        for client in clients:
-            client_name = self._normalize_name(client.name)
-            score = fuzz.WRatio(extracted_name, client_name)
-            matches.append((client.id, score))
+        best_client_id, best_score, decision = self.score_names(
+            [extracted_name], client_ids, client_names
+        )[0]
         
-        # Sort by score descending
-        matches.sort(key=lambda x: x[1], reverse=True)
+        # Save match record
+        self._save_match(db, doc_id, best_client_id, best_score, decision)
         
-        if not matches:
-            return None, 0.0, 'no_match'
+        return best_client_id, best_score, decision
+
+    def exact_hits(self, db: Session, names: Sequence[str], chunk_size: int = 5000) -> Dict[str, int]:
+        """
+        Map each name with an exact normalized-name client to the lowest such client ID.
+        
+        The bulk form of the exact lookup match_document runs before fuzzy ranking.
+        """
+        hits: Dict[str, int] = {}
+        unique_names = sorted(set(names))
+        for start in range(0, len(unique_names), chunk_size):
+            rows = db.query(ClientProfile.normalized_name, func.min(ClientProfile.id)).filter(
+                ClientProfile.normalized_name.in_(unique_names[start:start + chunk_size])
+            ).group_by(ClientProfile.normalized_name).all()
+            hits.update(dict(rows))
+        return hits
+
+    def score_names(
+        self,
+        extracted_names: Sequence[str],
+        client_ids: Sequence[int],
+        client_names: Sequence[str]
+    ) -> List[Tuple[Optional[int], float, str]]:
+        """
+        Score many extracted names against the same candidate clients in bulk.
         
-        best_match = matches[0]
-        best_client_id, best_score = best_match
+        Args:
+            extracted_names: Normalized extracted patient names
+            client_ids: Candidate client IDs
+            client_names: Normalized names of the candidate clients
+            
+        Returns:
+            One (client_id, score, decision) tuple per extracted name
+        """
+        return [
+            (best_client_id, best_score, self.decide(best_score, second_score))
+            for best_client_id, best_score, second_score in self.rank_top_two(
+                extracted_names, client_ids, client_names
+            )
+        ]
+
+    def rank_top_two(
+        self,
+        extracted_names: Sequence[str],
+        client_ids: Sequence[int],
+        client_names: Sequence[str],
+        scorer_weights: Optional[Dict[str, float]] = None,
+        chunk_cells: int = 5_000_000
+    ) -> List[Tuple[Optional[int], float, Optional[float]]]:
+        """
+        Find the best client and the runner-up score for many extracted names.
         
-        # Determine decision
-        if best_score >= self.HIGH_CONFIDENCE_THRESHOLD:
-            decision = 'match'
-        elif best_score >= self.LOW_CONFIDENCE_THRESHOLD:
-            # Check if there's a close second match
-            if len(matches) > 1 and matches[1][1] >= self.LOW_CONFIDENCE_THRESHOLD:
-                decision = 'ambiguous'
-            else:
-                decision = 'match'
-        else:
-            decision = 'no_match'
+        Uses rapidfuzz's vectorized cdist (multi-threaded, no per-pair Python
+        calls) over chunks of extracted names so the score matrix stays bounded.
         
-        # Save match record
+        Args:
+            extracted_names: Normalized extracted patient names
+            client_ids: Candidate client IDs
+            client_names: Normalized names of the candidate clients
+            scorer_weights: Weighted blend of SCORERS (default: WRatio only)
+            chunk_cells: Maximum score matrix cells computed at once
+            
+        Returns:
+            One (best_client_id, best_score, second_score) tuple per extracted name
+        """
+        if not client_ids:
+            return [(None, 0.0, None) for _ in extracted_names]
+        
+        scorer_weights = scorer_weights or {'WRatio': 1.0}
+        total_weight = sum(scorer_weights.values())
+        
+        results = []
+        chunk_size = max(1, chunk_cells // len(client_ids))
+        for start in range(0, len(extracted_names), chunk_size):
+            queries = extracted_names[start:start + chunk_size]
+            scores = None
+            for scorer_name, weight in scorer_weights.items():
+                if not weight:
+                    continue
+                scorer_scores = process.cdist(
+                    queries,
+                    client_names,
+                    scorer=self.SCORERS[scorer_name],
+                    dtype=np.float64,
+                    workers=-1
+                )
+                if weight != total_weight:
+                    scorer_scores *= weight / total_weight
+                scores = scorer_scores if scores is None else scores + scorer_scores
+            # argmax returns the first best candidate, like a stable descending sort
+            best_indices = scores.argmax(axis=1)
+            for row, best_index in zip(scores, best_indices):
+                best_score = float(row[best_index])
+                second_score = None
+                if len(row) > 1:
+                    row[best_index] = -1
+                    second_score = float(row.max())
+                results.append((int(client_ids[best_index]), best_score, second_score))
+        return results
+
+    def decide(
+        self,
+        best_score: float,
+        second_score: Optional[float],
+        high_threshold: Optional[float] = None,
+        low_threshold: Optional[float] = None
+    ) -> str:
+        """Determine decision from the best and runner-up candidate scores."""
+        high_threshold = self.HIGH_CONFIDENCE_THRESHOLD if high_threshold is None else high_threshold
+        low_threshold = self.LOW_CONFIDENCE_THRESHOLD if low_threshold is None else low_threshold
+        if best_score >= high_threshold:
+            return 'match'
+        if best_score >= low_threshold:
+            # Check if there's a close second match
+            if second_score is not None and second_score >= low_threshold:
+                return 'ambiguous'
+            return 'match'
+        return 'no_match'
+
+    def _save_match(self, db: Session, doc_id: int, client_id: int, score: float, decision: str):
+        """Save match record."""
         match_record = Match(
             doc_id=doc_id,
-            client_id=best_client_id,
-            match_score=best_score,
+            client_id=client_id,
+            match_score=score,
             decision=decision
         )
         db.add(match_record)
         db.commit()
-        
-        return best_client_id, best_score, decision
 
     def detect_mismatches(
         self,
         db: Session,
         doc_id: int,
         client_id: int,
-        extracted_fields: Dict[str, Dict[str, Any]]
+        extracted_fields: Dict[str, Dict[str, Any]],
+        commit: bool = True
     ) -> List[Dict[str, Any]]:
         """
         Detect mismatches between extracted and expected values.
         
+        Every compared field is also recorded for the mismatch rate rollups
+        (replacing what an earlier detection recorded for the document).
+        
         Args:
             db: Database session
             doc_id: Document ID
             client_id: Matched client ID
             extracted_fields: Dictionary of extracted fields
+            commit: Commit the mismatch records (False when batching several documents)
             
         Returns:
             List of mismatch dictionaries
@@ -111,9 +239,13 @@ class MatchingService:
         # Get client profile
         client = db.query(ClientProfile).filter(ClientProfile.id == client_id).first()
         if not client:
+            record_mismatch_checks(db, doc_id, client_id, [])
+            if commit:
+                db.commit()
             return []
         
         mismatches = []
+        checks = []
         
         # Check DoB mismatch
         dob_field = extracted_fields.get('dob')
@@ -124,6 +256,7 @@ class MatchingService:
             page_number = dob_field.get('page_number', 1)
             
             if expected_dob and extracted_dob:
+                checks.append(('dob', extracted_dob != expected_dob))
                 if extracted_dob != expected_dob:
                     mismatch = Mismatch(
                         doc_id=doc_id,
@@ -149,6 +282,7 @@ class MatchingService:
             page_number = doa_field.get('page_number', 1)
             
             if expected_doa and extracted_doa:
+                checks.append(('doa', extracted_doa != expected_doa))
                 if extracted_doa != expected_doa:
                     mismatch = Mismatch(
                         doc_id=doc_id,
@@ -165,18 +299,37 @@ class MatchingService:
                         'page_number': page_number
                     })
         
-        db.commit()
+        record_mismatch_checks(db, doc_id, client_id, checks)
+        
+        if commit:
+            db.commit()
         return mismatches
 
+    def _load_candidates(self, db: Session, extracted_name: str) -> Tuple[List[int], List[str]]:
+        """
+        Get (client_ids, normalized_names) to score an extracted name against.
+        
+        Uses the shared memory-mapped client snapshot when one is published
+        (only clients in the same blocking keys are scored), otherwise scans
+        client_profiles.
+        """
+        snapshot = self.snapshot_service.current()
+        if snapshot is not None:
+            return snapshot.candidates(extracted_name)
+        return self._load_all_candidates(db)
+
+    def _load_all_candidates(self, db: Session) -> Tuple[List[int], List[str]]:
+        """Get (client_ids, normalized_names) of every client profile, in ID order."""
+        clients = db.query(
+            ClientProfile.id, ClientProfile.name, ClientProfile.normalized_name
+        ).order_by(ClientProfile.id).all()
+        return [client.id for client in clients], [
+            # Rows not yet backfilled are normalized on the fly
+            client.normalized_name if client.normalized_name is not None else self._normalize_name(client.name)
+            for client in clients
+        ]
+
     def _normalize_name(self, name: str) -> str:
         """Normalize name for matching."""
-        if not name:
-            return ""
-        # Convert to lowercase
-        normalized = name.lower()
-        # Remove punctuation
-        normalized = re.sub(r'[^\w\s]', '', normalized)
-        # Remove extra whitespace
-        normalized = ' '.join(normalized.split())
-        return normalized
+        return normalize_name(name)
 
@@ -0,0 +1,159 @@
+"""
+Mismatch rate rollups by month, client and field.
+
+Mismatch detection records each field it compares in ``mismatch_checks`` (one
+row per document and field); re-detecting a document first retracts its
+previous checks. Statement-level triggers on ``mismatch_checks`` append the
+resulting count changes to ``mismatch_rollup_deltas``, including when a
+document is deleted and its checks go with it (see
+database/migrations/add_mismatch_rollups.sql). Writers only ever insert
+deltas, so concurrent processing and re-matching never wait on each other's
+rollup rows. Readers fold pending deltas into ``mismatch_rollups`` and
+aggregate those, never the mismatches, matches or documents tables.
+"""
+import logging
+from datetime import date
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# Dimensions a report can be grouped by, and their rollup columns
+GROUP_COLUMNS = {
+    'month': 'period',
+    'client': 'client_id',
+    'field': 'field',
+}
+
+# A document's checks are replaced; the triggers turn both statements into rollup deltas
+RETRACT_CHECKS_SQL = "DELETE FROM mismatch_checks WHERE doc_id = :doc_id"
+
+RECORD_CHECKS_SQL = """
+    INSERT INTO mismatch_checks (doc_id, field, client_id, period, mismatched)
+    SELECT d.id, c.field, :client_id, CAST(date_trunc('month', coalesce(d.created_at, now())) AS date), c.mismatched
+    FROM documents d, unnest(CAST(:fields AS varchar[]), CAST(:flags AS boolean[])) AS c(field, mismatched)
+    WHERE d.id = :doc_id
+"""
+
+# Keys in a fixed order, so concurrent folds lock rollup rows in the same order
+FOLD_DELTAS_SQL = """
+    WITH moved AS (
+        DELETE FROM mismatch_rollup_deltas RETURNING period, client_id, field, checked, mismatched
+    )
+    INSERT INTO mismatch_rollups AS r (period, client_id, field, checked, mismatched)
+    SELECT period, client_id, field, sum(checked), sum(mismatched)
+    FROM moved
+    GROUP BY period, client_id, field
+    ORDER BY period, client_id, field
+    ON CONFLICT (period, client_id, field) DO UPDATE SET
+        checked = r.checked + EXCLUDED.checked,
+        mismatched = r.mismatched + EXCLUDED.mismatched
+"""
+
+
+def record_mismatch_checks(db: Session, doc_id: int, client_id: int, checks: Sequence[Tuple[str, bool]]):
+    """
+    Replace the fields checked for a document and update the rollups. Does not commit.
+
+    Args:
+        db: Database session
+        doc_id: Document ID
+        client_id: Client the document was compared against
+        checks: (field, mismatched) per compared field; empty retracts the document
+    """
+    db.execute(text(RETRACT_CHECKS_SQL), {'doc_id': doc_id})
+    if checks:
+        db.execute(text(RECORD_CHECKS_SQL), {
+            'doc_id': doc_id,
+            'client_id': client_id,
+            'fields': [field for field, _ in checks],
+            'flags': [bool(mismatched) for _, mismatched in checks],
+        })
+
+
+def clear_mismatch_rollups(db: Session):
+    """Reset the rollups (after every document, and so every check, was deleted). Does not commit."""
+    db.execute(text("DELETE FROM mismatch_rollup_deltas"))
+    db.execute(text("DELETE FROM mismatch_rollups"))
+
+
+def get_mismatch_rates(
+    db: Session,
+    group_by: List[str],
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    field: Optional[str] = None,
+    client_id: Optional[int] = None,
+    limit: int = 100
+) -> List[Dict[str, Any]]:
+    """
+    Mismatch rates from the rollups.
+
+    Args:
+        db: Database session
+        group_by: Dimensions to group by (keys of GROUP_COLUMNS); empty for overall totals
+        date_from: First month to include (any day of it)
+        date_to: Last month to include (any day of it)
+        field: Only this field ('dob' or 'doa')
+        client_id: Only this client
+        limit: Maximum rows (ordered by month, then most mismatches)
+
+    Returns:
+        One row per group with checked, mismatched and mismatch_rate
+    """
+    db.execute(text(FOLD_DELTAS_SQL))
+    db.commit()
+
+    columns = [GROUP_COLUMNS[dimension] for dimension in group_by]
+    conditions = []
+    params: Dict[str, Any] = {'limit': limit}
+    if date_from:
+        conditions.append("r.period >= :date_from")
+        params['date_from'] = date_from.replace(day=1)
+    if date_to:
+        conditions.append("r.period <= :date_to")
+        params['date_to'] = date_to.replace(day=1)
+    if field:
+        conditions.append("r.field = :field")
+        params['field'] = field
+    if client_id is not None:
+        conditions.append("r.client_id = :client_id")
+        params['client_id'] = client_id
+
+    select_columns = [f"r.{column}" for column in columns]
+    order_by = ["r.period"] if 'period' in columns else []
+    order_by += ["mismatched DESC", "checked DESC"] + [f"r.{column}" for column in columns if column != 'period']
+    if 'client_id' in columns:
+        # Latest name of each client in the page (primary-key lookups)
+        select_columns.append("(SELECT c.name FROM client_profiles c WHERE c.id = r.client_id) AS client_name")
+
+    rows = db.execute(text(f"""
+        SELECT {', '.join(select_columns + ['sum(r.checked) AS checked', 'sum(r.mismatched) AS mismatched'])}
+        FROM mismatch_rollups r
+        {'WHERE ' + ' AND '.join(conditions) if conditions else ''}
+        {'GROUP BY ' + ', '.join(f'r.{column}' for column in columns) if columns else ''}
+        HAVING sum(r.checked) > 0
+        ORDER BY {', '.join(order_by)}
+        LIMIT :limit
+    """), params).mappings().all()
+
+    results = []
+    for row in rows:
+        checked = int(row['checked'])
+        mismatched = int(row['mismatched'])
+        entry: Dict[str, Any] = {}
+        if 'period' in columns:
+            entry['month'] = row['period'].strftime('%Y-%m')
+        if 'client_id' in columns:
+            entry['client_id'] = row['client_id']
+            entry['client_name'] = row['client_name']
+        if 'field' in columns:
+            entry['field'] = row['field']
+        entry.update({
+            'checked': checked,
+            'mismatched': mismatched,
+            'mismatch_rate': round(mismatched / checked, 4) if checked else None,
+        })
+        results.append(entry)
+    return results
@@ -0,0 +1,61 @@
+"""
+Shared name normalization and blocking-key helpers.
+
+Every component that compares an extracted patient name with a client name
+(matching, client snapshots, dataset ingestion) must agree on these rules,
+so they live in one place.
+"""
+import re
+from datetime import date
+from typing import Dict, Optional, Tuple
+
+# Number of leading characters of a name token used as a blocking key
+BLOCK_PREFIX_LENGTH = 3
+
+_PUNCTUATION_RE = re.compile(r'[^\w\s]')
+
+
+def normalize_name(name: Optional[str]) -> str:
+    """Normalize name for matching (lowercase, remove punctuation, collapse whitespace)."""
+    if not name:
+        return ""
+    # Convert to lowercase
+    normalized = name.lower()
+    # Remove punctuation
+    normalized = _PUNCTUATION_RE.sub('', normalized)
+    # Remove extra whitespace
+    return ' '.join(normalized.split())
+
+
+def blocking_keys(normalized_name: str) -> Tuple[str, str]:
+    """
+    Get the (first token, last token) blocking keys for a normalized name.
+
+    Two names are only compared when they share at least one key, which keeps
+    swapped "Last First" orderings in the same block.
+    """
+    tokens = normalized_name.split()
+    if not tokens:
+        return "", ""
+    return tokens[0][:BLOCK_PREFIX_LENGTH], tokens[-1][:BLOCK_PREFIX_LENGTH]
+
+
+def client_name_columns(name: Optional[str]) -> Dict[str, str]:
+    """Get the persisted normalized-name and blocking-key columns for a client name."""
+    normalized = normalize_name(name)
+    block_first, block_last = blocking_keys(normalized)
+    return {
+        'normalized_name': normalized,
+        'block_key_first': block_first,
+        'block_key_last': block_last,
+    }
+
+
+def date_to_ordinal(value: Optional[date]) -> int:
+    """Convert a date to its proleptic Gregorian ordinal (0 when missing)."""
+    return value.toordinal() if value else 0
+
+
+def ordinal_to_date(ordinal: int) -> Optional[date]:
+    """Inverse of date_to_ordinal."""
+    return date.fromordinal(int(ordinal)) if ordinal else None
@@ -0,0 +1,306 @@
+"""
+Service for re-matching documents after the client dataset changes.
+"""
+import logging
+from typing import Dict, Any, List, Optional, Sequence, Set, Tuple
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+from database.models import ClientProfile, Document, ExtractedField, Match, Mismatch
+from services.client_snapshot import ClientSnapshot
+from services.document_summary import update_document_summaries
+from services.job_service import JobService
+from services.matching_service import MatchingService
+from services.normalization import blocking_keys, client_name_columns
+from services.status_cache import status_cache
+from services.status_notifier import status_notifier
+
+logger = logging.getLogger(__name__)
+
+
+class RematchService:
+    """Service for re-evaluating unmatched/ambiguous documents against new clients."""
+
+    # Documents re-scored and written per transaction
+    BATCH_SIZE = 500
+
+    def __init__(
+        self,
+        matching_service: Optional[MatchingService] = None,
+        job_service: Optional[JobService] = None
+    ):
+        """Initialize rematch service."""
+        self.matching_service = matching_service or MatchingService()
+        self.job_service = job_service or JobService()
+
+    def find_affected_documents(
+        self,
+        db: Session,
+        min_client_id: Optional[int] = None,
+        client_ids: Optional[Sequence[int]] = None
+    ) -> List[Tuple[int, str]]:
+        """
+        Find completed documents without a confident match that new or updated clients could affect.
+        
+        Args:
+            db: Database session
+            min_client_id: First ID of the newly added clients. Only documents whose
+                extracted name shares a blocking key with one of them (or with one
+                of ``client_ids``) are returned.
+            client_ids: Existing clients updated in place (a rename changes their blocking keys)
+            
+            With neither, every unmatched/ambiguous document is re-evaluated.
+            
+        Returns:
+            List of (doc_id, normalized extracted name)
+        """
+        confidently_matched = db.query(Match.doc_id).filter(Match.decision == 'match')
+        rows = db.query(ExtractedField.doc_id, ExtractedField.normalized_value).join(
+            Document, Document.id == ExtractedField.doc_id
+        ).filter(
+            ExtractedField.field_name == 'patient_name',
+            ExtractedField.normalized_value.isnot(None),
+            ExtractedField.normalized_value != '',
+            Document.status == 'completed',
+            ~ExtractedField.doc_id.in_(confidently_matched)
+        ).order_by(ExtractedField.doc_id).all()
+        
+        if min_client_id is None and client_ids is None:
+            return [(row.doc_id, row.normalized_value) for row in rows]
+        
+        new_keys = self._client_blocking_keys(db, min_client_id, client_ids)
+        return [
+            (row.doc_id, row.normalized_value)
+            for row in rows
+            if new_keys.intersection(blocking_keys(row.normalized_value))
+        ]
+
+    def rematch(
+        self,
+        db: Session,
+        job_id: int,
+        min_client_id: Optional[int] = None,
+        client_ids: Optional[Sequence[int]] = None
+    ) -> Dict[str, Any]:
+        """
+        Re-score affected documents in bulk and upsert their matches and mismatches.
+        
+        Documents already matched to an updated client first have their
+        mismatches re-detected against the client's new values. Progress is
+        reported through the job after every batch.
+        
+        Args:
+            db: Database session
+            job_id: BackgroundJob tracking this run
+            min_client_id: First ID of the newly added clients
+            client_ids: Existing clients updated in place (sync-mode imports)
+            
+            With neither, every unmatched/ambiguous document is re-evaluated.
+            
+        Returns:
+            Summary of the run
+        """
+        refreshed = 0
+        if client_ids:
+            self.job_service.update(db, job_id, status='running',
+                                    message='Refreshing documents matched to updated clients...')
+            refreshed = self.refresh_matched_documents(db, client_ids)
+        
+        self.job_service.update(db, job_id, status='running', message='Finding affected documents...')
+        documents = self.find_affected_documents(db, min_client_id, client_ids)
+        logger.info(f"🔁 Re-matching {len(documents)} documents (new clients from ID {min_client_id}, "
+                    f"{len(client_ids or [])} updated clients)")
+        self.job_service.update(db, job_id, total=len(documents), processed=0,
+                                message=f'Re-matching {len(documents)} documents...')
+        
+        summary = {
+            'documents': len(documents), 'changed': 0, 'match': 0, 'ambiguous': 0, 'no_match': 0,
+            'refreshed': refreshed
+        }
+        
+        # Without a snapshot every document is scored against the full client list,
+        # loaded once for the whole run
+        snapshot = self.matching_service.snapshot_service.current()
+        all_candidates = None if snapshot is not None else self.matching_service._load_all_candidates(db)
+        
+        processed = 0
+        for start in range(0, len(documents), self.BATCH_SIZE):
+            batch = documents[start:start + self.BATCH_SIZE]
+            results = self._score_batch(db, [name for _, name in batch], snapshot, all_candidates)
+            
+            summary['changed'] += self._apply_batch(db, batch, results)
+            for _, _, decision in results:
+                summary[decision] += 1
+            
+            processed += len(batch)
+            self.job_service.update(db, job_id, processed=processed,
+                                    message=f'Re-matched {processed} of {len(documents)} documents')
+        
+        self.job_service.update(db, job_id, status='completed', result=summary,
+                                message=f"Re-matching complete: {summary['changed']} documents updated")
+        logger.info(f"✅ Re-matching complete: {summary}")
+        return summary
+
+    def _score_batch(
+        self,
+        db: Session,
+        names: List[str],
+        snapshot: Optional[ClientSnapshot],
+        all_candidates: Optional[Tuple[List[int], List[str]]]
+    ) -> List[Tuple[Optional[int], float, str]]:
+        """Match names the way match_document does: exact normalized-name hits first, then fuzzy ranking."""
+        exact = self.matching_service.exact_hits(db, names)
+        results: List[Optional[Tuple[Optional[int], float, str]]] = [
+            (exact[name], 100.0, 'match') if name in exact else None for name in names
+        ]
+        pending = [index for index, result in enumerate(results) if result is None]
+        if snapshot is not None:
+            for index in pending:
+                results[index] = self.matching_service.score_names(
+                    [names[index]], *snapshot.candidates(names[index])
+                )[0]
+        elif pending:
+            scored = self.matching_service.score_names([names[index] for index in pending], *all_candidates)
+            for index, result in zip(pending, scored):
+                results[index] = result
+        return results
+
+    def _apply_batch(
+        self,
+        db: Session,
+        batch: List[Tuple[int, str]],
+        results: List[Tuple[Optional[int], float, str]]
+    ) -> int:
+        """Replace match/mismatch records (and summaries) of changed documents in one transaction."""
+        doc_ids = [doc_id for doc_id, _ in batch]
+        # Newest first, so each document keeps its first match (the one summaries and views show)
+        current = {
+            match.doc_id: match
+            for match in db.query(Match).filter(Match.doc_id.in_(doc_ids)).order_by(Match.id.desc()).all()
+        }
+        
+        changed = []
+        for (doc_id, _), (client_id, score, decision) in zip(batch, results):
+            if client_id is None:
+                continue
+            existing = current.get(doc_id)
+            if existing and existing.client_id == client_id and existing.decision == decision:
+                continue
+            changed.append((doc_id, client_id, score, decision))
+        
+        if not changed:
+            return 0
+        
+        changed_ids = [doc_id for doc_id, _, _, _ in changed]
+        db.query(Match).filter(Match.doc_id.in_(changed_ids)).delete(synchronize_session=False)
+        for doc_id, client_id, score, decision in changed:
+            db.add(Match(doc_id=doc_id, client_id=client_id, match_score=score, decision=decision))
+        
+        self._redetect_mismatches(db, [(doc_id, client_id) for doc_id, client_id, _, _ in changed])
+        return len(changed)
+
+    def refresh_matched_documents(self, db: Session, client_ids: Sequence[int]) -> int:
+        """
+        Re-detect the mismatches (and summaries) of documents matched to updated clients.
+        
+        The match itself is kept; only the comparison against the client's
+        DOB/DOA and the denormalized summary are redone, in batches.
+        
+        Args:
+            db: Database session
+            client_ids: Clients whose values changed
+            
+        Returns:
+            Number of documents refreshed
+        """
+        # The first match per document is the one mismatches are detected against
+        first_matches = db.query(
+            Match.doc_id, func.min(Match.id).label('match_id')
+        ).group_by(Match.doc_id).subquery()
+        pairs = db.query(Match.doc_id, Match.client_id).join(
+            first_matches, Match.id == first_matches.c.match_id
+        ).filter(Match.client_id.in_(list(client_ids))).order_by(Match.doc_id).all()
+        
+        for start in range(0, len(pairs), self.BATCH_SIZE):
+            self._redetect_mismatches(db, [tuple(pair) for pair in pairs[start:start + self.BATCH_SIZE]])
+        if pairs:
+            logger.info(f"🔄 Refreshed mismatches of {len(pairs)} documents matched to updated clients")
+        return len(pairs)
+
+    def _redetect_mismatches(self, db: Session, pairs: List[Tuple[int, int]]):
+        """Replace the mismatches of (doc_id, client_id) pairs, refresh their summaries and commit."""
+        doc_ids = [doc_id for doc_id, _ in pairs]
+        fields_by_doc = self._load_date_fields(db, doc_ids)
+        db.query(Mismatch).filter(Mismatch.doc_id.in_(doc_ids)).delete(synchronize_session=False)
+        
+        for doc_id, client_id in pairs:
+            self.matching_service.detect_mismatches(
+                db, doc_id, client_id, fields_by_doc.get(doc_id, {}), commit=False
+            )
+        update_document_summaries(db, doc_ids)
+        
+        db.commit()
+        for doc_id in doc_ids:
+            # Cached statuses carry the old version; wake long-polling readers
+            status_cache.invalidate(doc_id)
+            status_notifier.notify(doc_id)
+
+    def _load_date_fields(self, db: Session, doc_ids: List[int]) -> Dict[int, Dict[str, Dict[str, Any]]]:
+        """Load extracted dob/doa fields for many documents in one query."""
+        fields_by_doc: Dict[int, Dict[str, Dict[str, Any]]] = {}
+        fields = db.query(ExtractedField).filter(
+            ExtractedField.doc_id.in_(doc_ids),
+            ExtractedField.field_name.in_(['dob', 'doa'])
+        ).all()
+        for field in fields:
+            fields_by_doc.setdefault(field.doc_id, {})[field.field_name] = {
+                'normalized_value': field.normalized_value,
+                'page_number': field.page_number or 1
+            }
+        return fields_by_doc
+
+    def _client_blocking_keys(
+        self,
+        db: Session,
+        min_client_id: Optional[int],
+        client_ids: Optional[Sequence[int]]
+    ) -> Set[str]:
+        """Collect the blocking keys of clients added from ``min_client_id`` on and of ``client_ids``."""
+        keys: Set[str] = set()
+        conditions = []
+        if min_client_id is not None:
+            conditions.append(ClientProfile.id >= min_client_id)
+        if client_ids:
+            conditions.append(ClientProfile.id.in_(list(client_ids)))
+        if not conditions:
+            return keys
+        rows = db.query(
+            ClientProfile.name, ClientProfile.block_key_first, ClientProfile.block_key_last
+        ).filter(or_(*conditions)).yield_per(10000)
+        for row in rows:
+            if row.block_key_first is None:
+                # Not backfilled yet
+                columns = client_name_columns(row.name)
+                keys.update((columns['block_key_first'], columns['block_key_last']))
+            else:
+                keys.update((row.block_key_first, row.block_key_last))
+        keys.discard('')
+        return keys
+
+
+def run_rematch_job(job_id: int, min_client_id: Optional[int] = None, client_ids: Optional[Sequence[int]] = None):
+    """Background task to re-match documents after a client dataset upload."""
+    from database.connection import SessionLocal
+    
+    db = SessionLocal()
+    rematch_service = RematchService()
+    try:
+        rematch_service.rematch(db, job_id, min_client_id, client_ids)
+    except Exception as e:
+        logger.error(f"❌ Re-matching job {job_id} failed: {str(e)}", exc_info=True)
+        db.rollback()
+        try:
+            rematch_service.job_service.update(db, job_id, status='failed', message=f'Re-matching failed: {str(e)}')
+        except Exception as e2:
+            logger.error(f"❌ Failed to update job status: {str(e2)}", exc_info=True)
+    finally:
+        db.close()
@@ -0,0 +1,152 @@
+"""
+Conditional GET support and a small in-process cache of serialized responses.
+
+Per-document resources (extracted fields, match view, review aggregate) only
+change when the document's ``version`` is bumped, so once a document has
+reached a final status its responses are identified by (route, doc_id, version):
+the version is the ETag, If-None-Match is answered with 304, and the
+serialized body is kept in an LRU so repeat requests skip the queries and
+serialization.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, NamedTuple, Optional
+from dotenv import load_dotenv
+from fastapi import Request, Response
+from fastapi.responses import ORJSONResponse
+from pydantic_settings import BaseSettings
+
+load_dotenv()
+
+# Clients may keep responses but must revalidate them (cheap 304) before reuse
+CACHE_CONTROL = "private, no-cache"
+# Documents still being processed change without a version bump
+NO_STORE = "no-store"
+
+
+class ResponseCacheSettings(BaseSettings):
+    """Response cache configuration."""
+    response_cache_size: int = int(os.getenv("RESPONSE_CACHE_SIZE", "1000"))
+
+    class Config:
+        env_file = ".env"
+        extra = "ignore"  # Ignore extra fields from .env
+
+
+class CachedResponse(NamedTuple):
+    """A serialized response body and its ETag."""
+    etag: str
+    body: bytes
+
+
+class ResponseCache:
+    """Thread-safe LRU of serialized responses, with optional per-entry expiry."""
+
+    def __init__(self, settings: Optional[ResponseCacheSettings] = None):
+        """Initialize an empty cache."""
+        self.settings = settings or ResponseCacheSettings()
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[CachedResponse]:
+        """Cached response for ``key``, or None if absent or expired."""
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is None:
+                return None
+            expires, response = cached
+            if expires is not None and expires <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return response
+
+    def put(self, key: Hashable, response: CachedResponse, ttl: Optional[float] = None):
+        """Store a response, optionally only for ``ttl`` seconds."""
+        if self.settings.response_cache_size <= 0:
+            return
+        expires = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._entries[key] = (expires, response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.settings.response_cache_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
+
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match / If-Range header value matches ``etag`` (weak comparison)."""
+    if not header:
+        return False
+    bare = etag.removeprefix('W/').strip('"')
+    for candidate in header.split(','):
+        candidate = candidate.strip()
+        if candidate == '*' or candidate.removeprefix('W/').strip('"') == bare:
+            return True
+    return False
+
+
+def version_etag(doc_id: int, version: int) -> str:
+    """ETag of a per-document resource at a given document version."""
+    return f'"{doc_id}-v{version}"'
+
+
+def serialize(content: Any) -> bytes:
+    """Serialize response content with orjson (as the app's default response class)."""
+    return ORJSONResponse(content=content).body
+
+
+def not_modified(etag: str) -> Response:
+    """304 response for a matching If-None-Match."""
+    return Response(status_code=304, headers={'ETag': etag, 'Cache-Control': CACHE_CONTROL})
+
+
+def cached_json(cached: CachedResponse) -> Response:
+    """JSON response for a cached body, with its validators."""
+    return Response(
+        content=cached.body,
+        media_type='application/json',
+        headers={'ETag': cached.etag, 'Cache-Control': CACHE_CONTROL}
+    )
+
+
+def document_response(
+    request: Request,
+    route: str,
+    doc_id: int,
+    version: int,
+    build: Callable[[], Any]
+) -> Response:
+    """
+    Conditional, cached response for a per-document resource of a finalized document.
+
+    Args:
+        request: Incoming request (for If-None-Match)
+        route: Name of the resource, part of the cache key
+        doc_id: Document ID
+        version: Current document version
+        build: Builds the response content on a cache miss
+
+    Returns:
+        304 if the client's copy is current, else the (cached) JSON body
+    """
+    etag = version_etag(doc_id, version)
+    if etag_matches(request.headers.get('if-none-match'), etag):
+        return not_modified(etag)
+
+    key = (route, doc_id, version)
+    cached = response_cache.get(key)
+    if cached is None:
+        cached = CachedResponse(etag, serialize(build()))
+        response_cache.put(key, cached)
+    return cached_json(cached)
+
+
+# Shared by the routes of this worker
+response_cache = ResponseCache()
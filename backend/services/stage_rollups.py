@@ -0,0 +1,234 @@
+"""
+Per-minute throughput and latency rollups of the processing pipeline.
+
+The pipeline times each stage of a document (OCR, extraction, matching and the
+whole run) and adds the samples to ``stage_rollups``: one row per minute,
+stage and outcome holding a count, total/max latency and a fixed-bucket latency
+histogram. Time-series queries aggregate these rows, never the raw tables.
+"""
+import logging
+import time
+from bisect import bisect_left
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (ms) of the histogram buckets; one more bucket counts everything slower
+LATENCY_BUCKETS_MS = (100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000, 120000, 300000)
+
+BUCKET_SIZES = {
+    'minute': timedelta(minutes=1),
+    'hour': timedelta(hours=1),
+    'day': timedelta(days=1),
+}
+
+# Maximum points per stage a time-series request may return
+MAX_TIMESERIES_POINTS = 5000
+
+# Histograms are added element-wise (both sides have len(LATENCY_BUCKETS_MS) + 1 entries)
+UPSERT_ROLLUP_SQL = """
+    INSERT INTO stage_rollups AS r (bucket_start, stage, status, count, total_ms, max_ms, histogram)
+    VALUES (:bucket_start, :stage, :status, :count, :total_ms, :max_ms, :histogram)
+    ON CONFLICT (bucket_start, stage, status) DO UPDATE SET
+        count = r.count + EXCLUDED.count,
+        total_ms = r.total_ms + EXCLUDED.total_ms,
+        max_ms = GREATEST(r.max_ms, EXCLUDED.max_ms),
+        histogram = ARRAY(
+            SELECT a + b FROM unnest(r.histogram, EXCLUDED.histogram) AS h(a, b)
+        )
+"""
+
+TIMESERIES_SQL = """
+    WITH selected AS (
+        SELECT date_trunc(:unit, bucket_start) AS bucket, *
+        FROM stage_rollups
+        WHERE bucket_start >= :date_from AND bucket_start < :date_to
+    ),
+    totals AS (
+        SELECT bucket, stage,
+            sum(count) AS count,
+            sum(count) FILTER (WHERE status = 'failure') AS failed,
+            sum(total_ms) AS total_ms,
+            max(max_ms) AS max_ms
+        FROM selected
+        GROUP BY bucket, stage
+    ),
+    histograms AS (
+        SELECT bucket, stage, array_agg(n ORDER BY i) AS histogram
+        FROM (
+            SELECT bucket, stage, h.i, sum(h.n) AS n
+            FROM selected, unnest(selected.histogram) WITH ORDINALITY AS h(n, i)
+            GROUP BY bucket, stage, h.i
+        ) cells
+        GROUP BY bucket, stage
+    )
+    SELECT t.bucket, t.stage, t.count, t.failed, t.total_ms, t.max_ms, h.histogram
+    FROM totals t JOIN histograms h USING (bucket, stage)
+    ORDER BY t.bucket, t.stage
+"""
+
+
+def histogram_index(latency_ms: float) -> int:
+    """Index of the histogram bucket a latency falls into."""
+    return bisect_left(LATENCY_BUCKETS_MS, latency_ms)
+
+
+class StageTimings:
+    """
+    Stage timings of one pipeline run.
+
+    Usage: ``begin(stage)`` / ``end(ok)`` around each stage, then ``flush(ok)``
+    once the run is over; a stage still open at flush (the run raised) is
+    recorded as failed.
+    """
+
+    def __init__(self):
+        """Initialize an empty run."""
+        self.started: Optional[float] = None
+        self.samples: List[Tuple[str, bool, float]] = []
+        self._stage: Optional[Tuple[str, float]] = None
+
+    def start(self):
+        """Mark the start of the run (the 'total' stage)."""
+        self.started = time.perf_counter()
+
+    def begin(self, stage: str):
+        """Start timing a stage."""
+        self._stage = (stage, time.perf_counter())
+
+    def end(self, ok: bool = True):
+        """Stop timing the current stage."""
+        if self._stage is None:
+            return
+        stage, started = self._stage
+        self.samples.append((stage, bool(ok), (time.perf_counter() - started) * 1000))
+        self._stage = None
+
+    def flush(self, ok: bool):
+        """
+        Record the run's samples in the rollups (in a separate short transaction).
+
+        Failures are logged, never raised: rollups must not fail processing.
+
+        Args:
+            ok: Whether the run completed successfully
+        """
+        if self._stage is not None:
+            self.end(False)
+        if self.started is not None:
+            self.samples.append(('total', bool(ok), (time.perf_counter() - self.started) * 1000))
+            self.started = None
+        if not self.samples:
+            return
+
+        from database.connection import SessionLocal
+        db = SessionLocal()
+        try:
+            record_samples(db, self.samples)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"⚠️ Failed to record stage rollups: {str(e)}")
+        finally:
+            db.close()
+        self.samples = []
+
+
+def record_samples(db: Session, samples: List[Tuple[str, bool, float]], at: Optional[datetime] = None):
+    """
+    Add latency samples to the current minute's rollups. Does not commit.
+
+    Args:
+        db: Database session
+        samples: (stage, ok, latency_ms) tuples
+        at: Time the samples belong to (default: now)
+    """
+    bucket_start = (at or datetime.now()).replace(second=0, microsecond=0)
+    rows: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    for stage, ok, latency_ms in samples:
+        status = 'success' if ok else 'failure'
+        row = rows.setdefault((stage, status), {
+            'bucket_start': bucket_start, 'stage': stage, 'status': status,
+            'count': 0, 'total_ms': 0, 'max_ms': 0, 'histogram': [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        })
+        latency = int(round(latency_ms))
+        row['count'] += 1
+        row['total_ms'] += latency
+        row['max_ms'] = max(row['max_ms'], latency)
+        row['histogram'][histogram_index(latency)] += 1
+
+    # Fixed key order, so concurrent runs lock the minute's rows in the same order
+    db.execute(text(UPSERT_ROLLUP_SQL), [rows[key] for key in sorted(rows)])
+
+
+def percentile(histogram: List[int], q: float, max_ms: Optional[int] = None) -> Optional[float]:
+    """
+    Estimate a latency percentile from a histogram (linear within a bucket).
+
+    Args:
+        histogram: Counts per LATENCY_BUCKETS_MS bucket (plus the open-ended one)
+        q: Percentile in [0, 100]
+        max_ms: Largest observed latency, the upper bound of the open-ended bucket
+
+    Returns:
+        Estimated latency in ms, or None for an empty histogram
+    """
+    total = sum(histogram)
+    if not total:
+        return None
+    rank = q / 100 * total
+    seen = 0
+    for index, count in enumerate(histogram):
+        if count and seen + count >= rank:
+            lower = LATENCY_BUCKETS_MS[index - 1] if index > 0 else 0
+            upper = LATENCY_BUCKETS_MS[index] if index < len(LATENCY_BUCKETS_MS) else (max_ms or lower)
+            if max_ms is not None:
+                upper = min(upper, max_ms)
+            upper = max(upper, lower)
+            return round(lower + (upper - lower) * (rank - seen) / count, 1)
+        seen += count
+    return float(max_ms) if max_ms is not None else None
+
+
+def get_timeseries(db: Session, date_from: datetime, date_to: datetime, bucket: str) -> List[Dict[str, Any]]:
+    """
+    Throughput, failure rate and latency per time bucket and stage.
+
+    Args:
+        db: Database session
+        date_from: Start of the range (inclusive)
+        date_to: End of the range (exclusive)
+        bucket: 'minute', 'hour' or 'day'
+
+    Returns:
+        One entry per (bucket, stage) that has samples, in time order
+    """
+    rows = db.execute(text(TIMESERIES_SQL), {
+        'unit': bucket, 'date_from': date_from, 'date_to': date_to
+    }).all()
+
+    series = []
+    for row in rows:
+        histogram = [int(n) for n in row.histogram]
+        count = int(row.count)
+        failed = int(row.failed or 0)
+        series.append({
+            'bucket_start': row.bucket,
+            'stage': row.stage,
+            'count': count,
+            'succeeded': count - failed,
+            'failed': failed,
+            'failure_rate': round(failed / count, 4) if count else None,
+            'latency_ms': {
+                'avg': round(int(row.total_ms) / count, 1) if count else None,
+                'p50': percentile(histogram, 50, row.max_ms),
+                'p95': percentile(histogram, 95, row.max_ms),
+                'p99': percentile(histogram, 99, row.max_ms),
+                'max': row.max_ms,
+            },
+            'histogram': histogram,
+        })
+    return series
@@ -0,0 +1,179 @@
+"""
+System statistics for the dashboard.
+
+Counts come from the ``stats_counters`` table, which database triggers keep in
+step with documents, matches and mismatches (see
+database/migrations/add_stats_counters.sql), so a stats request reads a few
+counter rows plus the pending deltas instead of counting tables. Reads never
+write: a periodic job folds the deltas into the counters. Databases without
+the counters fall back to one grouped count. Results are cached in-process for
+a few seconds.
+"""
+import asyncio
+import logging
+import os
+import threading
+import time
+from typing import Dict, Optional
+from dotenv import load_dotenv
+from pydantic_settings import BaseSettings
+from sqlalchemy import func, select, text
+from sqlalchemy.exc import ProgrammingError
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from database.connection import SessionLocal
+from database.models import Document, Match, Mismatch
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Fold the deltas appended by the triggers into the counters (names in a fixed
+# order, so concurrent compactions lock counter rows in the same order)
+COMPACT_COUNTERS_SQL = """
+    WITH moved AS (
+        DELETE FROM stats_counter_deltas RETURNING name, value
+    )
+    INSERT INTO stats_counters (name, value)
+    SELECT name, sum(value) FROM moved GROUP BY name ORDER BY name
+    ON CONFLICT (name) DO UPDATE SET value = stats_counters.value + EXCLUDED.value
+"""
+
+# Counters with the pending deltas added (seeded: the counter row exists)
+READ_COUNTERS_SQL = """
+    SELECT name, sum(value) AS value, bool_or(seeded) AS seeded FROM (
+        SELECT name, value, true AS seeded FROM stats_counters
+        UNION ALL
+        SELECT name, value, false FROM stats_counter_deltas
+    ) pending
+    GROUP BY name
+"""
+
+
+class StatsSettings(BaseSettings):
+    """Stats configuration."""
+    stats_cache_ttl: float = float(os.getenv("STATS_CACHE_TTL", "5"))
+    stats_compact_interval: float = float(os.getenv("STATS_COMPACT_INTERVAL", "60"))
+
+    class Config:
+        env_file = ".env"
+        extra = "ignore"  # Ignore extra fields from .env
+
+
+class StatsService:
+    """Service for the system statistics shown on the dashboard."""
+
+    def __init__(self, settings: Optional[StatsSettings] = None):
+        """Initialize stats service."""
+        self.settings = settings or StatsSettings()
+        self._cached = None
+        self._lock = threading.Lock()
+        self._counters_missing_logged = False
+
+    def get_stats(self, db: Session) -> Dict[str, int]:
+        """
+        Get document, match and mismatch counts.
+
+        Args:
+            db: Database session
+
+        Returns:
+            Dictionary of counts (the GET /stats response)
+        """
+        with self._lock:
+            if self._cached is not None and self._cached[0] > time.monotonic():
+                return dict(self._cached[1])
+
+        stats = self._read_counters(db)
+        if stats is None:
+            stats = self._count(db)
+
+        if self.settings.stats_cache_ttl > 0:
+            with self._lock:
+                self._cached = (time.monotonic() + self.settings.stats_cache_ttl, stats)
+        return dict(stats)
+
+    def invalidate(self):
+        """Drop the cached stats."""
+        with self._lock:
+            self._cached = None
+
+    def _read_counters(self, db: Session) -> Optional[Dict[str, int]]:
+        """Stats from the trigger-maintained counters, or None if they are not installed."""
+        try:
+            rows = db.execute(text(READ_COUNTERS_SQL)).all()
+        except ProgrammingError:
+            db.rollback()
+            if not self._counters_missing_logged:
+                logger.warning("⚠️ stats_counters not installed (run add_stats_counters.sql); counting tables instead")
+                self._counters_missing_logged = True
+            return None
+
+        if not any(row.name == 'documents' and row.seeded for row in rows):
+            # Table exists but was never seeded
+            return None
+
+        counters = {row.name: int(row.value) for row in rows}
+
+        status_counts = {
+            name.split('.', 1)[1]: value
+            for name, value in counters.items() if name.startswith('documents.')
+        }
+        return self._stats(
+            counters['documents'], status_counts, counters.get('matches', 0), counters.get('mismatches', 0)
+        )
+
+    def _count(self, db: Session) -> Dict[str, int]:
+        """Stats counted from the tables: one grouped document count and one for matches/mismatches."""
+        status_counts = {
+            status or 'pending': count
+            for status, count in db.query(Document.status, func.count(Document.id)).group_by(Document.status)
+        }
+        total_matches, total_mismatches = db.execute(select(
+            select(func.count(Match.id)).scalar_subquery(),
+            select(func.count(Mismatch.id)).scalar_subquery()
+        )).one()
+        return self._stats(sum(status_counts.values()), status_counts, total_matches, total_mismatches)
+
+    @staticmethod
+    def _stats(total: int, status_counts: Dict[str, int], matches: int, mismatches: int) -> Dict[str, int]:
+        """Shape counts as the stats response."""
+        return {
+            "total_documents": int(total or 0),
+            "completed_documents": int(status_counts.get("completed", 0)),
+            "processing_documents": int(status_counts.get("pending", 0) + status_counts.get("processing", 0)),
+            "failed_documents": int(status_counts.get("failed", 0)),
+            "total_matches": int(matches or 0),
+            "total_mismatches": int(mismatches or 0)
+        }
+
+
+def compact_counters(db: Session):
+    """Fold the pending deltas into the counters and commit (no-op without the counters)."""
+    try:
+        db.execute(text(COMPACT_COUNTERS_SQL))
+        db.commit()
+    except ProgrammingError:
+        db.rollback()
+
+
+async def run_counter_compaction(settings: Optional[StatsSettings] = None):
+    """Compact the counters every STATS_COMPACT_INTERVAL seconds (0 disables it)."""
+    settings = settings or StatsSettings()
+    if settings.stats_compact_interval <= 0:
+        return
+    while True:
+        await asyncio.sleep(settings.stats_compact_interval)
+        try:
+            await run_in_threadpool(_compact_counters_once)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not compact stats counters: {e}")
+
+
+def _compact_counters_once():
+    """Compact the counters in a session of its own."""
+    db = SessionLocal()
+    try:
+        compact_counters(db)
+    finally:
+        db.close()
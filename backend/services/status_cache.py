@@ -0,0 +1,124 @@
+"""
+In-process cache of document processing status for polling clients.
+
+Document processing writes every status transition through to the cache,
+so status polls for documents processed by this worker are answered from
+memory. Entries expire after a short TTL (longer once a document reaches a
+final status) so transitions made by other workers are picked up from the
+database soon after.
+"""
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from dotenv import load_dotenv
+from pydantic_settings import BaseSettings
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+FINAL_STATUSES = ('completed', 'failed')
+
+
+class StatusCacheSettings(BaseSettings):
+    """Status cache configuration."""
+    status_cache_ttl: float = float(os.getenv("STATUS_CACHE_TTL", "2"))
+    status_cache_final_ttl: float = float(os.getenv("STATUS_CACHE_FINAL_TTL", "60"))
+    status_cache_size: int = int(os.getenv("STATUS_CACHE_SIZE", "10000"))
+
+    class Config:
+        env_file = ".env"
+        extra = "ignore"  # Ignore extra fields from .env
+
+
+class StatusCache:
+    """Thread-safe LRU of document status entries with per-entry expiry."""
+
+    def __init__(self, settings: Optional[StatusCacheSettings] = None):
+        """Initialize an empty cache."""
+        self.settings = settings or StatusCacheSettings()
+        self._entries: "OrderedDict[int, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        """Whether entries are kept at all (STATUS_CACHE_TTL=0 disables the cache)."""
+        return self.settings.status_cache_ttl > 0 and self.settings.status_cache_size > 0
+
+    def get_many(self, doc_ids: Iterable[int]) -> Tuple[Dict[int, Dict[str, Any]], List[int]]:
+        """
+        Look up several documents.
+
+        Args:
+            doc_ids: Document IDs
+
+        Returns:
+            Tuple of (cached entries by ID, IDs that must be read from the database)
+        """
+        found: Dict[int, Dict[str, Any]] = {}
+        missing: List[int] = []
+        now = time.monotonic()
+        with self._lock:
+            for doc_id in doc_ids:
+                cached = self._entries.get(doc_id)
+                if cached is None or cached[0] <= now:
+                    if cached is not None:
+                        del self._entries[doc_id]
+                    missing.append(doc_id)
+                    continue
+                self._entries.move_to_end(doc_id)
+                found[doc_id] = cached[1]
+        return found, missing
+
+    def get(self, doc_id: int) -> Optional[Dict[str, Any]]:
+        """Cached status entry of one document, or None."""
+        found, _ = self.get_many([doc_id])
+        return found.get(doc_id)
+
+    def put(self, entry: Dict[str, Any]):
+        """
+        Store a status entry (keys: id, filename, status, created_at, updated_at, version).
+        """
+        if not self.enabled:
+            return
+        ttl = self.settings.status_cache_final_ttl if entry['status'] in FINAL_STATUSES else self.settings.status_cache_ttl
+        with self._lock:
+            self._entries[entry['id']] = (time.monotonic() + ttl, entry)
+            self._entries.move_to_end(entry['id'])
+            while len(self._entries) > self.settings.status_cache_size:
+                self._entries.popitem(last=False)
+
+    def put_document(self, document) -> Dict[str, Any]:
+        """Store (and return) the status entry of a Document row."""
+        entry = status_entry(document)
+        self.put(entry)
+        return entry
+
+    def invalidate(self, doc_id: int):
+        """Drop one document from the cache."""
+        with self._lock:
+            self._entries.pop(doc_id, None)
+
+    def clear(self):
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
+
+
+def status_entry(document) -> Dict[str, Any]:
+    """Status entry of a Document row (or any row with the same columns)."""
+    return {
+        'id': document.id,
+        'filename': document.filename,
+        'status': document.status,
+        'created_at': document.created_at,
+        'updated_at': document.updated_at,
+        'version': document.version or 0,
+    }
+
+
+# Shared by the routes and the processing tasks of this worker
+status_cache = StatusCache()
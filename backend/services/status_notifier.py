@@ -0,0 +1,96 @@
+"""
+In-process wake-ups for requests waiting on a document's status (long polling).
+
+Waiters park on an asyncio.Event in the server's event loop; status changes
+are published from the processing threads, so events are set through
+``loop.call_soon_threadsafe``.
+"""
+import asyncio
+import logging
+import threading
+from typing import Dict, Set
+
+logger = logging.getLogger(__name__)
+
+
+class StatusWaiter:
+    """One request's subscription to changes of one document."""
+
+    def __init__(self, notifier: "StatusNotifier", doc_id: int):
+        """Create the waiter's event in the running loop."""
+        self.notifier = notifier
+        self.doc_id = doc_id
+        self.loop = asyncio.get_running_loop()
+        self.event = asyncio.Event()
+
+    async def wait(self, timeout: float) -> bool:
+        """
+        Wait up to ``timeout`` seconds for a notification.
+
+        Returns:
+            True if notified, False on timeout
+        """
+        try:
+            await asyncio.wait_for(self.event.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self.event.clear()
+
+    def __enter__(self) -> "StatusWaiter":
+        self.notifier._add(self)
+        return self
+
+    def __exit__(self, *exc_info):
+        self.notifier._remove(self)
+
+
+class StatusNotifier:
+    """Registry of waiters per document."""
+
+    def __init__(self):
+        """Initialize an empty registry."""
+        self._waiters: Dict[int, Set[StatusWaiter]] = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, doc_id: int) -> StatusWaiter:
+        """
+        Subscribe to changes of a document; use as a context manager.
+
+        Subscribe before reading the current status, so a change made between
+        the read and the wait still wakes the waiter.
+        """
+        return StatusWaiter(self, doc_id)
+
+    def notify(self, doc_id: int):
+        """Wake every waiter of a document (safe to call from any thread)."""
+        with self._lock:
+            waiters = list(self._waiters.get(doc_id, ()))
+        for waiter in waiters:
+            try:
+                waiter.loop.call_soon_threadsafe(waiter.event.set)
+            except RuntimeError:
+                # The waiter's loop has shut down
+                pass
+
+    def waiting(self) -> int:
+        """Number of parked waiters."""
+        with self._lock:
+            return sum(len(waiters) for waiters in self._waiters.values())
+
+    def _add(self, waiter: StatusWaiter):
+        with self._lock:
+            self._waiters.setdefault(waiter.doc_id, set()).add(waiter)
+
+    def _remove(self, waiter: StatusWaiter):
+        with self._lock:
+            waiters = self._waiters.get(waiter.doc_id)
+            if waiters is not None:
+                waiters.discard(waiter)
+                if not waiters:
+                    del self._waiters[waiter.doc_id]
+
+
+# Shared by the status routes and the processing tasks of this worker
+status_notifier = StatusNotifier()
@@ -0,0 +1,192 @@
+"""
+Service for replaying matching decisions over the stored corpus with candidate thresholds.
+"""
+import threading
+import time
+from collections import Counter
+from typing import Dict, Any, List, Optional, Tuple
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from database.models import ClientProfile, Document, ExtractedField, Match
+from services.client_snapshot import ClientSnapshot
+from services.matching_service import MatchingService
+from services.normalization import blocking_keys
+
+
+class ThresholdSimulationService:
+    """
+    Replays matching over every stored extracted name without writing anything.
+    
+    Candidates are selected as in live matching (exact-name hit, then snapshot
+    blocking or every client), so diffs only reflect threshold and weight changes.
+    
+    Candidate rankings only depend on the scorer weights and the data, so they
+    are cached per (weights, snapshot version, corpus fingerprint); re-running with different
+    thresholds only re-applies the decision rule.
+    """
+
+    def __init__(self, matching_service: Optional[MatchingService] = None):
+        """Initialize threshold simulation service."""
+        self.matching_service = matching_service or MatchingService()
+        self._lock = threading.Lock()
+        self._cache_key: Optional[Tuple] = None
+        self._cache: Optional[List[Tuple[int, Optional[int], float, Optional[float]]]] = None
+
+    def simulate(
+        self,
+        db: Session,
+        high_threshold: float,
+        low_threshold: float,
+        scorer_weights: Dict[str, float],
+        max_diffs: int = 500
+    ) -> Dict[str, Any]:
+        """
+        Simulate decisions for all completed documents with the given thresholds and weights.
+        
+        Args:
+            db: Database session
+            high_threshold: Candidate HIGH_CONFIDENCE_THRESHOLD
+            low_threshold: Candidate LOW_CONFIDENCE_THRESHOLD
+            scorer_weights: Weighted blend of MatchingService.SCORERS
+            max_diffs: Maximum number of per-document differences returned
+            
+        Returns:
+            Decision distributions and differences against the stored matches
+        """
+        started = time.perf_counter()
+        snapshot = self.matching_service.snapshot_service.current()
+        rankings, cached = self._rankings(db, scorer_weights, snapshot)
+        
+        current = {
+            match.doc_id: (match.client_id, match.decision)
+            for match in db.query(Match.doc_id, Match.client_id, Match.decision).all()
+        }
+        
+        simulated_counts = Counter()
+        current_counts = Counter()
+        transitions = Counter()
+        diffs = []
+        diff_count = 0
+        for doc_id, client_id, best_score, second_score in rankings:
+            decision = self.matching_service.decide(best_score, second_score, high_threshold, low_threshold)
+            current_client_id, current_decision = current.get(doc_id, (None, 'no_match'))
+            simulated_counts[decision] += 1
+            current_counts[current_decision] += 1
+            
+            # The best candidate of a no_match decision is irrelevant
+            if decision == current_decision and (decision == 'no_match' or client_id == current_client_id):
+                continue
+            diff_count += 1
+            transitions[f"{current_decision}->{decision}"] += 1
+            if len(diffs) < max_diffs:
+                diffs.append({
+                    "doc_id": doc_id,
+                    "current_decision": current_decision,
+                    "current_client_id": current_client_id,
+                    "simulated_decision": decision,
+                    "simulated_client_id": client_id,
+                    "simulated_score": round(best_score, 2),
+                    "runner_up_score": round(second_score, 2) if second_score is not None else None,
+                })
+        
+        return {
+            "documents": len(rankings),
+            "thresholds": {"high_confidence": high_threshold, "low_confidence": low_threshold},
+            "scorer_weights": scorer_weights,
+            "simulated_distribution": dict(simulated_counts),
+            "current_distribution": dict(current_counts),
+            "changed": diff_count,
+            "transitions": dict(transitions),
+            "diffs": diffs,
+            "candidate_strategy": "snapshot_blocking" if snapshot is not None else "all_clients",
+            "rankings_cached": cached,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+
+    def _rankings(
+        self,
+        db: Session,
+        scorer_weights: Dict[str, float],
+        snapshot: Optional[ClientSnapshot]
+    ) -> Tuple[List[Tuple[int, Optional[int], float, Optional[float]]], bool]:
+        """Get (doc_id, best_client_id, best_score, second_score) for every document, cached per snapshot version."""
+        key = (
+            tuple(sorted(scorer_weights.items())),
+            snapshot.version if snapshot is not None else None,
+            self._fingerprint(db)
+        )
+        with self._lock:
+            if key == self._cache_key and self._cache is not None:
+                return self._cache, True
+            
+            documents = db.query(ExtractedField.doc_id, ExtractedField.normalized_value).join(
+                Document, Document.id == ExtractedField.doc_id
+            ).filter(
+                ExtractedField.field_name == 'patient_name',
+                ExtractedField.normalized_value.isnot(None),
+                ExtractedField.normalized_value != '',
+                Document.status == 'completed'
+            ).order_by(ExtractedField.doc_id).all()
+            names = [name for _, name in documents]
+            
+            ranked = self._rank_like_live_matching(db, names, snapshot, scorer_weights)
+            self._cache = [
+                (doc_id, client_id, best_score, second_score)
+                for (doc_id, _), (client_id, best_score, second_score) in zip(documents, ranked)
+            ]
+            self._cache_key = key
+            return self._cache, False
+
+    def _rank_like_live_matching(
+        self,
+        db: Session,
+        names: List[str],
+        snapshot: Optional[ClientSnapshot],
+        scorer_weights: Dict[str, float]
+    ) -> List[Tuple[Optional[int], float, Optional[float]]]:
+        """
+        Rank candidates for each name the way MatchingService.match_document selects them.
+        
+        An exact normalized-name hit is a match with score 100 whatever the
+        thresholds. Other names are scored against their snapshot blocking
+        candidates when a snapshot is published (names with the same blocking
+        keys share one candidate set, so they are ranked together), otherwise
+        against every client.
+        """
+        exact = self.matching_service.exact_hits(db, names)
+        ranked: List[Optional[Tuple[Optional[int], float, Optional[float]]]] = [
+            (exact[name], 100.0, None) if name in exact else None for name in names
+        ]
+        pending = [index for index, result in enumerate(ranked) if result is None]
+        
+        if snapshot is None:
+            client_ids, client_names = self.matching_service._load_all_candidates(db)
+            groups = [pending]
+        else:
+            by_keys: Dict[frozenset, List[int]] = {}
+            for index in pending:
+                by_keys.setdefault(frozenset(blocking_keys(names[index])), []).append(index)
+            groups = list(by_keys.values())
+        
+        for group in groups:
+            if not group:
+                continue
+            if snapshot is not None:
+                client_ids, client_names = snapshot.candidates(names[group[0]])
+            results = self.matching_service.rank_top_two(
+                [names[index] for index in group], client_ids, client_names, scorer_weights
+            )
+            for index, result in zip(group, results):
+                ranked[index] = result
+        return ranked
+
+    def _fingerprint(self, db: Session) -> Tuple:
+        """Cheap fingerprint of the client dataset and extracted names."""
+        clients = db.query(
+            func.count(ClientProfile.id), func.max(ClientProfile.id), func.max(ClientProfile.updated_at)
+        ).one()
+        names = db.query(
+            func.count(ExtractedField.id), func.max(ExtractedField.id)
+        ).filter(ExtractedField.field_name == 'patient_name').one()
+        completed = db.query(func.count(Document.id)).filter(Document.status == 'completed').scalar()
+        return tuple(clients) + tuple(names) + (completed,)
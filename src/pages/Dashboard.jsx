@@ -7,20 +7,27 @@ import DocumentsTable from "../components/DocumentsTable";
 import Modal from "../components/Modal";
 import LoadingSkeleton from "../components/LoadingSkeleton";
 import RealtimeIndicator from "../components/RealtimeIndicator";
-import { fetchDocuments } from "../services/documentService";
+import { fetchDocuments, fetchStats } from "../services/documentService";
 import { useNavigate, useLocation } from "react-router-dom";
 import axios from "axios";
 import { useModal } from "../hooks/useModal";
 import { useAuth } from "../contexts/AuthContext";
 import { API_BASE_URL, WS_BASE_URL } from "../config/api";
 
+// Only the newest page is loaded ("Show All Documents" opens the full list);
+// the status cards come from GET /stats
+const DASHBOARD_PAGE_SIZE = 50;
+const fetchRecentDocuments = () => fetchDocuments({ limit: DASHBOARD_PAGE_SIZE });
+
 export default function DocumentsPage() {
   const navigate = useNavigate();
   const location = useLocation();
   const [documents, setDocuments] = useState([]);
+  const [stats, setStats] = useState(null);
   const [loading, setLoading] = useState(true);
 
   const [uploadingDataset, setUploadingDataset] = useState(false);
+  const [uploadProgress, setUploadProgress] = useState(null);
   const [uploadResult, setUploadResult] = useState(null);
   const [uploadError, setUploadError] = useState(null);
   const [deleting, setDeleting] = useState(false);
@@ -44,8 +51,24 @@ export default function DocumentsPage() {
     };
   };
 
-  // Recalculate counts whenever documents change (for real-time updates)
-  const counts = useMemo(() => getBatchCounts(documents), [documents]);
+  const refreshStats = async () => {
+    const data = await fetchStats();
+    if (data) setStats(data);
+  };
+
+  // Counts cover every document (from /stats); the loaded page is only a fallback
+  const counts = useMemo(
+    () =>
+      stats
+        ? {
+            total: stats.total_documents,
+            processing: stats.processing_documents,
+            completed: stats.completed_documents,
+            failed: stats.failed_documents,
+          }
+        : getBatchCounts(documents),
+    [stats, documents]
+  );
 
   const batchData = [
     {
@@ -81,7 +104,7 @@ export default function DocumentsPage() {
       if (!mounted) return;
       setLoading(true);
       try {
-        const response = await fetchDocuments();
+        const [response] = await Promise.all([fetchRecentDocuments(), refreshStats()]);
         const docs = response.documents || [];
         if (!mounted) return;
         setDocuments(docs);
@@ -133,6 +156,7 @@ export default function DocumentsPage() {
     const WS_URL = token ? `${WS_BASE_URL}/ws/status?token=${encodeURIComponent(token)}` : `${WS_BASE_URL}/ws/status`;
     
     let reconnectTimeout = null;
+    let statsTimeout = null;
     let reconnectAttempts = 0;
     const maxReconnectAttempts = 5;
     
@@ -207,6 +231,11 @@ export default function DocumentsPage() {
                 
                 return updated;
               });
+              // Status cards: one stats refresh per burst of updates
+              clearTimeout(statsTimeout);
+              statsTimeout = setTimeout(() => {
+                if (mounted) refreshStats();
+              }, 1000);
             } else {
               console.warn("⚠️ WebSocket message missing doc_id:", data);
             }
@@ -245,6 +274,7 @@ export default function DocumentsPage() {
       if (reconnectTimeout) {
         clearTimeout(reconnectTimeout);
       }
+      clearTimeout(statsTimeout);
       if (ws.current) {
         if (ws.current.readyState === WebSocket.OPEN || ws.current.readyState === WebSocket.CONNECTING) {
           ws.current.close();
@@ -259,7 +289,7 @@ export default function DocumentsPage() {
       console.log("🔄 Dashboard page active, refreshing documents...");
       const getDocuments = async () => {
         try {
-          const response = await fetchDocuments();
+          const [response] = await Promise.all([fetchRecentDocuments(), refreshStats()]);
           setDocuments(response.documents || []);
         } catch (err) {
           console.error("Failed to fetch documents:", err);
@@ -279,6 +309,7 @@ export default function DocumentsPage() {
     if (!file) return;
 
     setUploadingDataset(true);
+    setUploadProgress(null);
     setUploadResult(null);
     setUploadError(null);
 
@@ -287,15 +318,24 @@ export default function DocumentsPage() {
       const apiService = await import("../services/apiService");
       const res = await apiService.uploadDataset(file);
 
+      // The import runs as a background job; follow it until it finishes
+      const job = await apiService.waitForJob(res.data.job_id, (progress) =>
+        setUploadProgress(progress.message)
+      );
+      if (job.status === "failed") {
+        throw new Error(job.message);
+      }
+
+      const result = job.result || {};
       setUploadResult({
-        message: res.data.message,
-        rows_inserted: res.data.inserted,
-        total_rows: res.data.total_rows,
-        skipped: res.data.skipped
+        message: job.message,
+        rows_inserted: result.inserted,
+        total_rows: result.total_rows,
+        skipped: result.skipped
       });
 
       // Refresh documents list after upload
-      const response = await fetchDocuments();
+      const [response] = await Promise.all([fetchRecentDocuments(), refreshStats()]);
       setDocuments(response.documents || []);
     } catch (err) {
       // Show actual error message from backend
@@ -304,6 +344,7 @@ export default function DocumentsPage() {
       console.error("Dataset upload error:", err.response?.data || err);
     } finally {
       setUploadingDataset(false);
+      setUploadProgress(null);
       e.target.value = "";
     }
   };
@@ -348,7 +389,7 @@ export default function DocumentsPage() {
       });
 
       // Refresh documents list
-      const response2 = await fetchDocuments();
+      const [response2] = await Promise.all([fetchRecentDocuments(), refreshStats()]);
       setDocuments(response2.documents || []);
     } catch (error) {
       const errorMessage = error.response?.data?.detail || error.message || "Failed to delete documents";
@@ -447,7 +488,7 @@ export default function DocumentsPage() {
             <div className="animate-spin rounded-full h-6 w-6 border-2 border-blue-500 border-t-transparent" />
             <div>
               <p className="text-blue-700 font-semibold">Uploading dataset...</p>
-              <p className="text-blue-600 text-sm">Please wait while we process your file</p>
+              <p className="text-blue-600 text-sm">{uploadProgress || "Please wait while we process your file"}</p>
             </div>
           </div>
         )}
@@ -520,7 +561,7 @@ export default function DocumentsPage() {
             <div>
               <h2 className="text-2xl font-bold text-gray-900">Recent Documents</h2>
               <p className="text-gray-600 text-sm mt-1">
-                {documents.length} {documents.length === 1 ? 'document' : 'documents'} total
+                {counts.total} {counts.total === 1 ? 'document' : 'documents'} total
               </p>
             </div>
             {!loading && <RealtimeIndicator ws={ws.current} />}
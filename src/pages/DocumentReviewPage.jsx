@@ -65,57 +65,31 @@ export default function DocumentReviewPage() {
       }
 
       try {
-        // Fetch document details with auth
-        const docRes = await fetch(`${API_BASE_URL}/documents/${docId}`, {
+        // Fetch the document, its extracted fields and its match in one request
+        const res = await fetch(`${API_BASE_URL}/documents/${docId}/full`, {
           headers: {
             ...authHeaders,
             'Content-Type': 'application/json'
           }
         });
 
-        if (!docRes.ok) {
-          if (docRes.status === 401 || docRes.status === 403) {
+        if (!res.ok) {
+          if (res.status === 401 || res.status === 403) {
             console.error("Authentication failed, redirecting to login");
             window.location.href = '/login';
             return;
           }
-          throw new Error(`Failed to fetch document: ${docRes.status} ${docRes.statusText}`);
+          throw new Error(`Failed to fetch document: ${res.status} ${res.statusText}`);
         }
 
-        const docData = await docRes.json();
-        if (docData.document) {
-          setDoc({ ...docData.document, doc_id: docData.document.doc_id || docId });
+        const data = await res.json();
+        if (data.document) {
+          setDoc({ ...data.document, doc_id: data.document.doc_id || docId });
         } else {
           throw new Error("Document data not found in response");
         }
-
-        // Fetch extracted fields with auth
-        const fieldsRes = await fetch(`${API_BASE_URL}/documents/${docId}/extracted-fields`, {
-          headers: {
-            ...authHeaders,
-            'Content-Type': 'application/json'
-          }
-        });
-        if (fieldsRes.ok) {
-          const fieldsData = await fieldsRes.json();
-          setFields(fieldsData.fields || []);
-        } else if (fieldsRes.status === 401 || fieldsRes.status === 403) {
-          console.warn("Failed to fetch fields: authentication error");
-        }
-
-        // Fetch match info with auth
-        const matchRes = await fetch(`${API_BASE_URL}/matches/${docId}`, {
-          headers: {
-            ...authHeaders,
-            'Content-Type': 'application/json'
-          }
-        });
-        if (matchRes.ok) {
-          const matchData = await matchRes.json();
-          setMatchInfo(matchData || null);
-        } else if (matchRes.status === 401 || matchRes.status === 403) {
-          console.warn("Failed to fetch match info: authentication error");
-        }
+        setFields(data.fields || []);
+        setMatchInfo(data.match || null);
       } catch (error) {
         console.error("Error fetching document data:", error);
         await openModal({
@@ -211,31 +185,13 @@ export default function DocumentReviewPage() {
       const contentType = response.headers.get('content-type') || '';
       
       if (contentType.includes('application/json')) {
-        // JSON response (signed URL or base64)
+        // JSON response (signed URL)
         const text = await response.text();
         const jsonData = JSON.parse(text);
         
         if (jsonData.signed_url) {
           // Open signed URL
           window.open(jsonData.signed_url, '_blank');
-        } else if (jsonData.file_content) {
-          // Decode base64 and download
-          const binaryString = atob(jsonData.file_content);
-          const bytes = new Uint8Array(binaryString.length);
-          for (let i = 0; i < binaryString.length; i++) {
-            bytes[i] = binaryString.charCodeAt(i);
-          }
-          const blob = new Blob([bytes], { 
-            type: 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet' 
-          });
-          const url = window.URL.createObjectURL(blob);
-          const link = document.createElement('a');
-          link.href = url;
-          link.download = jsonData.filename || `report_${doc.doc_id || doc.id}.xlsx`;
-          document.body.appendChild(link);
-          link.click();
-          document.body.removeChild(link);
-          window.URL.revokeObjectURL(url);
         } else {
           await openModal({
             title: "Export Unavailable",
@@ -39,7 +39,7 @@ export default function ExportsPage() {
                 export_id: exportData.export_id,
                 batch_or_doc: `Doc ${doc.doc_id}`,
                 generated_at: exportData.created_at,
-                download_url: exportData.signed_url || exportData.file_content
+                download_url: exportData.signed_url
               };
             } catch (err) {
               console.error(`Error fetching export for doc ${doc.doc_id}:`, err);
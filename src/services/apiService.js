@@ -53,13 +53,29 @@ export const uploadDocument = (file, uploader_id) => {
 export const uploadDataset = (file) => {
   const formData = new FormData();
   formData.append("file", file);
+  // Imported by a background job: the response only carries job_id (follow it with fetchJob)
   return api.post("/clients/upload", formData, {
+    params: { background: true },
     headers: { "Content-Type": "multipart/form-data" },
-    timeout: 300000, // 5 minutes timeout for large files (4300+ rows)
+    timeout: 300000, // 5 minutes timeout for sending large files
     maxContentLength: Infinity,
     maxBodyLength: Infinity,
   });
 };
 
+export const fetchJob = (job_id) => api.get(`/jobs/${job_id}`);
+
+// Poll a background job until it completes or fails, reporting its progress message
+export const waitForJob = async (job_id, onProgress, intervalMs = 1000) => {
+  for (;;) {
+    const { data: job } = await fetchJob(job_id);
+    if (job.status === "completed" || job.status === "failed") {
+      return job;
+    }
+    if (onProgress) onProgress(job);
+    await new Promise((resolve) => setTimeout(resolve, intervalMs));
+  }
+};
+
 export const fetchDocuments = () => api.get("/documents/");
 export const fetchExportById = (doc_id) => api.get(`/exports/${doc_id}`);
@@ -8,12 +8,15 @@ const getAuthHeaders = () => {
   return token ? { Authorization: `Bearer ${token}` } : {};
 };
 
-export const fetchDocuments = async () => {
+// Without params the whole list is returned; with { limit } (and the previous
+// response's next_cursor as { cursor }) one page, newest first
+export const fetchDocuments = async (params = {}) => {
   try {
     const response = await axios.get(`${API_BASE_URL}/documents/`, {
-      headers: getAuthHeaders()
+      headers: getAuthHeaders(),
+      params
     });
-    // Backend returns { documents: [...] }
+    // Backend returns { documents: [...], next_cursor }
     return response.data;
   } catch (error) {
     console.error("Error fetching documents:", error);
@@ -25,6 +28,18 @@ export const fetchDocuments = async () => {
   }
 };
 
+export const fetchStats = async () => {
+  try {
+    const response = await axios.get(`${API_BASE_URL}/stats/`, {
+      headers: getAuthHeaders()
+    });
+    return response.data;
+  } catch (error) {
+    console.error("Error fetching stats:", error);
+    return null;
+  }
+};
+
 export const fetchDocumentById = async (docId) => {
   try {
     const response = await axios.get(`${API_BASE_URL}/documents/${docId}`, {